@@ -5,9 +5,9 @@ from .models import Profile
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = (
-        "user_username",
-        "user_last_name",
-        "user_first_name",
+        "username",
+        "last_name",
+        "first_name",
         "email",
         "phone",
         "gender",
@@ -18,29 +18,15 @@ class ProfileAdmin(admin.ModelAdmin):
     )
     list_select_related = ("user",)
     search_fields = (
-        "user__username",
-        "user__first_name",
-        "user__last_name",
+        "username",
+        "first_name",
+        "last_name",
         "phone",
         "email",
     )
     list_filter = ("role", "gender", "status", "specialization")
-    ordering = ("user__last_name", "user__first_name", "user__username")
-
-    def user_username(self, obj):
-        return obj.user.username
-    user_username.short_description = "Логін"
-    user_username.admin_order_field = "user__username"
-
-    def user_first_name(self, obj):
-        return obj.user.first_name
-    user_first_name.short_description = "Ім’я"
-    user_first_name.admin_order_field = "user__first_name"
-
-    def user_last_name(self, obj):
-        return obj.user.last_name
-    user_last_name.short_description = "Прізвище"
-    user_last_name.admin_order_field = "user__last_name"
+    ordering = ("last_name", "first_name", "username")
+    readonly_fields = ("username", "first_name", "last_name")
 
     def user_date_joined(self, obj):
         return obj.user.date_joined
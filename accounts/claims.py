@@ -0,0 +1,127 @@
+# accounts/claims.py
+"""
+Рольові «claims» користувача: id профілю і роль, закешовані в сесії.
+
+Перевірки ролей (role_required, _is_manager, фільтр is_role, ETag сторінок)
+читають роль звідси, а не з Profile: після першого запиту сесії claims
+беруться з неї без запитів до User і Profile.
+
+Інвалідація — через токен покоління користувача в кеші Django (CACHES):
+збереження чи видалення профілю змінює токен (accounts/signals.py), і
+claims із застарілим токеном перечитуються; ROLE_CLAIMS_TTL обмежує вік
+claims як страховка. Токен у кеші процесу (LocMem) інші воркери не бачать,
+тож без спільного бекенду (Redis, Memcached, БД) claims у сесії не
+кешуються зовсім: роль щоразу береться з профілю, який бекенд автентифікації
+завантажує разом з користувачем.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import Profile
+
+SESSION_CLAIMS_KEY = "_role_claims"
+PREFIX = "accounts:claims"
+# бекенди, видимі лише одному процесу
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class RoleClaims:
+    """Роль і профіль користувача запиту; для гостя — порожні."""
+
+    def __init__(self, user_id=None, profile_id=None, role=None):
+        self.user_id = user_id
+        self.profile_id = profile_id
+        self.role = role
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.user_id is not None
+
+    @property
+    def is_manager(self) -> bool:
+        is_head = hasattr(Profile.Role, "HEAD_MANAGER") and self.role == Profile.Role.HEAD_MANAGER
+        return self.role == Profile.Role.MANAGER or is_head
+
+    @property
+    def is_trainer(self) -> bool:
+        return self.role == Profile.Role.TRAINER
+
+    @property
+    def is_client(self) -> bool:
+        return self.role == Profile.Role.CLIENT
+
+    def has_role(self, *roles) -> bool:
+        return self.role is not None and self.role in roles
+
+
+ANONYMOUS = RoleClaims()
+
+
+def _gen_key(user_id) -> str:
+    return f"{PREFIX}:gen:{user_id}"
+
+
+def generation(user_id) -> str:
+    key = _gen_key(user_id)
+    token = cache.get(key)
+    if token is None:
+        # токен міг бути витіснений — новий токен робить старі claims недійсними
+        cache.add(key, uuid.uuid4().hex, None)
+        token = cache.get(key, "")
+    return token
+
+
+def invalidate(user_id) -> None:
+    cache.set(_gen_key(user_id), uuid.uuid4().hex, None)
+
+
+def cache_is_shared() -> bool:
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], PROCESS_LOCAL_CACHES)
+
+
+def claims_for_user(user) -> RoleClaims:
+    """Claims із завантаженого користувача (профіль — з select_related бекенду)."""
+    if not user.is_authenticated:
+        return ANONYMOUS
+    profile = getattr(user, "profile", None)
+    return RoleClaims(user.pk, getattr(profile, "pk", None), getattr(profile, "role", None))
+
+
+def _load(request) -> RoleClaims:
+    session = getattr(request, "session", None)
+    if session is None or not cache_is_shared():
+        # інвалідацію в кеші процесу не побачать інші воркери — не кешуємо (fail closed)
+        return claims_for_user(request.user)
+    user_id = session.get(SESSION_KEY)
+    if user_id is None:
+        return ANONYMOUS
+
+    stored = session.get(SESSION_CLAIMS_KEY)
+    token = generation(user_id)
+    if (
+        stored and stored["uid"] == str(user_id) and stored["gen"] == token
+        and time.time() - stored["at"] < settings.ROLE_CLAIMS_TTL
+    ):
+        return RoleClaims(get_user_model()._meta.pk.to_python(user_id), stored["profile_id"], stored["role"])
+
+    claims = claims_for_user(request.user)
+    if claims.is_authenticated:
+        session[SESSION_CLAIMS_KEY] = {
+            "uid": str(user_id), "gen": token, "at": time.time(),
+            "profile_id": claims.profile_id, "role": claims.role,
+        }
+    return claims
+
+
+def get_claims(request) -> RoleClaims:
+    """Claims запиту; обчислюються раз на запит."""
+    claims = request.__dict__.get("_role_claims")
+    if claims is None:
+        claims = request.__dict__["_role_claims"] = _load(request)
+    return claims
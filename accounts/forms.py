@@ -181,3 +181,14 @@ class PasswordSetForm(_BootstrapFormMixin, forms.Form):
         pwd = self.cleaned_data["new_password"]
         validate_password(pwd)
         return pwd
+
+
+class UserImportForm(_BootstrapFormMixin, forms.Form):
+    file = forms.FileField(label="Файл CSV або NDJSON")
+    dry_run = forms.BooleanField(label="Лише перевірити, без створення", required=False)
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if not upload.name.lower().endswith((".csv", ".ndjson", ".jsonl")):
+            raise ValidationError("Підтримуються файли .csv, .ndjson і .jsonl.")
+        return upload
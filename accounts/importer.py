@@ -0,0 +1,293 @@
+# accounts/importer.py
+"""
+Масовий імпорт користувачів із CSV або NDJSON (команда import_users і
+сторінка менеджера people/import/).
+
+Файл читається потоково й обробляється пакетами по CHUNK_SIZE рядків:
+перевірка полів і унікальності логінів (один запит на пакет), хешування
+паролів у пулі процесів (PBKDF2 — це CPU, а не очікування бази), далі
+bulk_create для User і Profile. bulk_create не надсилає post_save, тож
+профіль не створюється сигналом по одному — натомість пакетом
+оновлюються токени пошуку, лічильники вкладок і версія Profile.
+
+Колонки: username (обов'язкова), password, email, first_name, last_name,
+phone, gender, role, birth_date (РРРР-ММ-ДД), status, specialization,
+work_time. Без пароля обліковий запис отримує непридатний пароль.
+"""
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils.dateparse import parse_date
+
+from core import versions
+
+from . import paging, search
+from .models import USER_MIRROR_FIELDS, Profile
+
+CHUNK_SIZE = 500
+CSV, NDJSON = "csv", "ndjson"
+FORMATS = (CSV, NDJSON)
+
+USER_FIELDS = ("username", "email", "first_name", "last_name")
+PROFILE_FIELDS = ("phone", "email", "gender", "role", "birth_date", "status", "specialization", "work_time")
+OPTIONAL_PROFILE_FIELDS = ("phone", "email", "gender")
+TAKEN = "Такий логін вже зайнятий."
+COLUMNS = (
+    "username", "password", "email", "first_name", "last_name", "phone",
+    "gender", "role", "birth_date", "status", "specialization", "work_time",
+)
+
+
+@dataclass
+class RowError:
+    line: int
+    username: str
+    message: str
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    # пройшли перевірку (для dry_run — скільки було б створено)
+    valid: int = 0
+    created: int = 0
+    errors: list = field(default_factory=list)
+    # секунди за етапами: перевірка, хешування, запис
+    timings: dict = field(default_factory=lambda: {"validate": 0.0, "hash": 0.0, "write": 0.0})
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def detect_format(filename: str) -> str:
+    return NDJSON if filename.lower().endswith((".ndjson", ".jsonl")) else CSV
+
+
+def iter_rows(stream, fmt):
+    """(номер рядка, dict | повідомлення про помилку) з текстового потоку."""
+    if fmt == CSV:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {k.strip(): (v or "").strip() for k, v in row.items() if k}
+    else:
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_no, "Некоректний JSON"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, "Очікується JSON-об'єкт"
+                continue
+            yield line_no, {k: "" if v is None else str(v).strip() for k, v in row.items()}
+
+
+def _messages(exc: ValidationError) -> str:
+    if hasattr(exc, "message_dict"):
+        return "; ".join(f"{name}: {' '.join(msgs)}" for name, msgs in exc.message_dict.items())
+    return " ".join(exc.messages)
+
+
+def build_row(row: dict):
+    """(User, Profile, пароль) з рядка або ValidationError."""
+    user = User(**{name: row.get(name, "") for name in USER_FIELDS})
+    user.full_clean(exclude=["password"], validate_unique=False)
+
+    values = {name: row.get(name, "") for name in PROFILE_FIELDS}
+    values["role"] = values["role"] or Profile.Role.CLIENT
+    birth_date = values.pop("birth_date")
+    for name in ("status", "specialization", "work_time"):
+        values[name] = values[name] or None
+    profile = Profile(**values, **{name: getattr(user, name) for name in USER_MIRROR_FIELDS})
+    if birth_date:
+        profile.birth_date = parse_date(birth_date)
+        if profile.birth_date is None:
+            raise ValidationError({"birth_date": ["Очікується дата РРРР-ММ-ДД."]})
+    profile.full_clean(
+        exclude=["user"] + [name for name in OPTIONAL_PROFILE_FIELDS if not values[name]],
+        validate_unique=False,
+    )
+
+    password = row.get("password", "")
+    if password:
+        validate_password(password, user)
+    return user, profile, password
+
+
+def _init_worker():
+    # для start method "spawn": налаштування Django у дочірньому процесі
+    import django
+    django.setup()
+
+
+def hash_passwords(passwords, pool=None, workers=1) -> list:
+    """Хеші паролів; порожній пароль — непридатний хеш."""
+    passwords = [p or None for p in passwords]
+    if pool is None:
+        return [make_password(p) for p in passwords]
+    return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (4 * workers))))
+
+
+def _add_profiles(pairs) -> list:
+    """Створює профілі (user_id, Profile), яких ще немає; повертає профілі цих користувачів з pk."""
+    ids = [user_id for user_id, _ in pairs]
+    existing = set(Profile.objects.filter(user_id__in=ids).values_list("user_id", flat=True))
+    missing = []
+    for user_id, profile in pairs:
+        if user_id not in existing:
+            profile.user_id = user_id
+            missing.append(profile)
+    Profile.objects.bulk_create(missing)
+    return list(Profile.objects.filter(user_id__in=ids))
+
+
+def _write(users, profiles) -> list:
+    """Записує пакет; повертає створені профілі з pk."""
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+    # bulk_create не повертає pk на SQLite/djongo — перечитуємо за логінами
+    ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list("username", "id"))
+    return _add_profiles([(ids[user.username], profile) for user, profile in zip(users, profiles)])
+
+
+def _stored(usernames) -> dict:
+    return {
+        username: (pk, password)
+        for username, pk, password in User.objects.filter(username__in=usernames).values_list("username", "id", "password")
+    }
+
+
+def _recover(rows, report) -> list:
+    """
+    Пакет не записався: логін зайняли паралельно. SQLite відкочує весь пакет,
+    а djongo (insert_many ordered=False) встигає вставити решту рядків — тож
+    спершу з'ясовуємо, що вже в базі. Свій рядок упізнається за хешем пароля
+    (сіль випадкова, чужий хеш не збігається): йому дописується профіль;
+    чужий логін — помилка рядка; невставлені рядки пишуться по одному.
+    """
+    stored = _stored([user.username for _, user, _, _ in rows])
+    ours, pending = [], []
+    for line, user, profile, _ in rows:
+        if user.username not in stored:
+            pending.append((line, user, profile))
+        elif stored[user.username][1] == user.password:
+            ours.append((stored[user.username][0], profile))
+        else:
+            report.errors.append(RowError(line, user.username, TAKEN))
+    created = _add_profiles(ours) if ours else []
+
+    for line, user, profile in pending:
+        try:
+            created += _write([user], [profile])
+        except (IntegrityError, DatabaseError):
+            row = _stored([user.username]).get(user.username)
+            if row is None:
+                # логін вільний — отже, це не дублікат, а інша помилка бази
+                raise
+            if row[1] == user.password:
+                created += _add_profiles([(row[0], profile)])
+            else:
+                report.errors.append(RowError(line, user.username, TAKEN))
+    return created
+
+
+def _import_chunk(chunk, report, pool, workers, dry_run) -> None:
+    t0 = time.perf_counter()
+    candidates, seen = [], set()
+    for line, row in chunk:
+        if isinstance(row, str):
+            report.errors.append(RowError(line, "", row))
+            continue
+        username = row.get("username", "")
+        try:
+            user, profile, password = build_row(row)
+        except ValidationError as exc:
+            report.errors.append(RowError(line, username, _messages(exc)))
+            continue
+        if username.lower() in seen:
+            report.errors.append(RowError(line, username, "Логін повторюється у файлі."))
+            continue
+        seen.add(username.lower())
+        candidates.append((line, user, profile, password))
+
+    taken = {
+        name.lower() for name in
+        User.objects.filter(username__in=[u.username for _, u, _, _ in candidates]).values_list("username", flat=True)
+    }
+    fresh = []
+    for line, user, profile, password in candidates:
+        if user.username.lower() in taken:
+            report.errors.append(RowError(line, user.username, TAKEN))
+        else:
+            fresh.append((line, user, profile, password))
+    t1 = time.perf_counter()
+    report.timings["validate"] += t1 - t0
+    report.valid += len(fresh)
+    if dry_run or not fresh:
+        return
+
+    for (_, user, _, _), hashed in zip(fresh, hash_passwords([p for _, _, _, p in fresh], pool, workers)):
+        user.password = hashed
+    t2 = time.perf_counter()
+    report.timings["hash"] += t2 - t1
+
+    try:
+        created = _write([u for _, u, _, _ in fresh], [p for _, _, p, _ in fresh])
+    except (IntegrityError, DatabaseError):
+        created = _recover(fresh, report)
+    search.index(created)
+    report.created += len(created)
+    report.timings["write"] += time.perf_counter() - t2
+
+
+def import_users(stream, fmt=CSV, workers=None, chunk_size=CHUNK_SIZE, dry_run=False) -> ImportReport:
+    """
+    Імпортує користувачів із текстового потоку. workers — процеси для
+    хешування (None — за кількістю CPU, 0 — у поточному процесі).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Невідомий формат: {fmt}")
+    report = ImportReport()
+    t0 = time.perf_counter()
+    workers = os.cpu_count() if workers is None else workers
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers else None
+    try:
+        chunk = []
+        for item in iter_rows(stream, fmt):
+            report.rows += 1
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                _import_chunk(chunk, report, pool, workers, dry_run)
+                chunk = []
+        if chunk:
+            _import_chunk(chunk, report, pool, workers, dry_run)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    report.errors.sort(key=lambda e: e.line)
+    if report.created:
+        # пакетний запис обійшов post_save — оновлюємо похідне одним кроком
+        versions.bump(Profile)
+        paging.invalidate_counts()
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def text_stream(binary) -> io.TextIOWrapper:
+    """Текстовий потік із файлу, завантаженого через форму (UTF-8, з BOM чи без)."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
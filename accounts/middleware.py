@@ -0,0 +1,18 @@
+# accounts/middleware.py
+from django.utils.functional import SimpleLazyObject
+
+from .claims import get_claims
+
+
+class RoleClaimsMiddleware:
+    """
+    Додає request.claims — роль і профіль користувача з сесії (accounts/claims.py).
+    Має стояти після SessionMiddleware і AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.claims = SimpleLazyObject(lambda: get_claims(request))
+        return self.get_response(request)
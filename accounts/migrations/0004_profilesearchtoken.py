@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_profile_specialization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=32)),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='accounts.profile')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='profilesearchtoken',
+            index=models.Index(fields=['role', 'token'], name='accounts_pr_role_0066c5_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_profilesearchtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='username',
+            field=models.CharField(blank=True, default='', max_length=150, verbose_name='Логін'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='first_name',
+            field=models.CharField(blank=True, default='', max_length=150, verbose_name='Ім’я'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='last_name',
+            field=models.CharField(blank=True, default='', max_length=150, verbose_name='Прізвище'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['role', 'last_name', 'first_name'], name='accounts_pr_role_f65126_idx'),
+        ),
+    ]
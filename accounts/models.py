@@ -34,6 +34,11 @@ class Profile(models.Model):
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
 
+    # копії полів User для сортування й відображення без join (синхронізуються сигналами)
+    username = models.CharField("Логін", max_length=150, blank=True, default="")
+    first_name = models.CharField("Ім’я", max_length=150, blank=True, default="")
+    last_name = models.CharField("Прізвище", max_length=150, blank=True, default="")
+
     birth_date = models.DateField("Дата народження", null=True, blank=True)
     phone = models.CharField("Телефон", max_length=32)
     email = models.EmailField("Email")
@@ -75,6 +80,7 @@ class Profile(models.Model):
         indexes = [
             models.Index(fields=["role"]),
             models.Index(fields=["gender"]),
+            models.Index(fields=["role", "last_name", "first_name"]),
         ]
 
     def clean(self):
@@ -86,9 +92,30 @@ class Profile(models.Model):
 
     @property
     def display_name(self) -> str:
-        """Ім’я для відображення: ім’я + прізвище з User, або логін."""
-        full = f"{self.user.first_name} {self.user.last_name}".strip()
-        return full or self.user.username
+        """Ім’я для відображення: ім’я + прізвище, або логін."""
+        full = f"{self.first_name} {self.last_name}".strip()
+        return full or self.username or self.user.username
 
     def __str__(self):
         return f"{self.display_name} ({self.role})"
+
+
+USER_MIRROR_FIELDS = ("username", "first_name", "last_name")
+
+
+class ProfileSearchToken(models.Model):
+    """Нормалізований токен пошуку людей (див. accounts/search.py)."""
+
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="search_tokens")
+    # копія Profile.role: пошук у вкладці — один префіксний запит по індексу (role, token)
+    role = models.CharField(max_length=32)
+    token = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["role", "token"]),
+        ]
+
+    def __str__(self):
+        return f"{self.token} → {self.profile_id}"
@@ -0,0 +1,128 @@
+# accounts/paging.py
+"""
+Keyset-пагінація довідника людей і кешовані лічильники вкладок.
+
+Сторінка — це «наступні PAGE_SIZE рядків після курсора»: умова на ключі
+сортування замість OFFSET, тож будь-яка сторінка читається по індексу за
+однаковий час. Курсор — підписані значення ключів крайнього рядка і його
+позиція (для нумерації), тому підробити його не можна.
+
+Кількість людей у вкладках береться з кешу (COUNT_TTL) і рахується лише
+по Profile.role, без join із User.
+"""
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import Profile
+
+PAGE_SIZE = 50
+COUNT_TTL = 300
+COUNT_PREFIX = "accounts:people:count"
+CURSOR_SALT = "accounts.people.cursor"
+
+# ключі сортування; останній ключ кожного набору унікальний
+SORT_KEYS = {
+    "name": ("last_name", "first_name", "username"),
+    "created": ("user__date_joined", "id"),
+    "username": ("username",),
+}
+DATETIME_KEYS = {"user__date_joined"}
+
+
+def _row_values(obj, keys):
+    values = []
+    for key in keys:
+        value = obj
+        for part in key.split("__"):
+            value = getattr(value, part)
+        values.append(value.isoformat() if key in DATETIME_KEYS else value)
+    return values
+
+
+def encode_cursor(obj, keys, position) -> str:
+    return signing.dumps({"v": _row_values(obj, keys), "p": position}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token, keys):
+    """(значення ключів, позиція) або None для пошкодженого курсора."""
+    try:
+        data = signing.loads(token, salt=CURSOR_SALT)
+        values, position = data["v"], int(data["p"])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+    if len(values) != len(keys):
+        return None
+    values = [parse_datetime(v) if key in DATETIME_KEYS else v for key, v in zip(keys, values)]
+    return values, position
+
+
+def _beyond(keys, values, forward) -> Q:
+    """Рядки строго після (forward) або перед курсором у порядку ключів."""
+    op = "gt" if forward else "lt"
+    cond, equal = Q(), Q()
+    for key, value in zip(keys, values):
+        cond |= equal & Q(**{f"{key}__{op}": value})
+        equal &= Q(**{key: value})
+    return cond
+
+
+class KeysetPage:
+    def __init__(self, items, start, next_cursor, prev_cursor):
+        self.items = items
+        # позиція першого рядка сторінки (з нуля) — для нумерації
+        self.start = start
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+def keyset_page(qs, sort, asc, after=None, before=None, size=None) -> KeysetPage:
+    size = size or PAGE_SIZE
+    keys = SORT_KEYS[sort]
+    ordering = [key if asc else f"-{key}" for key in keys]
+    cursor = decode_cursor(before or after, keys) if (before or after) else None
+
+    if cursor and before:
+        values, position = cursor
+        # назад — у зворотному порядку від першого рядка поточної сторінки
+        reverse = [key[1:] if key.startswith("-") else f"-{key}" for key in ordering]
+        rows = list(qs.filter(_beyond(keys, values, not asc)).order_by(*reverse)[:size + 1])
+        has_prev = len(rows) > size
+        items = rows[:size][::-1]
+        start = max(position - len(items), 0)
+        has_next = True
+    else:
+        if cursor:
+            values, start = cursor
+            qs = qs.filter(_beyond(keys, values, asc))
+        else:
+            start = 0
+        rows = list(qs.order_by(*ordering)[:size + 1])
+        has_next = len(rows) > size
+        items = rows[:size]
+        has_prev = cursor is not None and start > 0
+
+    return KeysetPage(
+        items,
+        start,
+        encode_cursor(items[-1], keys, start + len(items)) if has_next and items else None,
+        encode_cursor(items[0], keys, start) if has_prev and items else None,
+    )
+
+
+def role_counts() -> dict:
+    """{роль: кількість профілів} — з кешу, інакше COUNT по індексу role."""
+    keys = {role: f"{COUNT_PREFIX}:{role}" for role in Profile.Role.values}
+    cached = cache.get_many(keys.values())
+    counts = {}
+    for role, key in keys.items():
+        if key not in cached:
+            cached[key] = Profile.objects.filter(role=role).count()
+            cache.set(key, cached[key], COUNT_TTL)
+        counts[role] = cached[key]
+    return counts
+
+
+def invalidate_counts() -> None:
+    cache.delete_many([f"{COUNT_PREFIX}:{role}" for role in Profile.Role.values])
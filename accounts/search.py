@@ -0,0 +1,176 @@
+# accounts/search.py
+"""
+Пошук людей за префіксами токенів замість icontains по п'яти полях.
+
+Для кожного профілю зберігаються нормалізовані токени (ProfileSearchToken):
+слова імені, прізвища і логіну в нижньому регістрі — як є і в латинській
+транслітерації, email і його локальна частина, цифри телефону (повністю
+і без коду країни). Токени перебудовуються сигналами при збереженні
+User і Profile (accounts/signals.py), а командою rebuild_search_tokens —
+для всієї бази.
+
+Запит розбивається на слова; кожне слово шукається як префікс токена —
+діапазоном [слово, слово + PREFIX_END) по індексу (role, token), без LIKE:
+djongo перекладає startswith у $regex без екранування, і «+», «(» чи «\\»
+у слові ламали б пошук на MongoDB. Профіль має збігтися з усіма словами;
+ранг — сума ваг найкращих збігів, точний збіг важить удвічі більше за
+префіксний.
+"""
+import re
+
+from .models import Profile, ProfileSearchToken
+
+TOKEN_MAX_LENGTH = 64
+# скільки збігів одного слова запиту читається з індексу
+SEARCH_CANDIDATES = 2000
+SEARCH_LIMIT = 200
+MIN_PHONE_DIGITS = 3
+# більший за будь-який символ рядка — верхня межа діапазону префікса
+PREFIX_END = "\U0010ffff"
+
+LAST_NAME, FIRST_NAME, USERNAME, EMAIL, PHONE = 5, 4, 3, 2, 2
+
+TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e", "є": "ie",
+    "ж": "zh", "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i", "к": "k", "л": "l",
+    "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch", "ь": "", "ю": "iu",
+    "я": "ia", "ё": "e", "ы": "y", "э": "e", "ъ": "",
+}
+
+WORD_RE = re.compile(r"[^\W_]+")
+APOSTROPHES = str.maketrans("", "", "'’ʼ`")
+PHONE_RE = re.compile(r"[\d\s()+\-]+")
+
+
+def transliterate(text: str) -> str:
+    return "".join(TRANSLIT.get(ch, ch) for ch in text)
+
+
+def words(text: str) -> list:
+    """Слова в нижньому регістрі; апостроф не розриває слово (Мар'яна)."""
+    return WORD_RE.findall((text or "").lower().translate(APOSTROPHES))
+
+
+def digits(text: str) -> str:
+    return re.sub(r"\D", "", text or "")
+
+
+def variants(word: str) -> set:
+    return {word, transliterate(word)} - {""}
+
+
+def profile_tokens(profile) -> dict:
+    """{токен: вага} профілю."""
+    found = {}
+
+    def add(token, weight):
+        token = token[:TOKEN_MAX_LENGTH]
+        if token and found.get(token, 0) < weight:
+            found[token] = weight
+
+    for text, weight in ((profile.last_name, LAST_NAME), (profile.first_name, FIRST_NAME), (profile.username, USERNAME)):
+        for word in words(text):
+            for variant in variants(word):
+                add(variant, weight)
+
+    email = (profile.email or "").strip().lower()
+    if email:
+        add(email, EMAIL)
+        add(email.split("@", 1)[0], EMAIL)
+
+    phone = digits(profile.phone)
+    if phone:
+        add(phone, PHONE)
+        # 380671234567 знаходиться і за 0671234567, і за 671234567
+        for tail in (10, 9):
+            if len(phone) > tail:
+                add(phone[-tail:], PHONE)
+    return found
+
+
+def reindex(profile) -> None:
+    """Перебудовує токени одного профілю."""
+    ProfileSearchToken.objects.filter(profile_id=profile.pk).delete()
+    ProfileSearchToken.objects.bulk_create([
+        ProfileSearchToken(profile_id=profile.pk, role=profile.role, token=token, weight=weight)
+        for token, weight in profile_tokens(profile).items()
+    ])
+
+
+def index(profiles, batch_size=None) -> None:
+    """Додає токени нових профілів пакетом (без видалення старих)."""
+    ProfileSearchToken.objects.bulk_create([
+        ProfileSearchToken(profile_id=profile.pk, role=profile.role, token=token, weight=weight)
+        for profile in profiles
+        for token, weight in profile_tokens(profile).items()
+    ], batch_size=batch_size)
+
+
+def reindex_all(batch_size=1000) -> int:
+    """Перебудовує токени всіх профілів пакетами. Повертає кількість профілів."""
+    ProfileSearchToken.objects.all().delete()
+    total, last_pk = 0, 0
+    while True:
+        batch = list(Profile.objects.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+        if not batch:
+            return total
+        index(batch, batch_size=batch_size)
+        total += len(batch)
+        last_pk = batch[-1].pk
+
+
+def query_terms(q: str) -> list:
+    """Варіанти кожного слова запиту: слово, транслітерація, цифри телефону."""
+    q = (q or "").strip()
+    if PHONE_RE.fullmatch(q) and len(digits(q)) >= MIN_PHONE_DIGITS:
+        # «+38 (067) 123-45» — один номер, а не кілька слів
+        return [{digits(q)}]
+    terms = []
+    for raw in q.split():
+        if "@" in raw:
+            terms.append({raw.lower()[:TOKEN_MAX_LENGTH]})
+            continue
+        options = set()
+        for word in words(raw):
+            options |= variants(word)
+        number = digits(raw)
+        if len(number) >= MIN_PHONE_DIGITS:
+            options.add(number)
+        if options:
+            terms.append(options)
+    return terms
+
+
+def _matches(role, options) -> dict:
+    """{profile_id: найкраща вага} для одного слова запиту."""
+    qs = ProfileSearchToken.objects.filter(role=role)
+    best = {}
+    for option in options:
+        prefix = option[:TOKEN_MAX_LENGTH]
+        for profile_id, token, weight in (
+            qs.filter(token__gte=prefix, token__lt=prefix + PREFIX_END)
+            .values_list("profile_id", "token", "weight")[:SEARCH_CANDIDATES]
+        ):
+            score = weight * 2 if token == option else weight
+            if best.get(profile_id, 0) < score:
+                best[profile_id] = score
+    return best
+
+
+def search(role, q, limit=SEARCH_LIMIT) -> list:
+    """id профілів ролі role, що відповідають усім словам q, від найкращого збігу."""
+    terms = query_terms(q)
+    if not terms:
+        return []
+    scores = None
+    # спершу найдовші (найвибірковіші) слова — менше кандидатів на перетин
+    for options in sorted(terms, key=lambda o: -max(map(len, o))):
+        best = _matches(role, options)
+        if scores is None:
+            scores = best
+        else:
+            scores = {pk: score + best[pk] for pk, score in scores.items() if pk in best}
+        if not scores:
+            return []
+    return sorted(scores, key=lambda pk: (-scores[pk], pk))[:limit]
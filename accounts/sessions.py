@@ -0,0 +1,35 @@
+# accounts/sessions.py
+"""
+Сесії "cached_db", у яких кеш лише прискорює читання, а база лишається головною.
+
+Стандартний cached_db кладе сесію в кеш на весь строк її життя. З кешем процесу
+(LocMem) вихід у одному воркері видаляє запис лише з його кешу, а інші воркери
+й далі віддають сесію з власних копій. Тут час життя запису в кеші обмежено
+TIMEOUT псевдоніма SESSION_CACHE_ALIAS: після нього сесія перечитується з бази.
+"""
+from django.contrib.sessions.backends import cached_db
+
+
+class _CappedCache:
+    """Обгортка кешу: явний timeout у set() не перевищує TIMEOUT бекенду."""
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def set(self, key, value, timeout):
+        limit = self._cache.default_timeout
+        if limit is not None:
+            timeout = min(timeout, limit)
+        self._cache.set(key, value, timeout)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+
+class SessionStore(cached_db.SessionStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = _CappedCache(self._cache)
@@ -1,9 +1,9 @@
-
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import Profile
+from . import claims, paging, search
+from .models import USER_MIRROR_FIELDS, Profile
 
 @receiver(post_save, sender=User)
 def create_profile_for_new_user(sender, instance, created, **kwargs):
@@ -11,4 +11,48 @@ def create_profile_for_new_user(sender, instance, created, **kwargs):
         Profile.objects.get_or_create(
             user=instance,
             defaults={"role": Profile.Role.CLIENT}
-        )
\ No newline at end of file
+        )
+
+
+@receiver(pre_save, sender=Profile)
+def copy_user_fields(sender, instance, **kwargs):
+    for name in USER_MIRROR_FIELDS:
+        setattr(instance, name, getattr(instance.user, name))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_role_claims(sender, instance, **kwargs):
+    # роль або профіль змінились — claims у сесіях користувача перечитаються
+    claims.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=Profile)
+def reindex_profile_search(sender, instance, **kwargs):
+    search.reindex(instance)
+
+
+@receiver(post_save, sender=User)
+def sync_user_fields(sender, instance, created, update_fields=None, **kwargs):
+    # Новий користувач потрапляє в профіль при його створенні (copy_user_fields).
+    # Підключено раніше за core.signals.trainer_renamed (accounts стоїть першим
+    # в INSTALLED_APPS), тож розклад перебудовується вже з новим ім'ям.
+    if created:
+        return
+    if update_fields is not None and not set(USER_MIRROR_FIELDS) & set(update_fields):
+        return
+    profile = Profile.objects.filter(user=instance).first()
+    if not profile:
+        return
+    values = {name: getattr(instance, name) for name in USER_MIRROR_FIELDS}
+    if any(getattr(profile, name) != value for name, value in values.items()):
+        Profile.objects.filter(pk=profile.pk).update(**values)
+        for name, value in values.items():
+            setattr(profile, name, value)
+    search.reindex(profile)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def reset_people_counts(sender, instance, **kwargs):
+    paging.invalidate_counts()
@@ -1,9 +1,13 @@
 from django import template
+
+from accounts.claims import claims_for_user
+
 register = template.Library()
 
 @register.filter
 def is_role(user, role_name: str):
+    # профіль користувача сесії вже завантажено бекендом разом із User
     try:
-        return getattr(user, "profile", None) and user.profile.role == role_name
+        return claims_for_user(user).role == role_name
     except Exception:
         return False
@@ -1,8 +1,27 @@
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-from accounts.models import Profile
+from accounts import importer, paging
+from accounts.backends import ProfileModelBackend
+from accounts.claims import SESSION_CLAIMS_KEY, get_claims
+from accounts.models import Profile, ProfileSearchToken
+from accounts.sessions import SessionStore
+from accounts.search import search
 
 
 def first_choice_value(model, field_name, default=None):
@@ -72,3 +91,311 @@ class ProfileValidationTests(TestCase):
 
         profile.full_clean()
         profile.save()
+
+
+def shared_caches():
+    """CACHES зі спільним для процесів бекендом (файли) — як Redis/Memcached у продакшені."""
+    location = tempfile.mkdtemp()
+    return {
+        alias: {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": f"{location}/{alias}"}
+        for alias in ("default", "sessions")
+    }
+
+
+@override_settings(CACHES=shared_caches())
+class RoleClaimsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="claims_mgr")
+        self.profile = Profile.objects.get(user=self.user)
+        self.profile.role = Profile.Role.MANAGER
+        self.profile.save()
+        self.client.force_login(self.user)
+
+    def _request(self):
+        request = RequestFactory().get("/")
+        request.session = self.client.session
+        request.session.keys()
+        AuthenticationMiddleware(lambda r: None).process_request(request)
+        return request
+
+    def test_backend_loads_profile_with_user(self):
+        with self.assertNumQueries(1):
+            user = ProfileModelBackend().get_user(self.user.pk)
+            self.assertEqual(user.profile.role, Profile.Role.MANAGER)
+
+    def test_claims_are_served_from_session_without_queries(self):
+        self.client.get(reverse("price"))
+        self.assertEqual(self.client.session[SESSION_CLAIMS_KEY]["role"], Profile.Role.MANAGER)
+
+        request = self._request()
+        with self.assertNumQueries(0):
+            claims = get_claims(request)
+            self.assertTrue(claims.is_manager)
+            self.assertEqual(claims.profile_id, self.profile.pk)
+
+    def test_profile_change_invalidates_claims(self):
+        self.client.get(reverse("price"))
+        self.profile.role = Profile.Role.CLIENT
+        self.profile.save()
+
+        self.assertTrue(get_claims(self._request()).is_client)
+        self.client.get(reverse("price"))
+        self.assertEqual(self.client.session[SESSION_CLAIMS_KEY]["role"], Profile.Role.CLIENT)
+
+
+class ProcessLocalClaimsTests(TestCase):
+    def test_claims_are_not_cached_without_shared_cache(self):
+        user = User.objects.create_user(username="claims_local")
+        Profile.objects.filter(user=user).update(role=Profile.Role.MANAGER)
+        self.client.force_login(user)
+        self.client.get(reverse("price"))
+        self.assertNotIn(SESSION_CLAIMS_KEY, self.client.session)
+
+        # зміна ролі в іншому процесі (без сигналу в цьому) видна одразу
+        Profile.objects.filter(user=user).update(role=Profile.Role.CLIENT)
+        request = RequestFactory().get("/")
+        request.session = self.client.session
+        AuthenticationMiddleware(lambda r: None).process_request(request)
+        self.assertTrue(get_claims(request).is_client)
+
+
+class SessionStrategyTests(TestCase):
+    def test_cached_db_session_expires_from_cache_and_falls_back_to_db(self):
+        store = SessionStore()
+        store["flag"] = 1
+        store.create()
+        # вихід в іншому процесі: рядок у базі видалено, а кеш цього процесу — ні
+        Session.objects.filter(session_key=store.session_key).delete()
+        self.assertEqual(SessionStore(store.session_key).load(), {"flag": 1})
+
+        later = time.time() + settings.SESSION_CACHE_TIMEOUT + 1
+        with patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(SessionStore(store.session_key).load(), {})
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_signed_cookies_keep_login_without_session_rows(self):
+        User.objects.create_user(username="cookie_user", password="pass12345")
+        resp = self.client.post(reverse("accounts:login"), {"username": "cookie_user", "password": "pass12345"})
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(self.client.get(reverse("accounts:profile")).status_code, 200)
+        self.assertFalse(Session.objects.exists())
+
+        self.client.post(reverse("accounts:logout"))
+        resp = self.client.get(reverse("accounts:profile"))
+        self.assertEqual(resp.status_code, 302)
+        self.assertIn(settings.LOGIN_URL, resp["Location"])
+
+
+class PeopleSearchTests(TestCase):
+    def setUp(self):
+        self.olena = Profile.objects.get(user=User.objects.create_user(
+            username="olena_k", first_name="Олена", last_name="Коваленко", email="olena@example.com"))
+        self.olena.phone = "+38 (067) 123-45-67"
+        self.olena.email = "olena@example.com"
+        self.olena.save()
+        self.ivan = Profile.objects.get(user=User.objects.create_user(
+            username="ivan", first_name="Іван", last_name="Олешко"))
+
+    def test_prefix_transliterated_and_phone_queries(self):
+        self.assertEqual(search(Profile.Role.CLIENT, "ковал"), [self.olena.pk])
+        self.assertEqual(search(Profile.Role.CLIENT, "Kovalenko olena"), [self.olena.pk])
+        self.assertEqual(search(Profile.Role.CLIENT, "067 123"), [self.olena.pk])
+        self.assertEqual(search(Profile.Role.CLIENT, "olena@example.com"), [self.olena.pk])
+        self.assertEqual(search(Profile.Role.TRAINER, "ковал"), [])
+
+    def test_regex_metacharacters_are_matched_literally(self):
+        plus = Profile.objects.get(user=User.objects.create_user(username="plus_mail"))
+        plus.email = "a+b@x.com"
+        plus.save()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(search(Profile.Role.CLIENT, "a+b@x.com"), [plus.pk])
+            self.assertEqual(search(Profile.Role.CLIENT, "a+b@"), [plus.pk])
+            self.assertEqual(search(Profile.Role.CLIENT, "(a@x"), [])
+            self.assertEqual(search(Profile.Role.CLIENT, "[\\@"), [])
+        # префікс шукається діапазоном — djongo не будує з нього $regex
+        self.assertFalse([q["sql"] for q in ctx.captured_queries if " LIKE " in q["sql"].upper()])
+
+    def test_results_are_ranked_and_follow_renames(self):
+        # «оле» — префікс імені Олени (вага імені) і прізвища Олешка (вага прізвища)
+        self.assertEqual(search(Profile.Role.CLIENT, "оле"), [self.ivan.pk, self.olena.pk])
+        self.ivan.user.last_name = "Петренко"
+        self.ivan.user.save()
+        self.assertEqual(search(Profile.Role.CLIENT, "оле"), [self.olena.pk])
+
+    def test_rebuild_command_and_people_view(self):
+        ProfileSearchToken.objects.all().delete()
+        call_command("rebuild_search_tokens", stdout=StringIO())
+        manager = User.objects.create_user(username="search_mgr")
+        Profile.objects.filter(user=manager).update(role=Profile.Role.MANAGER)
+        self.client.force_login(manager)
+        resp = self.client.get(reverse("accounts:people"), {"q": "olesh"})
+        self.assertEqual([p.pk for p in resp.context["profiles"]], [self.ivan.pk])
+
+
+class PeoplePaginationTests(TestCase):
+    def setUp(self):
+        for i in range(7):
+            User.objects.create_user(username=f"page_{i}", last_name=f"Прізвище{i % 3}", first_name=f"Ім'я{i}")
+        manager = User.objects.create_user(username="page_mgr")
+        Profile.objects.filter(user=manager).update(role=Profile.Role.MANAGER)
+        self.client.force_login(manager)
+
+    def _walk(self, sort, direction):
+        seen, starts, params = [], [], {"sort": sort, "dir": direction}
+        while True:
+            resp = self.client.get(reverse("accounts:people"), params)
+            seen += [p.user.username for p in resp.context["profiles"]]
+            starts.append(resp.context["start"])
+            page = resp.context["page"]
+            if not page.next_cursor:
+                return seen, starts, resp
+            params = {"sort": sort, "dir": direction, "after": page.next_cursor}
+
+    def test_keyset_pages_cover_all_rows_in_sort_order(self):
+        with patch.object(paging, "PAGE_SIZE", 3):
+            for sort, key in (
+                ("name", lambda p: (p.user.last_name, p.user.first_name, p.user.username)),
+                ("created", lambda p: (p.user.date_joined, p.pk)),
+                ("username", lambda p: p.user.username),
+            ):
+                expected = [p.user.username for p in sorted(
+                    Profile.objects.filter(role=Profile.Role.CLIENT).select_related("user"), key=key, reverse=True)]
+                seen, starts, resp = self._walk(sort, "desc")
+                self.assertEqual(seen, expected)
+                self.assertEqual(starts, [0, 3, 6])
+
+            back = self.client.get(reverse("accounts:people"), {
+                "sort": "username", "dir": "desc", "before": resp.context["page"].prev_cursor,
+            })
+            self.assertEqual([p.user.username for p in back.context["profiles"]], expected[3:6])
+            self.assertEqual(back.context["start"], 3)
+
+    def test_tab_counts_are_cached(self):
+        resp = self.client.get(reverse("accounts:people"))
+        self.assertEqual(resp.context["counts"][Profile.Role.CLIENT], 7)
+        with self.assertNumQueries(0):
+            paging.role_counts()
+        User.objects.create_user(username="page_new")
+        self.assertEqual(paging.role_counts()[Profile.Role.CLIENT], 8)
+        self.assertEqual(
+            self.client.get(reverse("accounts:people"), {"after": "підроблений"}).context["start"], 0
+        )
+
+
+class ProfileUserFieldsTests(TestCase):
+    def test_user_fields_are_mirrored_on_create_and_rename(self):
+        user = User.objects.create_user(username="mirror", first_name="Марія", last_name="Бондар")
+        profile = Profile.objects.get(user=user)
+        self.assertEqual((profile.username, profile.first_name, profile.last_name), ("mirror", "Марія", "Бондар"))
+
+        user.last_name = "Ткаченко"
+        user.save()
+        self.assertEqual(Profile.objects.filter(last_name="Ткаченко").get().pk, profile.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(Profile.objects.get(pk=profile.pk).display_name, "Марія Ткаченко")
+
+    def test_backfill_command_fills_existing_rows(self):
+        user = User.objects.create_user(username="legacy", first_name="Ігор", last_name="Савчук")
+        Profile.objects.filter(user=user).update(username="", first_name="", last_name="")
+        out = StringIO()
+        call_command("backfill_profile_names", stdout=out)
+        self.assertIn("оновлено профілів: 1", out.getvalue())
+        self.assertEqual(Profile.objects.get(user=user).last_name, "Савчук")
+        self.assertEqual(search(Profile.Role.CLIENT, "savchuk"), [user.profile.pk])
+
+
+class UserImportTests(TestCase):
+    CSV = (
+        "username,password,email,first_name,last_name,phone,gender,role\n"
+        "imp_anna,Sup3r-secret-1,anna@example.com,Анна,Литвин,+380501112233,female,client\n"
+        "imp_bad,,not-an-email,,,,,client\n"
+        "imp_anna,Sup3r-secret-1,,,,,,client\n"
+        "imp_coach,,,Петро,Гнатюк,,,trainer\n"
+        "imp_oleg,,oleg@example.com,Олег,Мороз,,,\n"
+    )
+
+    def test_csv_import_creates_rows_and_reports_errors(self):
+        User.objects.create_user(username="imp_oleg")
+        report = importer.import_users(StringIO(self.CSV), importer.CSV, workers=0, chunk_size=2)
+
+        self.assertEqual((report.rows, report.created), (5, 1))
+        self.assertEqual([(e.line, e.username) for e in report.errors], [
+            (3, "imp_bad"), (4, "imp_anna"), (5, "imp_coach"), (6, "imp_oleg"),
+        ])
+        self.assertIn("email", report.errors[0].message)
+        self.assertIn("status", report.errors[2].message)
+
+        anna = Profile.objects.get(user__username="imp_anna")
+        self.assertEqual((anna.last_name, anna.phone, anna.role), ("Литвин", "+380501112233", Profile.Role.CLIENT))
+        self.assertTrue(anna.user.check_password("Sup3r-secret-1"))
+        self.assertEqual(search(Profile.Role.CLIENT, "lytvyn"), [anna.pk])
+
+    def test_ndjson_import_hashes_in_process_pool(self):
+        lines = "\n".join([
+            '{"username": "nd_1", "password": "Sup3r-secret-1", "last_name": "Шевчук"}',
+            "не json",
+            '{"username": "nd_2", "role": "manager"}',
+        ])
+        report = importer.import_users(StringIO(lines), importer.NDJSON, workers=2)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([(e.line, e.message) for e in report.errors], [(2, "Некоректний JSON")])
+        self.assertTrue(User.objects.get(username="nd_1").check_password("Sup3r-secret-1"))
+        self.assertFalse(User.objects.get(username="nd_2").has_usable_password())
+        self.assertEqual(Profile.objects.get(user__username="nd_2").role, Profile.Role.MANAGER)
+
+    def _flaky_write(self, inserted, error):
+        """Перший запис пакета: логін першого рядка зайняли паралельно, вставлено inserted рядків."""
+        real_write, calls = importer._write, []
+
+        def write(users, profiles):
+            if not calls:
+                calls.append(users)
+                User.objects.create_user(username=users[0].username)
+                User.objects.bulk_create(users[1:1 + inserted])
+                raise error
+            return real_write(users, profiles)
+        return patch.object(importer, "_write", write)
+
+    CONCURRENT = (
+        "username,password,email\n"
+        "race_a,,a@example.com\nrace_b,,b@example.com\nrace_c,,c@example.com\n"
+    )
+
+    def test_partial_insert_gets_profiles_and_taken_row_is_reported(self):
+        # djongo insert_many(ordered=False): решта пакета вже вставлена
+        with self._flaky_write(2, DatabaseError("E11000 duplicate key")):
+            report = importer.import_users(StringIO(self.CONCURRENT), importer.CSV, workers=0)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([(e.line, e.message) for e in report.errors], [(2, importer.TAKEN)])
+        for username in ("race_b", "race_c"):
+            self.assertEqual(User.objects.get(username=username).profile.email, f"{username[-1]}@example.com")
+
+    def test_rolled_back_batch_is_written_row_by_row(self):
+        with self._flaky_write(0, IntegrityError("UNIQUE constraint failed")):
+            report = importer.import_users(StringIO(self.CONCURRENT), importer.CSV, workers=0)
+        self.assertEqual(report.created, 2)
+        self.assertEqual(Profile.objects.filter(username__startswith="race_").count(), 3)
+
+    def test_non_duplicate_database_error_is_raised(self):
+        def broken(users, profiles):
+            raise DatabaseError("connection reset")
+        with patch.object(importer, "_write", broken), self.assertRaises(DatabaseError):
+            importer.import_users(StringIO(self.CONCURRENT), importer.CSV, workers=0)
+
+    def test_manager_upload_page_and_command(self):
+        manager = User.objects.create_user(username="imp_mgr")
+        Profile.objects.filter(user=manager).update(role=Profile.Role.MANAGER)
+        self.client.force_login(manager)
+        upload = SimpleUploadedFile("members.csv", self.CSV.encode("utf-8-sig"))
+        resp = self.client.post(reverse("accounts:user_import"), {"file": upload, "dry_run": "on"})
+        self.assertEqual(resp.context["report"].valid, 2)
+        self.assertFalse(User.objects.filter(username="imp_anna").exists())
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8", delete=False) as f:
+            f.write(self.CSV)
+        self.addCleanup(os.remove, f.name)
+        out, err = StringIO(), StringIO()
+        call_command("import_users", f.name, "--workers", "0", stdout=out, stderr=err)
+        self.assertIn("створено: 2", out.getvalue())
+        self.assertIn("рядків/с", out.getvalue())
+        self.assertIn("рядок 3 [imp_bad]", err.getvalue())
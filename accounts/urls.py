@@ -8,6 +8,7 @@ app_name = "accounts"
 urlpatterns = [
     path("people/", views.people, name="people"),
     path("people/create/", views.user_create, name="user_create"),
+    path("people/import/", views.user_import, name="user_import"),
     path("people/<int:pk>/edit/", views.user_edit, name="user_edit"),
     path("people/<int:pk>/password/", views.user_password_reset, name="user_password_reset"),
     path("people/<int:pk>/delete/", views.user_delete, name="user_delete"),
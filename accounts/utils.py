@@ -2,6 +2,8 @@
 from functools import wraps
 from django.http import HttpResponseForbidden
 
+from .claims import get_claims
+
 def role_required(*roles):
     def wrapper(view_func):
         @wraps(view_func)
@@ -10,11 +12,7 @@ def role_required(*roles):
             if not user.is_authenticated:
                 from django.contrib.auth.views import redirect_to_login
                 return redirect_to_login(request.get_full_path())
-            try:
-                role = getattr(user, "profile", None).role
-            except Exception:
-                role = None
-            if role in roles:
+            if get_claims(request).has_role(*roles):
                 return view_func(request, *args, **kwargs)
             return HttpResponseForbidden("Доступ заборонено")
         return _wrapped
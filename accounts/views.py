@@ -6,9 +6,9 @@ from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
-from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 
+from . import importer, paging, search
 from .models import Profile
 from .forms import (
     UserRegistrationForm,
@@ -18,6 +18,7 @@ from .forms import (
     UserEditForm,
     ProfileEditForm,
     PasswordSetForm,
+    UserImportForm,
 )
 
 def register_view(request):
@@ -131,28 +132,29 @@ def people(request):
     )
 
     q = (request.GET.get("q") or "").strip()
+    ranked_ids = None
     if q:
-        qs = qs.filter(
-            Q(user__username__icontains=q) |
-            Q(user__first_name__icontains=q) |
-            Q(user__last_name__icontains=q) |
-            Q(phone__icontains=q) |
-            Q(email__icontains=q)
-        )
+        # префіксний пошук по індексу токенів замість icontains по п'яти полях
+        ranked_ids = search.search(role, q)
+        qs = qs.filter(pk__in=ranked_ids)
 
     sort = request.GET.get("sort", "name")
+    if sort not in paging.SORT_KEYS:
+        sort = "name"
     dir_ = request.GET.get("dir", "asc").lower()
     asc = (dir_ == "asc")
 
-    if sort == "created":
-        order_fields = ["user__date_joined" if asc else "-user__date_joined"]
-    elif sort == "name":
-        base = ["user__last_name", "user__first_name", "user__username"]
-        order_fields = base if asc else [f"-{f}" for f in base]
+    page = None
+    if ranked_ids is not None and "sort" not in request.GET:
+        # без явного сортування — від найкращого збігу (не більше search.SEARCH_LIMIT)
+        rank = {pk: i for i, pk in enumerate(ranked_ids)}
+        profiles = sorted(qs, key=lambda p: rank[p.pk])
+        sort = ""
     else:
-        order_fields = ["user__username" if asc else "-user__username"]
-
-    profiles = qs.order_by(*order_fields)
+        page = paging.keyset_page(
+            qs, sort, asc, after=request.GET.get("after"), before=request.GET.get("before"),
+        )
+        profiles = page.items
 
     can_manage = (
         request.user.is_authenticated and
@@ -165,6 +167,11 @@ def people(request):
         "accounts/people_list.html",
         {
             "profiles": profiles,
+            "page": page,
+            "start": page.start if page else 0,
+            "end": (page.start if page else 0) + len(profiles),
+            "counts": paging.role_counts(),
+            "found": len(ranked_ids) if ranked_ids is not None else None,
             "kind": kind,
             "q": q,
             "sort": sort,
@@ -213,6 +220,41 @@ def user_create(request):
     )
 
 
+IMPORT_ERRORS_SHOWN = 200
+# у веб-запиті паролі хешуються без пулу процесів: форк воркера з відкритим
+# MongoClient небезпечний. Великі файли — командою import_users.
+IMPORT_WORKERS = 0
+
+
+@login_required
+def user_import(request):
+    """Масовий імпорт користувачів із файлу (менеджер)."""
+    _require_manager(request)
+
+    report = None
+    if request.method == "POST":
+        form = UserImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            report = importer.import_users(
+                importer.text_stream(upload.file),
+                importer.detect_format(upload.name),
+                workers=IMPORT_WORKERS,
+                dry_run=form.cleaned_data["dry_run"],
+            )
+            if report.created:
+                messages.success(request, f"Створено користувачів: {report.created}.")
+    else:
+        form = UserImportForm()
+
+    return render(request, "accounts/user_import.html", {
+        "form": form,
+        "report": report,
+        "errors": report.errors[:IMPORT_ERRORS_SHOWN] if report else [],
+        "columns": importer.COLUMNS,
+    })
+
+
 @login_required
 @transaction.atomic
 def user_edit(request, pk):
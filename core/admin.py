@@ -1,8 +1,8 @@
 from django.contrib import admin
 from .models import (
-    GymHall, GroupClass, GroupEnrollment,
+    GymHall, GroupClass, GroupClassSeries, GroupEnrollment,
     IndividualSlot, IndividualBooking,
-    SiteInfo, Tariff
+    SiteInfo, Tariff, WaitlistEntry
 )
 
 @admin.register(SiteInfo)
@@ -31,8 +31,19 @@ class TariffAdmin(admin.ModelAdmin):
     search_fields = ("name", "duration_label")
 
 
+@admin.register(GroupClass)
+class GroupClassAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # лише поля форми: enrolled_count змінюють атомарні записи (core/booking.py)
+        columns = {f.name for f in obj._meta.concrete_fields}
+        obj.save(update_fields=[name for name in form.fields if name in columns])
+
+
 admin.site.register(GymHall)
-admin.site.register(GroupClass)
+admin.site.register(GroupClassSeries)
 admin.site.register(GroupEnrollment)
+admin.site.register(WaitlistEntry)
 admin.site.register(IndividualSlot)
 admin.site.register(IndividualBooking)
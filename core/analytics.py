@@ -0,0 +1,176 @@
+# core/analytics.py
+"""
+Завантаженість залів: щоденні підсумки, теплова карта «зал × година тижня»
+і сезонний прогноз.
+
+Сирі записи (GroupEnrollment, IndividualBooking) читаються лише командою
+rollup_hall_usage — раз на завершений день, інкрементно від останнього
+підсумку. Сторінка аналітики будує матриці NumPy тільки з HallDailyRollup:
+кілька сотень рядків замість сканування всієї історії записів.
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from .models import GymHall, GroupEnrollment, HallDailyRollup, IndividualBooking
+
+HOURS = 24
+HOURS_OF_WEEK = 7 * HOURS
+HISTORY_WEEKS = 8
+BACKFILL_DAYS = 90
+# вага тижня в прогнозі зменшується вдвічі з кожним тижнем давнини
+FORECAST_DECAY = 0.5
+
+HOUR_STARTS = np.arange(HOURS) * 60
+
+
+def _day_bounds(day):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def _minute_of_day(value, day) -> int:
+    local = timezone.localtime(value)
+    if local.date() < day:
+        return 0
+    if local.date() > day:
+        return HOURS * 60
+    return local.hour * 60 + local.minute
+
+
+def _visits(start_dt, end_dt):
+    """(hall_id, start, end) кожного відвідувача занять і слотів, що перетинають вікно."""
+    yield from GroupEnrollment.objects.filter(
+        group_class__start_time__lt=end_dt, group_class__end_time__gt=start_dt,
+    ).values_list("group_class__hall_id", "group_class__start_time", "group_class__end_time")
+    yield from IndividualBooking.objects.filter(
+        slot__start_time__lt=end_dt, slot__end_time__gt=start_dt,
+    ).values_list("slot__hall_id", "slot__start_time", "slot__end_time")
+
+
+def hourly_minutes(starts, ends):
+    """Хвилини кожного відвідування в кожній годині доби: (відвідування × 24)."""
+    lo = np.maximum(starts[:, None], HOUR_STARTS[None, :])
+    hi = np.minimum(ends[:, None], HOUR_STARTS[None, :] + 60)
+    return np.clip(hi - lo, 0, None)
+
+
+def rollup_day(day) -> int:
+    """Перераховує підсумки всіх залів за день. Повертає кількість рядків."""
+    start_dt, end_dt = _day_bounds(day)
+    halls = dict(GymHall.objects.values_list("id", "capacity"))
+    rows = {pk: i for i, pk in enumerate(halls)}
+
+    hall_idx, starts, ends = [], [], []
+    for hall_id, start, end in _visits(start_dt, end_dt):
+        if hall_id in rows:
+            hall_idx.append(rows[hall_id])
+            starts.append(_minute_of_day(start, day))
+            ends.append(_minute_of_day(end, day))
+
+    totals = np.zeros((len(halls), HOURS), dtype=np.int64)
+    if hall_idx:
+        np.add.at(totals, np.array(hall_idx), hourly_minutes(np.array(starts), np.array(ends)))
+
+    HallDailyRollup.objects.filter(day=day).delete()
+    HallDailyRollup.objects.bulk_create([
+        HallDailyRollup(hall_id=pk, day=day, capacity=capacity, person_minutes=totals[rows[pk]].tolist())
+        for pk, capacity in halls.items()
+    ])
+    return len(halls)
+
+
+def rollup_range(date_from, date_to) -> int:
+    """Підсумки за дні [date_from, date_to]. Повертає кількість днів."""
+    day, days = date_from, 0
+    while day <= date_to:
+        rollup_day(day)
+        day += timedelta(days=1)
+        days += 1
+    return days
+
+
+def last_rollup_day():
+    return HallDailyRollup.objects.order_by("-day").values_list("day", flat=True).first()
+
+
+def pending_range(today=None):
+    """
+    Дні, яких ще немає в підсумках: від наступного після останнього
+    (або BACKFILL_DAYS тому) до вчора. None — усе вже підсумовано.
+    """
+    today = today or timezone.localdate()
+    last = last_rollup_day()
+    date_from = last + timedelta(days=1) if last else today - timedelta(days=BACKFILL_DAYS)
+    date_to = today - timedelta(days=1)
+    return (date_from, date_to) if date_from <= date_to else None
+
+
+def weekly_usage(weeks=HISTORY_WEEKS, until=None):
+    """
+    Частка місткості по тижнях за останні weeks тижнів до until (не включно).
+    Повертає (halls, usage): halls — [(id, name, capacity)], usage —
+    масив (тижні × зали × 168 годин тижня), NaN — днів без підсумку.
+    """
+    until = until or timezone.localdate()
+    start = until - timedelta(days=weeks * 7)
+    halls = list(GymHall.objects.order_by("name").values_list("id", "name", "capacity"))
+    rows = {pk: i for i, (pk, _, _) in enumerate(halls)}
+
+    usage = np.full((weeks, len(halls), HOURS_OF_WEEK), np.nan)
+    for hall_id, day, capacity, minutes in HallDailyRollup.objects.filter(
+        day__gte=start, day__lt=until,
+    ).values_list("hall_id", "day", "capacity", "person_minutes"):
+        i = rows.get(hall_id)
+        if i is None or not capacity or len(minutes) != HOURS:
+            continue
+        week = (day - start).days // 7
+        hour = day.weekday() * HOURS
+        usage[week, i, hour:hour + HOURS] = np.asarray(minutes, dtype=np.float64) / (capacity * 60)
+    return halls, usage
+
+
+def _weighted_mean(usage, weights):
+    present = ~np.isnan(usage)
+    w = weights[:, None, None] * present
+    total = w.sum(axis=0)
+    sums = (np.nan_to_num(usage) * w).sum(axis=0)
+    return np.divide(sums, total, out=np.full(total.shape, np.nan), where=total > 0)
+
+
+def heatmap(usage):
+    """Середня завантаженість (зали × 168) за всі тижні з даними."""
+    return _weighted_mean(usage, np.ones(usage.shape[0]))
+
+
+def forecast(usage, decay=FORECAST_DECAY):
+    """
+    Сезонний прогноз на наступний тиждень: для кожної години тижня —
+    середнє тих самих годин минулих тижнів з експоненційно спадними вагами.
+    """
+    ages = np.arange(usage.shape[0])[::-1]
+    return _weighted_mean(usage, decay ** ages)
+
+
+def extremes(matrix, halls, low=0.2, high=0.9, limit=5):
+    """
+    Найбільш перевантажені (>= high) і недовантажені (< low, але не порожні) години.
+    Повертає два списки (hall_name, weekday, hour, value).
+    """
+    flat = np.nan_to_num(matrix, nan=0.0).ravel()
+    order = np.argsort(flat, kind="stable")
+    over = order[::-1][flat[order[::-1]] >= high][:limit]
+    under = order[(flat[order] > 0) & (flat[order] < low)][:limit]
+
+    def describe(indices):
+        found = []
+        for idx in indices.tolist():
+            hall, hour_of_week = divmod(idx, HOURS_OF_WEEK)
+            weekday, hour = divmod(hour_of_week, HOURS)
+            found.append((halls[hall][1], weekday, hour, float(flat[idx])))
+        return found
+
+    return describe(over), describe(under)
@@ -0,0 +1,179 @@
+# core/api.py
+"""
+JSON API розкладу для мобільного застосунку.
+
+GET /api/schedule/?kind=groups|slots&hall=&trainer=&from=&to=&fields=&limit=&cursor=
+
+Фільтри ті самі, що на сторінці розкладу. Сторінки — keyset за (start_time, id):
+next_cursor із відповіді передається як cursor у наступний запит.
+fields — перелік полів через кому; з БД читаються лише потрібні колонки,
+а join-и до залу й тренера додаються тільки для hall_name / trainer_name.
+
+kind=groups містить і ще не створені заняття серій (core/series.py): у них
+id — null, а virtual, series_id та occurrence (дата) додаються завжди — за
+ними клієнт записується через series_enroll. Серед занять з однаковим
+початком такі йдуть після справжніх, упорядковані за series_id.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from . import schedule, series
+from .models import GroupClass, IndividualSlot
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+TRAINER_NAME_COLUMNS = ("trainer__first_name", "trainer__last_name", "trainer__username")
+
+# поле відповіді -> колонки .values(), з яких воно будується
+_COMMON_FIELDS = {
+    "id": ("id",),
+    "hall_id": ("hall_id",),
+    "hall_name": ("hall__name",),
+    "trainer_id": ("trainer_id",),
+    "trainer_name": TRAINER_NAME_COLUMNS,
+    "start_time": ("start_time",),
+    "end_time": ("end_time",),
+}
+KINDS = {
+    "groups": (GroupClass, {**_COMMON_FIELDS, "title": ("title",),
+                            "max_slots": ("max_slots",), "enrolled_count": ("enrolled_count",)}),
+    "slots": (IndividualSlot, {**_COMMON_FIELDS, "is_booked": ("is_booked",)}),
+}
+DEFAULT_FIELDS = ("id", "start_time", "end_time", "hall_id", "trainer_id")
+
+# другий елемент ключа потоку (start_time, rank, id): рядки БД, потім заняття серій
+REAL, VIRTUAL = 0, 1
+
+
+class ApiError(ValueError):
+    pass
+
+
+def encode_cursor(key) -> str:
+    start_time, rank, pk = key
+    raw = json.dumps([start_time.isoformat(), pk, rank]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(value: str):
+    """Ключ (start_time, rank, id); курсори без rank (старі) — рядки БД."""
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+        start_iso, pk, *rest = json.loads(raw)
+        rank = int(rest[0]) if rest else REAL
+        if rank not in (REAL, VIRTUAL):
+            raise ValueError(rank)
+        return datetime.fromisoformat(start_iso), rank, int(pk)
+    except (ValueError, TypeError):
+        raise ApiError("Некоректний cursor")
+
+
+def _int_param(value, name):
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ApiError(f"Параметр {name} має бути числом")
+    return int(value)
+
+
+def _serialize(row: dict, fields) -> dict:
+    item = {}
+    for name in fields:
+        if name == "trainer_name":
+            full = f"{row['trainer__first_name']} {row['trainer__last_name']}".strip()
+            item[name] = full or row["trainer__username"]
+        elif name == "hall_name":
+            item[name] = row["hall__name"]
+        else:
+            value = row[name]
+            item[name] = value.isoformat() if isinstance(value, datetime) else value
+    return item
+
+
+def _occurrence_rows(start_dt, end_dt, filters, after, fields, limit) -> list:
+    """Перші limit + 1 ще не створених занять серій після ключа after як (ключ, елемент)."""
+    date_from = timezone.localtime(max(start_dt, after[0]) if after else start_dt).date()
+    found = []
+    for s, day, start, end in series.occurrences(date_from, timezone.localtime(end_dt).date(), **filters):
+        key = (start, VIRTUAL, s.pk)
+        if start >= start_dt and end <= end_dt and (after is None or key > after):
+            found.append((key, s, day, end))
+    found.sort(key=lambda f: f[0])
+
+    rows = []
+    for key, s, day, end in found[:limit + 1]:
+        row = series.virtual_row(s, day, key[0], end)
+        item = {name: row[name].isoformat() if isinstance(row[name], datetime) else row[name] for name in fields}
+        item.update(virtual=True, series_id=s.pk, occurrence=row["occurrence"])
+        rows.append((key, item))
+    return rows
+
+
+def schedule_page(params) -> dict:
+    """Одна сторінка розкладу за параметрами запиту (QueryDict або dict)."""
+    kind = params.get("kind") or "groups"
+    if kind not in KINDS:
+        raise ApiError("kind має бути groups або slots")
+    model, available = KINDS[kind]
+
+    fields = [f for f in (params.get("fields") or "").split(",") if f] or list(DEFAULT_FIELDS)
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise ApiError(f"Невідомі поля: {', '.join(unknown)}. Доступні: {', '.join(available)}")
+
+    limit = _int_param(params.get("limit"), "limit") or DEFAULT_LIMIT
+    limit = min(limit, MAX_LIMIT)
+    hall_id = _int_param(params.get("hall"), "hall")
+    trainer_id = _int_param(params.get("trainer"), "trainer")
+    _, _, start_dt, end_dt = schedule.window_from_params(params.get("from"), params.get("to"))
+
+    filters = {}
+    if hall_id is not None:
+        filters["hall_id"] = hall_id
+    if trainer_id is not None:
+        filters["trainer_id"] = trainer_id
+    qs = model.objects.filter(start_time__gte=start_dt, end_time__lte=end_dt, **filters)
+    after = decode_cursor(params["cursor"]) if params.get("cursor") else None
+    if after:
+        after_start, after_rank, after_id = after
+        later = Q(start_time__gt=after_start)
+        if after_rank == REAL:
+            later |= Q(start_time=after_start, id__gt=after_id)
+        qs = qs.filter(later)
+
+    columns = {"id", "start_time"}
+    for name in fields:
+        columns.update(available[name])
+    rows = [
+        ((row["start_time"], REAL, row["id"]), _serialize(row, fields))
+        for row in qs.order_by("start_time", "id").values(*columns)[:limit + 1]
+    ]
+    if kind == "groups":
+        rows = sorted(rows + _occurrence_rows(start_dt, end_dt, filters, after, fields, limit), key=lambda r: r[0])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0])
+    return {
+        "kind": kind,
+        "results": [item for _, item in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+@login_required
+@require_GET
+def schedule_api(request):
+    try:
+        return JsonResponse(schedule_page(request.GET), json_dumps_params={"ensure_ascii": False})
+    except ApiError as e:
+        return JsonResponse({"error": str(e)}, status=400, json_dumps_params={"ensure_ascii": False})
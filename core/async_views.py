@@ -0,0 +1,121 @@
+# core/async_views.py
+"""
+Async-версії сторінок лише для читання: розклад, прайс, «Про нас», зали.
+
+Для ASGI-розгортання (sport_gym/asgi.py): поки view чекає на базу, воркер
+обслуговує інші запити, а незалежні запити однієї сторінки (зали, тренери,
+рядки розкладу, записи клієнта) виконуються одночасно. ORM Django 3.2
+синхронна, тому кожен такий запит іде у власний потік пулу
+(sync_to_async(thread_sensitive=False)) з власним з'єднанням з базою.
+Усе, що торкається request (сесія, користувач, повідомлення), виконується
+в потоці запиту.
+
+Вмикаються замість синхронних view налаштуванням ASYNC_VIEWS (core/urls.py).
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+
+from . import fragments, schedule
+from .models import GymHall, SiteInfo
+from .versions import async_conditional_page
+from .views import _is_manager, active_tariffs, overview_context, overview_params, price_categories
+
+
+def _parallel(func, *args, **kwargs):
+    """Незалежний запит у власному потоці пулу."""
+    return sync_to_async(func, thread_sensitive=False)(*args, **kwargs)
+
+
+async def _value(value):
+    return value
+
+
+def _is_authenticated(request) -> bool:
+    return request.user.is_authenticated
+
+
+def async_login_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not await sync_to_async(_is_authenticated)(request):
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def _render(request, template_name, context):
+    # контекстні процесори читають користувача і повідомлення з сесії
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@async_login_required
+@async_conditional_page("halls")
+async def halls_list(request):
+    halls = await _parallel(list, GymHall.objects.all())
+    return await _render(request, "halls/list.html", {"halls": halls})
+
+
+@async_conditional_page("about")
+async def about_view(request):
+    siteinfo, is_manager = await asyncio.gather(
+        _parallel(SiteInfo.get_solo),
+        sync_to_async(_is_manager)(request),
+    )
+    return await _render(request, "about/about.html", {"siteinfo": siteinfo, "is_manager": is_manager})
+
+
+@async_conditional_page("price")
+async def price_view(request):
+    tariffs, is_manager = await asyncio.gather(
+        _parallel(active_tariffs),
+        sync_to_async(_is_manager)(request),
+    )
+    return await _render(request, "price/price.html", {
+        "categories": price_categories(tariffs),
+        "is_manager": is_manager,
+    })
+
+
+def _cached_rows(params):
+    key = fragments.rows_key(params["start_dt"], params["end_dt"], params["hall_filter"], params["trainer_filter"])
+    return key, fragments.get_rows(key)
+
+
+@async_login_required
+@async_conditional_page("schedule", per_hour=True)
+async def schedule_overview(request):
+    """Розклад: рядки вікна, довідники й записи клієнта читаються паралельно."""
+    params = await sync_to_async(overview_params)(request)
+    rows_key, cached_rows = await _parallel(_cached_rows, params)
+    window = (params["start_dt"], params["end_dt"], params["hall_filter"], params["trainer_filter"])
+    client, now = params["client"], params["now"]
+
+    if schedule.mongo_backend():
+        # нативна агрегація вже читає все одним запитом
+        data = await _parallel(schedule.load_overview, *window, client=client, now=now, rows=cached_rows)
+    else:
+        rows, halls, trainers, (my_booked_slot_ids, my_entries) = await asyncio.gather(
+            _parallel(schedule.schedule_rows, *window) if cached_rows is None else _value(cached_rows),
+            _parallel(schedule.hall_options),
+            _parallel(schedule.trainer_options),
+            _parallel(schedule.client_entries, client, now) if client else _value((set(), [])),
+        )
+        groups, slots = rows
+        data = {
+            "halls": halls,
+            "trainers": trainers,
+            "groups": groups,
+            "slots": slots,
+            "enrolled_group_ids": await _parallel(schedule.enrolled_group_ids, client, groups) if client else set(),
+            "my_booked_slot_ids": my_booked_slot_ids,
+            "my_entries": my_entries,
+        }
+
+    if cached_rows is None:
+        await _parallel(fragments.store_rows, rows_key, data["groups"], data["slots"])
+    context = await sync_to_async(overview_context)(request, params, data)
+    return await _render(request, "schedule/overview.html", context)
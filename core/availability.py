@@ -0,0 +1,257 @@
+# core/availability.py
+"""
+Карта доступності для пошуку вільних індивідуальних тренувань.
+
+Найближчі HORIZON_DAYS днів поділені на 15-хвилинні кошики. Для кожного
+тренера і кожного залу зберігається байтовий масив NumPy: скільки вільних
+(не заброньованих) слотів покривають кошик. Пошук за спеціалізацією, датами,
+днями тижня і часом доби — це векторні AND/OR над масками кошиків і рядками
+тренерів, без запитів до IndividualSlot і Profile.
+
+Карта будується раз на процес і далі оновлюється інкрементно сигналами
+слотів і бронювань (core/signals.py). Якщо версії моделей змінились не
+лише на щойно застосовану зміну (інший процес, bulk_create, зміна профілів)
+або настав новий день — карта перебудовується повністю при наступному пошуку.
+Точність — один кошик: межі часу доби округлюються до 15 хвилин.
+"""
+import threading
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from accounts.models import Profile
+
+from . import versions
+from .models import GymHall, IndividualSlot, IndividualBooking
+
+BUCKET_MINUTES = 15
+BUCKET_SECONDS = BUCKET_MINUTES * 60
+HORIZON_DAYS = 28
+
+# зміна будь-якої з цих моделей може змінити карту
+TOKEN_MODELS = (IndividualSlot, IndividualBooking, Profile)
+
+
+class AvailabilityGrid:
+    """Вільні слоти тренерів і залів у 15-хвилинних кошиках від origin."""
+
+    def __init__(self, origin_date, days, trainers, hall_ids, token=None):
+        tz = timezone.get_current_timezone()
+        self.origin_date = origin_date
+        self.token = token
+        midnights = [
+            timezone.make_aware(datetime.combine(origin_date + timedelta(days=d), time.min), tz).timestamp()
+            for d in range(days + 1)
+        ]
+        self.origin_ts = midnights[0]
+        size = int((midnights[-1] - self.origin_ts) // BUCKET_SECONDS)
+        self.bucket_ts = self.origin_ts + np.arange(size, dtype=np.float64) * BUCKET_SECONDS
+
+        # атрибути кошиків у місцевому часі (з урахуванням переходу на літній час)
+        self.day_index = np.zeros(size, dtype=np.int16)
+        self.weekday = np.zeros(size, dtype=np.int8)
+        self.minute = np.zeros(size, dtype=np.int16)
+        for d in range(days):
+            lo = int((midnights[d] - self.origin_ts) // BUCKET_SECONDS)
+            hi = int((midnights[d + 1] - self.origin_ts) // BUCKET_SECONDS)
+            self.day_index[lo:hi] = d
+            self.weekday[lo:hi] = (origin_date + timedelta(days=d)).weekday()
+            if hi - lo == 24 * 60 // BUCKET_MINUTES:
+                self.minute[lo:hi] = (self.bucket_ts[lo:hi] - midnights[d]) // 60
+            else:
+                # день переходу на літній/зимовий час: годинник не збігається з відліком від півночі
+                for i in range(lo, hi):
+                    local = datetime.fromtimestamp(self.bucket_ts[i], tz)
+                    self.minute[i] = local.hour * 60 + local.minute
+
+        trainers = list(trainers)
+        self.trainer_row = {pk: i for i, (pk, _) in enumerate(trainers)}
+        self.trainer_spec = np.array([spec or "" for _, spec in trainers], dtype=object)
+        self.hall_row = {pk: i for i, pk in enumerate(hall_ids)}
+        self.trainer_free = np.zeros((len(trainers), size), dtype=np.uint8)
+        self.hall_free = np.zeros((len(self.hall_row), size), dtype=np.uint8)
+
+        # таблиця слотів у карті: паралельні масиви + позиція за id
+        self._pos = {}
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._cols = np.zeros((0, 4), dtype=np.int32)  # trainer_row, hall_row, b0, b1
+        self._active = np.zeros(0, dtype=bool)
+        self._size = 0
+
+    def __len__(self):
+        return self.bucket_ts.shape[0]
+
+    def _span(self, start, end):
+        b0 = int((start.timestamp() - self.origin_ts) // BUCKET_SECONDS)
+        b1 = -int(-(end.timestamp() - self.origin_ts) // BUCKET_SECONDS)
+        return max(b0, 0), min(b1, len(self))
+
+    def add_slot(self, slot_id, trainer_id, hall_id, start, end) -> bool:
+        """Додає вільний слот. False — тренера чи залу немає в карті (потрібна перебудова)."""
+        self.remove_slot(slot_id)
+        b0, b1 = self._span(start, end)
+        if b0 >= b1:
+            return True
+        trow, hrow = self.trainer_row.get(trainer_id), self.hall_row.get(hall_id)
+        if trow is None or hrow is None:
+            return False
+
+        self.trainer_free[trow, b0:b1] += 1
+        self.hall_free[hrow, b0:b1] += 1
+        if self._size == self._ids.shape[0]:
+            grow = max(64, self._size)
+            self._ids = np.concatenate([self._ids, np.zeros(grow, dtype=np.int64)])
+            self._cols = np.concatenate([self._cols, np.zeros((grow, 4), dtype=np.int32)])
+            self._active = np.concatenate([self._active, np.zeros(grow, dtype=bool)])
+        i = self._size
+        self._ids[i], self._cols[i], self._active[i] = slot_id, (trow, hrow, b0, b1), True
+        self._pos[slot_id] = i
+        self._size += 1
+        return True
+
+    def remove_slot(self, slot_id) -> None:
+        i = self._pos.pop(slot_id, None)
+        if i is None:
+            return
+        trow, hrow, b0, b1 = self._cols[i]
+        self.trainer_free[trow, b0:b1] -= 1
+        self.hall_free[hrow, b0:b1] -= 1
+        self._active[i] = False
+
+    def window_mask(self, date_from=None, date_to=None, weekdays=None, time_from=None, time_to=None, now=None):
+        """Булева маска кошиків, що потрапляють у вікно пошуку."""
+        mask = np.ones(len(self), dtype=bool)
+        if date_from:
+            mask &= self.day_index >= (date_from - self.origin_date).days
+        if date_to:
+            mask &= self.day_index <= (date_to - self.origin_date).days
+        if weekdays:
+            mask &= np.isin(self.weekday, list(weekdays))
+        if time_from:
+            mask &= self.minute >= time_from.hour * 60 + time_from.minute
+        if time_to:
+            mask &= self.minute + BUCKET_MINUTES <= time_to.hour * 60 + time_to.minute
+        if now:
+            mask &= self.bucket_ts >= now.timestamp()
+        return mask
+
+    def search(self, specialization=None, hall_id=None, limit=None, **window) -> list:
+        """id вільних слотів, що повністю лежать у вікні, у порядку початку."""
+        n = self._size
+        if not n:
+            return []
+        free = (self.trainer_free > 0) & self.window_mask(**window)
+        if specialization:
+            free &= (self.trainer_spec == specialization)[:, None]
+        cols = self._cols[:n]
+        ok = self._active[:n].copy()
+        if hall_id is not None:
+            hrow = self.hall_row.get(hall_id)
+            if hrow is None:
+                return []
+            free &= self.hall_free[hrow] > 0
+            ok &= cols[:, 1] == hrow
+
+        # слот підходить, якщо всі його кошики вільні у вікні: префіксні суми по рядку тренера
+        covered = np.zeros((free.shape[0], free.shape[1] + 1), dtype=np.int32)
+        np.cumsum(free, axis=1, out=covered[:, 1:])
+        trow, b0, b1 = cols[:, 0], cols[:, 2], cols[:, 3]
+        ok &= covered[trow, b1] - covered[trow, b0] == b1 - b0
+
+        found = np.flatnonzero(ok)
+        found = found[np.argsort(b0[found], kind="stable")]
+        if limit:
+            found = found[:limit]
+        return self._ids[found].tolist()
+
+
+# --- Карта процесу ------------------------------------------------------------
+
+_grid = None
+_lock = threading.Lock()
+
+
+def _current_token():
+    return versions.current(TOKEN_MODELS)
+
+
+def build(token=None) -> AvailabilityGrid:
+    """Будує карту з бази: тренери, зали і вільні слоти в межах горизонту."""
+    origin_date = timezone.localdate()
+    trainers = Profile.objects.filter(role=Profile.Role.TRAINER).order_by("id").values_list("id", "specialization")
+    halls = GymHall.objects.order_by("id").values_list("id", flat=True)
+    grid = AvailabilityGrid(origin_date, HORIZON_DAYS, trainers, halls, token=token)
+
+    start = datetime.fromtimestamp(grid.origin_ts, timezone.utc)
+    end = start + timedelta(seconds=len(grid) * BUCKET_SECONDS)
+    for pk, trainer_id, hall_id, slot_start, slot_end in (
+        IndividualSlot.objects
+        .filter(is_booked=False, start_time__lt=end, end_time__gt=start)
+        .values_list("id", "trainer_id", "hall_id", "start_time", "end_time")
+    ):
+        grid.add_slot(pk, trainer_id, hall_id, slot_start, slot_end)
+    return grid
+
+
+def search(**params) -> list:
+    """Пошук вільних слотів (див. AvailabilityGrid.search); карта оновлюється за потреби."""
+    global _grid
+    token = _current_token()
+    today = timezone.localdate()
+    with _lock:
+        if _grid is None or _grid.token != token or _grid.origin_date != today:
+            _grid = build(token)
+        params.setdefault("now", timezone.now())
+        return _grid.search(**params)
+
+
+def reset() -> None:
+    global _grid
+    with _lock:
+        _grid = None
+
+
+def _apply(model, change) -> None:
+    """
+    Інкрементне оновлення після зміни model (викликається після versions.bump).
+    Застосовується, лише якщо з часу побудови карти змінилась тільки ця модель
+    і рівно на одну версію; інакше карта скидається і перебудується при пошуку.
+    """
+    global _grid
+    with _lock:
+        grid = _grid
+        if grid is None:
+            return
+        token = _current_token()
+        expected = list(grid.token[0])
+        expected[TOKEN_MODELS.index(model)] += 1
+        if token[0] != tuple(expected) or change(grid) is False:
+            _grid = None
+            return
+        grid.token = token
+
+
+def slot_saved(slot) -> None:
+    def change(grid):
+        if slot.is_booked:
+            grid.remove_slot(slot.pk)
+            return True
+        return grid.add_slot(slot.pk, slot.trainer_id, slot.hall_id, slot.start_time, slot.end_time)
+    _apply(IndividualSlot, change)
+
+
+def slot_deleted(slot_id) -> None:
+    _apply(IndividualSlot, lambda grid: grid.remove_slot(slot_id))
+
+
+def booking_changed(slot_id, booked: bool) -> None:
+    def change(grid):
+        if booked:
+            grid.remove_slot(slot_id)
+            return True
+        row = IndividualSlot.objects.filter(pk=slot_id).values_list(
+            "trainer_id", "hall_id", "start_time", "end_time"
+        ).first()
+        return True if row is None else grid.add_slot(slot_id, *row)
+    _apply(IndividualBooking, change)
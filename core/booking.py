@@ -0,0 +1,288 @@
+# core/booking.py
+from django.db import transaction, IntegrityError, DatabaseError
+from django.db.models import F
+
+from . import events, fragments, intervals, schedule, series, versions
+from .models import GroupClass, GroupEnrollment, IndividualSlot, IndividualBooking, WaitlistEntry
+from .mongo import is_mongo, collection
+
+ENROLLED = "enrolled"
+ALREADY_ENROLLED = "already_enrolled"
+CLASS_FULL = "full"
+BOOKED = "booked"
+ALREADY_BOOKED = "already_booked"
+TIME_CONFLICT = "time_conflict"
+WAITLISTED = "waitlisted"
+ALREADY_WAITLISTED = "already_waitlisted"
+
+
+def adjust_enrolled_count(group_class_id: int, delta: int) -> None:
+    """
+    Атомарно змінює GroupClass.enrolled_count на delta.
+    djongo не вміє транслювати UPDATE із F()-виразами, тому для Mongo
+    використовується нативний $inc. Лічильник ніколи не опускається нижче нуля.
+    """
+    if not delta:
+        return
+    if is_mongo():
+        query = {"id": group_class_id}
+        if delta < 0:
+            query["enrolled_count"] = {"$gte": -delta}
+        collection(GroupClass).update_one(query, {"$inc": {"enrolled_count": delta}})
+        return
+
+    qs = GroupClass.objects.filter(pk=group_class_id)
+    if delta < 0:
+        qs = qs.filter(enrolled_count__gte=-delta)
+    qs.update(enrolled_count=F("enrolled_count") + delta)
+
+
+def reserve_seat(group_class_id: int) -> bool:
+    """
+    Займає одне місце на занятті єдиним умовним записом:
+    enrolled_count збільшується лише якщо він ще менший за max_slots.
+    Між перевіркою та записом немає вікна для гонки.
+    """
+    if is_mongo():
+        result = collection(GroupClass).update_one(
+            {"id": group_class_id, "$expr": {"$lt": ["$enrolled_count", "$max_slots"]}},
+            {"$inc": {"enrolled_count": 1}},
+        )
+        return result.modified_count == 1
+
+    updated = (
+        GroupClass.objects
+        .filter(pk=group_class_id, enrolled_count__lt=F("max_slots"))
+        .update(enrolled_count=F("enrolled_count") + 1)
+    )
+    return updated == 1
+
+
+def enroll(group_class: GroupClass, client) -> str:
+    """
+    Записує клієнта на заняття.
+    Повертає ENROLLED, ALREADY_ENROLLED, TIME_CONFLICT або CLASS_FULL.
+    """
+    if GroupEnrollment.objects.filter(group_class=group_class, client=client).exists():
+        return ALREADY_ENROLLED
+    if intervals.find_conflicts(group_class.start_time, group_class.end_time, client_id=client.pk):
+        return TIME_CONFLICT
+
+    if not reserve_seat(group_class.pk):
+        return CLASS_FULL
+
+    enrollment = GroupEnrollment(group_class=group_class, client=client)
+    # Місце вже враховане в лічильнику — сигнал post_save не має додавати його вдруге.
+    enrollment._seat_reserved = True
+    try:
+        with transaction.atomic():
+            enrollment.save()
+    except (IntegrityError, DatabaseError):
+        adjust_enrolled_count(group_class.pk, -1)
+        schedule.refresh_group(group_class.pk)
+        # дублікат — паралельний запит того ж клієнта встиг раніше; інші збої бази не ховаємо
+        if not GroupEnrollment.objects.filter(group_class=group_class, client=client).exists():
+            raise
+        return ALREADY_ENROLLED
+    # місце могло звільнитись поза чергою (напр., збільшили max_slots) — черга клієнту більше не потрібна
+    WaitlistEntry.objects.filter(group_class=group_class, client=client).delete()
+    events.group_changed(group_class.pk)
+    return ENROLLED
+
+
+def enroll_occurrence(group_series, day, client) -> str:
+    """
+    Запис на заняття серії в день day. Накладки й місця спершу перевіряються
+    на віртуальному занятті, тож рядок GroupClass створюється лише під запис,
+    що пройде; якщо enroll усе ж не вдався — щойно створений рядок видаляється.
+    """
+    start, end = series.occurrence_bounds(group_series, day)
+    existing = GroupClass.objects.filter(series=group_series, start_time=start).first()
+    if existing:
+        return enroll(existing, client)
+    if intervals.find_conflicts(start, end, client_id=client.pk):
+        return TIME_CONFLICT
+    if group_series.max_slots < 1:
+        return CLASS_FULL
+
+    group_class, created = series.materialize(group_series, day)
+    result = enroll(group_class, client)
+    if result != ENROLLED and created:
+        GroupClass.objects.filter(pk=group_class.pk, enrolled_count=0).delete()
+    return result
+
+
+def unenroll(group_class: GroupClass, client) -> bool:
+    """
+    Скасовує запис клієнта. Лічильник зменшує сигнал post_delete,
+    звільнене місце одразу отримує перший у черзі.
+    """
+    enrollment = GroupEnrollment.objects.filter(group_class=group_class, client=client).first()
+    if not enrollment:
+        return False
+    # post_delete записує на звільнене місце першого в черзі (core/signals.py)
+    enrollment.delete()
+    events.group_changed(group_class.pk)
+    return True
+
+
+def join_waitlist(group_class: GroupClass, client) -> str:
+    """
+    Ставить клієнта в чергу на заняття. Якщо місце вже вільне — одразу записує.
+    Повертає WAITLISTED, ENROLLED, ALREADY_WAITLISTED, ALREADY_ENROLLED або TIME_CONFLICT.
+    """
+    if GroupEnrollment.objects.filter(group_class=group_class, client=client).exists():
+        return ALREADY_ENROLLED
+    if intervals.find_conflicts(group_class.start_time, group_class.end_time, client_id=client.pk):
+        return TIME_CONFLICT
+    try:
+        with transaction.atomic():
+            WaitlistEntry.objects.create(group_class=group_class, client=client)
+    except (IntegrityError, DatabaseError):
+        return ALREADY_WAITLISTED
+    # місце могло звільнитись, поки клієнт вирішував стати в чергу
+    if client.pk in promote_waitlist(group_class.pk):
+        events.group_changed(group_class.pk)
+        return ENROLLED
+    return WAITLISTED
+
+
+def leave_waitlist(group_class: GroupClass, client) -> bool:
+    deleted, _ = WaitlistEntry.objects.filter(group_class=group_class, client=client).delete()
+    return bool(deleted)
+
+
+def promote_waitlist(group_class_id: int) -> list:
+    """
+    Записує клієнтів із черги на вільні місця в порядку черги.
+    Місце спершу займає reserve_seat, потім запис черги забирається
+    видаленням за pk: кожного клієнта отримує лише один паралельний виклик,
+    а заняття не переповнюється. Клієнта, у якого тим часом з'явилась
+    накладка в розкладі, вилучено з черги без запису.
+    Повертає id профілів записаних клієнтів.
+    """
+    group_class = GroupClass.objects.filter(pk=group_class_id).only("id", "start_time", "end_time").first()
+    promoted = []
+    while group_class:
+        entry = WaitlistEntry.objects.filter(group_class_id=group_class_id).order_by("id").first()
+        if entry is None or not reserve_seat(group_class_id):
+            break
+
+        claimed, _ = WaitlistEntry.objects.filter(pk=entry.pk).delete()
+        if not claimed or intervals.find_conflicts(
+            group_class.start_time, group_class.end_time, client_id=entry.client_id
+        ):
+            adjust_enrolled_count(group_class_id, -1)
+            continue
+
+        enrollment = GroupEnrollment(group_class_id=group_class_id, client_id=entry.client_id)
+        enrollment._seat_reserved = True
+        try:
+            with transaction.atomic():
+                enrollment.save()
+        except (IntegrityError, DatabaseError):
+            adjust_enrolled_count(group_class_id, -1)
+            continue
+        promoted.append(entry.client_id)
+    return promoted
+
+
+def waitlist_position(group_class_id: int, client):
+    """Номер клієнта в черзі (з 1) або None, якщо його в черзі немає."""
+    entry_id = (
+        WaitlistEntry.objects.filter(group_class_id=group_class_id, client=client)
+        .values_list("id", flat=True).first()
+    )
+    if entry_id is None:
+        return None
+    return WaitlistEntry.objects.filter(group_class_id=group_class_id, id__lte=entry_id).count()
+
+
+def waitlist_positions(client) -> dict:
+    """{id заняття: номер у черзі} для всіх черг клієнта."""
+    return {
+        group_class_id: WaitlistEntry.objects.filter(group_class_id=group_class_id, id__lte=entry_id).count()
+        for group_class_id, entry_id in
+        WaitlistEntry.objects.filter(client=client).values_list("group_class_id", "id")
+    }
+
+
+def book_slot(slot: IndividualSlot, client) -> str:
+    """
+    Бронює індивідуальний слот через compare-and-set на is_booked:
+    виграє лише той запит, чий UPDATE ... WHERE is_booked = false змінив рядок.
+    Оновлюється тільки прапорець, решта колонок слоту не перезаписується.
+    Повертає BOOKED, ALREADY_BOOKED або TIME_CONFLICT.
+    """
+    if intervals.find_conflicts(slot.start_time, slot.end_time, client_id=client.pk):
+        return TIME_CONFLICT
+
+    claimed = IndividualSlot.objects.filter(pk=slot.pk, is_booked=False).update(is_booked=True)
+    if not claimed:
+        return ALREADY_BOOKED
+
+    try:
+        with transaction.atomic():
+            IndividualBooking.objects.create(slot_id=slot.pk, client=client)
+    except (IntegrityError, DatabaseError):
+        if IndividualBooking.objects.filter(slot_id=slot.pk).exists():
+            # Запис бронювання вже існує (прапорець був розсинхронізований) — слот зайнятий.
+            return ALREADY_BOOKED
+        # інший збій бази — знімаємо прапорець, інакше слот лишиться «заброньованим» без бронювання
+        IndividualSlot.objects.filter(pk=slot.pk).update(is_booked=False)
+        raise
+
+    slot.is_booked = True
+    events.slot_changed(slot.pk)
+    return BOOKED
+
+
+def unbook_slot(slot: IndividualSlot, client) -> bool:
+    """Скасовує бронювання клієнта і звільняє слот. False — якщо бронювання не його."""
+    booking = IndividualBooking.objects.filter(slot=slot, client=client).first()
+    if not booking:
+        return False
+    # Прапорець is_booked скидає сигнал post_delete бронювання.
+    booking.delete()
+    slot.is_booked = False
+    events.slot_changed(slot.pk)
+    return True
+
+
+def recount_enrollments(group_class_ids=None) -> int:
+    """
+    Перераховує enrolled_count за фактичними записами GroupEnrollment.
+    Повертає кількість занять, у яких лічильник було виправлено.
+    """
+    if is_mongo():
+        pipeline = []
+        if group_class_ids is not None:
+            pipeline.append({"$match": {"group_class_id": {"$in": list(group_class_ids)}}})
+        pipeline.append({"$group": {"_id": "$group_class_id", "n": {"$sum": 1}}})
+        actual = {
+            row["_id"]: row["n"]
+            for row in collection(GroupEnrollment).aggregate(pipeline)
+        }
+    else:
+        qs = GroupEnrollment.objects.all()
+        if group_class_ids is not None:
+            qs = qs.filter(group_class_id__in=list(group_class_ids))
+        actual = {}
+        for gc_id in qs.values_list("group_class_id", flat=True):
+            actual[gc_id] = actual.get(gc_id, 0) + 1
+
+    classes = GroupClass.objects.all()
+    if group_class_ids is not None:
+        classes = classes.filter(pk__in=list(group_class_ids))
+
+    fixed = 0
+    for pk, stored in classes.values_list("pk", "enrolled_count"):
+        real = actual.get(pk, 0)
+        if stored != real:
+            GroupClass.objects.filter(pk=pk).update(enrolled_count=real)
+            fixed += 1
+    if fixed:
+        # update() не надсилає сигналів — версію для ETag оновлюємо вручну
+        versions.bump(GroupClass)
+        fragments.invalidate_all()
+    return fixed
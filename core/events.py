@@ -0,0 +1,125 @@
+# core/events.py
+"""
+Шина подій розкладу в межах процесу: зміни місць на заняттях і стану слотів.
+
+Видавці — функції запису в core/booking.py (запис, скасування, бронювання),
+вони працюють у звичайних потоках. Підписники — SSE-потоки (core/sse.py)
+в циклі asyncio; подія передається їм через call_soon_threadsafe.
+Зовнішній брокер не потрібен, але й події бачать лише клієнти, підключені
+до того самого процесу, де відбувся запис (ASGI-застосунок sport_gym/asgi.py
+обслуговує і сторінки, і потік).
+
+Останні BUFFER_SIZE подій зберігаються для відновлення за Last-Event-ID.
+"""
+import asyncio
+import itertools
+import threading
+from collections import deque
+
+from .models import GroupClass, IndividualSlot
+
+BUFFER_SIZE = 1000
+QUEUE_SIZE = 256
+
+GROUP = "group"
+SLOT = "slot"
+
+
+class Subscription:
+    """Черга подій одного підписника, прив'язана до його циклу asyncio."""
+
+    def __init__(self, bus, loop):
+        self.bus = bus
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        # підписник не встигав читати і втратив події — клієнту треба перечитати сторінку
+        self.overflowed = False
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Потокобезпечна шина: publish з будь-якого потоку, читання — з asyncio."""
+
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._seq = itertools.count(1)
+        self._recent = deque(maxlen=buffer_size)
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, loop=None) -> Subscription:
+        subscription = Subscription(self, loop or asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: dict) -> dict:
+        """Додає до події послідовний номер "seq" і розсилає її всім підписникам."""
+        with self._lock:
+            event = {**event, "seq": next(self._seq)}
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, event)
+            except RuntimeError:
+                # цикл підписника вже закрито
+                self.unsubscribe(subscription)
+        return event
+
+    def since(self, seq: int):
+        """
+        Події після seq для відновлення з'єднання. None — якщо частина
+        з них уже витіснена з буфера і клієнт має перечитати стан повністю.
+        """
+        with self._lock:
+            recent = list(self._recent)
+        if recent and recent[0]["seq"] > seq + 1:
+            return None
+        return [event for event in recent if event["seq"] > seq]
+
+
+bus = EventBus()
+
+
+def group_changed(group_class_id: int) -> None:
+    """Публікує поточну кількість місць заняття (лише якщо хтось слухає)."""
+    if not bus.has_subscribers():
+        return
+    row = GroupClass.objects.filter(pk=group_class_id).values(
+        "id", "hall_id", "trainer_id", "start_time", "enrolled_count", "max_slots"
+    ).first()
+    if row:
+        bus.publish({
+            "type": GROUP, "id": row["id"], "hall_id": row["hall_id"], "trainer_id": row["trainer_id"],
+            "start": row["start_time"].timestamp(),
+            "enrolled_count": row["enrolled_count"], "max_slots": row["max_slots"],
+        })
+
+
+def slot_changed(slot_id: int) -> None:
+    """Публікує стан бронювання слоту (лише якщо хтось слухає)."""
+    if not bus.has_subscribers():
+        return
+    row = IndividualSlot.objects.filter(pk=slot_id).values(
+        "id", "hall_id", "trainer_id", "start_time", "is_booked"
+    ).first()
+    if row:
+        bus.publish({
+            "type": SLOT, "id": row["id"], "hall_id": row["hall_id"], "trainer_id": row["trainer_id"],
+            "start": row["start_time"].timestamp(), "is_booked": row["is_booked"],
+        })
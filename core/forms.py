@@ -1,9 +1,13 @@
 # core/forms.py
+from datetime import date
+
 from django import forms
 from django.core.validators import MinValueValidator
 from accounts.models import Profile
+from . import intervals, series
+from .slot_generator import parse_breaks
 from .models import (
-    GymHall, GroupClass, IndividualSlot,
+    GymHall, GroupClass, GroupClassSeries, IndividualSlot,
     SiteInfo, Tariff
 )
 
@@ -12,8 +16,7 @@ def trainer_qs():
     return (
         Profile.objects
         .filter(role=Profile.Role.TRAINER)
-        .select_related("user")
-        .order_by("user__last_name", "user__first_name", "user__username")
+        .order_by("last_name", "first_name", "username")
     )
 
 
@@ -151,6 +154,102 @@ class GroupClassForm(forms.ModelForm):
         end = cleaned.get("end_time")
         if start and end and start >= end:
             raise forms.ValidationError("Час завершення має бути пізніше за час початку.")
+        if start and end:
+            trainer = cleaned.get("trainer")
+            hall = cleaned.get("hall")
+            conflicts = intervals.find_conflicts(
+                start, end,
+                trainer_id=trainer.pk if trainer else None,
+                hall_id=hall.pk if hall else None,
+                exclude=(intervals.GROUP, self.instance.pk) if self.instance.pk else None,
+            )
+            if conflicts:
+                raise forms.ValidationError(intervals.describe(conflicts))
+        return cleaned
+
+
+class GroupClassSeriesForm(forms.ModelForm):
+    weekdays = forms.TypedMultipleChoiceField(
+        choices=GroupClassSeries.Weekday.choices,
+        coerce=int,
+        widget=forms.CheckboxSelectMultiple,
+        label="Дні тижня",
+    )
+    exceptions = forms.CharField(
+        required=False,
+        label="Винятки",
+        help_text="Дати без заняття через кому: 2026-12-31, 2027-01-07",
+        widget=forms.TextInput(attrs={"placeholder": "РРРР-ММ-ДД, РРРР-ММ-ДД"}),
+    )
+
+    class Meta:
+        model = GroupClassSeries
+        fields = [
+            "title", "hall", "trainer", "weekdays", "start_time", "end_time",
+            "max_slots", "starts_on", "until", "exceptions",
+        ]
+        widgets = {
+            "start_time": forms.TimeInput(attrs={"type": "time"}),
+            "end_time": forms.TimeInput(attrs={"type": "time"}),
+            "starts_on": forms.DateInput(attrs={"type": "date"}),
+            "until": forms.DateInput(attrs={"type": "date"}),
+            "max_slots": forms.NumberInput(attrs={"min": 1, "step": 1}),
+        }
+        labels = {
+            "title": "Назва",
+            "hall": "Зал",
+            "trainer": "Тренер",
+            "start_time": "Початок",
+            "end_time": "Кінець",
+            "max_slots": "Макс. місць",
+            "starts_on": "Діє з",
+            "until": "Діє до (необов'язково)",
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["trainer"].queryset = trainer_qs()
+        self.fields["trainer"].empty_label = "— виберіть тренера —"
+        self.fields["hall"].empty_label = "— виберіть зал —"
+        if self.instance.pk:
+            self.initial["exceptions"] = ", ".join(self.instance.exceptions)
+
+        for name, f in self.fields.items():
+            if name == "weekdays":
+                continue
+            css = f.widget.attrs.get("class", "")
+            f.widget.attrs["class"] = (css + " form-control bg-dark text-white border-secondary").strip()
+
+    def clean_exceptions(self):
+        raw = self.cleaned_data.get("exceptions") or ""
+        days = []
+        for part in raw.replace(";", ",").split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                days.append(date.fromisoformat(part).isoformat())
+            except ValueError:
+                raise forms.ValidationError(f"Некоректна дата: {part}")
+        return sorted(set(days))
+
+    def clean(self):
+        cleaned = super().clean()
+        start, end = cleaned.get("start_time"), cleaned.get("end_time")
+        if start and end and start >= end:
+            raise forms.ValidationError("Час завершення має бути пізніше за час початку.")
+        starts_on, until = cleaned.get("starts_on"), cleaned.get("until")
+        if starts_on and until and until < starts_on:
+            raise forms.ValidationError("Дата завершення серії не може бути раніше за дату початку.")
+
+        if not self.errors and cleaned.get("trainer") and cleaned.get("hall"):
+            candidate = GroupClassSeries(**{
+                k: cleaned[k] for k in ("hall", "trainer", "weekdays", "start_time", "end_time", "starts_on", "until")
+            }, exceptions=cleaned.get("exceptions") or [])
+            found = series.first_conflict(candidate, exclude_series_id=self.instance.pk)
+            if found:
+                day, conflicts = found
+                raise forms.ValidationError(f"{day:%Y-%m-%d}: {intervals.describe(conflicts)}")
         return cleaned
 
 
@@ -188,6 +287,7 @@ class IndividualSlotForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         user = kwargs.pop("user", None)
         super().__init__(*args, **kwargs)
+        self.user = user
 
 
         self.fields["hall"].label = "Зал"
@@ -215,4 +315,144 @@ class IndividualSlotForm(forms.ModelForm):
         end = cleaned.get("end_time")
         if start and end and start >= end:
             raise forms.ValidationError("Час завершення має бути пізніше за час початку.")
+        if start and end:
+            hall = cleaned.get("hall")
+            trainer = self._slot_trainer(cleaned)
+            conflicts = intervals.find_conflicts(
+                start, end,
+                trainer_id=trainer.pk if trainer else None,
+                hall_id=hall.pk if hall else None,
+                exclude=(intervals.SLOT, self.instance.pk) if self.instance.pk else None,
+            )
+            if conflicts:
+                raise forms.ValidationError(intervals.describe(conflicts))
+        return cleaned
+
+    def _slot_trainer(self, cleaned):
+        """Тренер слоту так само, як його визначають view: сам тренер, вибір менеджера або поточний."""
+        profile = getattr(self.user, "profile", None)
+        if profile and profile.role == Profile.Role.TRAINER:
+            return profile
+        if cleaned.get("trainer"):
+            return cleaned["trainer"]
+        return self.instance.trainer if self.instance.trainer_id else None
+
+
+class SlotGeneratorForm(forms.Form):
+    trainer = forms.ModelChoiceField(
+        queryset=trainer_qs(),
+        required=False,
+        label="Тренер",
+        empty_label="— виберіть тренера —",
+    )
+    hall = forms.ModelChoiceField(queryset=GymHall.objects.all(), label="Зал", empty_label="— виберіть зал —")
+    date_from = forms.DateField(label="З дати", widget=forms.DateInput(attrs={"type": "date"}))
+    date_to = forms.DateField(label="По дату", widget=forms.DateInput(attrs={"type": "date"}))
+    weekdays = forms.TypedMultipleChoiceField(
+        choices=GroupClassSeries.Weekday.choices,
+        coerce=int,
+        initial=[0, 1, 2, 3, 4],
+        widget=forms.CheckboxSelectMultiple,
+        label="Дні тижня",
+    )
+    day_start = forms.TimeField(label="Початок дня", widget=forms.TimeInput(attrs={"type": "time"}))
+    day_end = forms.TimeField(label="Кінець дня", widget=forms.TimeInput(attrs={"type": "time"}))
+    slot_minutes = forms.IntegerField(label="Тривалість слоту, хв", min_value=15, max_value=480, initial=60)
+    gap_minutes = forms.IntegerField(label="Перерва між слотами, хв", min_value=0, max_value=240, initial=0)
+    breaks = forms.CharField(
+        required=False,
+        label="Перерви",
+        help_text="Напр.: 13:00-14:00, 17:00-17:30",
+        widget=forms.TextInput(attrs={"placeholder": "ГГ:ХХ-ГГ:ХХ"}),
+    )
+
+    MAX_DAYS = 92
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop("user", None)
+        super().__init__(*args, **kwargs)
+        self.user = user
+        if user and hasattr(user, "profile") and user.profile.role == Profile.Role.TRAINER:
+            self.fields.pop("trainer")
+        else:
+            self.fields["trainer"].required = True
+
+        for name, f in self.fields.items():
+            if name == "weekdays":
+                continue
+            css = f.widget.attrs.get("class", "")
+            f.widget.attrs["class"] = (css + " form-control bg-dark text-white border-secondary").strip()
+
+    def clean_breaks(self):
+        try:
+            return parse_breaks(self.cleaned_data.get("breaks"))
+        except ValueError as e:
+            raise forms.ValidationError(f"Некоректна перерва: {e}")
+
+    def clean(self):
+        cleaned = super().clean()
+        date_from, date_to = cleaned.get("date_from"), cleaned.get("date_to")
+        if date_from and date_to:
+            if date_to < date_from:
+                raise forms.ValidationError("Кінцева дата не може бути раніше за початкову.")
+            if (date_to - date_from).days > self.MAX_DAYS:
+                raise forms.ValidationError(f"Діапазон не може перевищувати {self.MAX_DAYS} днів.")
+        day_start, day_end = cleaned.get("day_start"), cleaned.get("day_end")
+        if day_start and day_end and day_start >= day_end:
+            raise forms.ValidationError("Кінець дня має бути пізніше за початок.")
+        return cleaned
+
+    @property
+    def slot_trainer(self):
+        profile = getattr(self.user, "profile", None)
+        if profile and profile.role == Profile.Role.TRAINER:
+            return profile
+        return self.cleaned_data.get("trainer")
+
+
+class SlotSearchForm(forms.Form):
+    """Пошук вільних індивідуальних тренувань (GET-параметри)."""
+    specialization = forms.ChoiceField(
+        choices=[("", "Будь-яка")] + list(Profile.Specialization.choices),
+        required=False,
+        label="Спеціалізація",
+    )
+    hall = forms.ModelChoiceField(
+        queryset=GymHall.objects.order_by("name"),
+        required=False,
+        empty_label="Будь-який",
+        label="Зал",
+    )
+    date_from = forms.DateField(required=False, label="З дати", widget=forms.DateInput(attrs={"type": "date"}))
+    date_to = forms.DateField(required=False, label="По дату", widget=forms.DateInput(attrs={"type": "date"}))
+    time_from = forms.TimeField(
+        required=False, label="Не раніше", widget=forms.TimeInput(attrs={"type": "time", "step": 900})
+    )
+    time_to = forms.TimeField(
+        required=False, label="Не пізніше", widget=forms.TimeInput(attrs={"type": "time", "step": 900})
+    )
+    weekdays = forms.TypedMultipleChoiceField(
+        choices=GroupClassSeries.Weekday.choices,
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        label="Дні тижня",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, f in self.fields.items():
+            if name == "weekdays":
+                continue
+            css = f.widget.attrs.get("class", "")
+            f.widget.attrs["class"] = (css + " form-control bg-dark text-white border-secondary").strip()
+
+    def clean(self):
+        cleaned = super().clean()
+        date_from, date_to = cleaned.get("date_from"), cleaned.get("date_to")
+        if date_from and date_to and date_to < date_from:
+            raise forms.ValidationError("Кінцева дата не може бути раніше за початкову.")
+        time_from, time_to = cleaned.get("time_from"), cleaned.get("time_to")
+        if time_from and time_to and time_to <= time_from:
+            raise forms.ValidationError("Кінець проміжку має бути пізніше за початок.")
         return cleaned
@@ -0,0 +1,119 @@
+# core/fragments.py
+"""
+Кеш фрагментів таблиць розкладу (заняття й слоти) за набором фільтрів.
+
+У кеші лежать рядки вікна разом із готовим HTML їхніх клітинок; кнопки
+конкретного користувача (записатися/скасувати/редагувати) шаблон додає
+вже поверх закешованих рядків.
+
+Інвалідація — через токени поколінь «день × зал» (і «день × усі зали»):
+ключ запису містить токени всіх днів вікна, а schedule.rebuild_day змінює
+токен свого дня, тож застарілий запис просто перестає бути досяжним.
+Токени зберігаються в кеші Django (CACHES); для кількох процесів потрібен
+спільний бекенд кешу.
+"""
+import hashlib
+import pickle
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+PREFIX = "schedule:frag"
+GLOBAL_GEN = f"{PREFIX}:gen:all"
+STATS = ("hits", "misses", "stores", "bytes")
+
+
+def _gen_key(day, hall_id=None) -> str:
+    return f"{PREFIX}:gen:{day.isoformat()}:{hall_id or '*'}"
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex
+
+
+def _count(name: str, n: int = 1) -> None:
+    key = f"{PREFIX}:stats:{name}"
+    if cache.add(key, n, None):
+        return
+    try:
+        cache.incr(key, n)
+    except ValueError:
+        cache.add(key, n, None)
+
+
+def invalidate_day(hall_id: int, day) -> None:
+    """Робить недосяжними записи, вікно яких містить цей день цього залу."""
+    cache.set_many({_gen_key(day, hall_id): _new_token(), _gen_key(day): _new_token()}, None)
+
+
+def invalidate_all() -> None:
+    cache.set(GLOBAL_GEN, _new_token(), None)
+
+
+def _tokens(keys) -> list:
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # токен міг бути витіснений — новий токен гарантує, що старі записи не повернуться
+            cache.add(key, _new_token(), None)
+    if len(found) < len(keys):
+        found = cache.get_many(keys)
+    return [found.get(key, "") for key in keys]
+
+
+def rows_key(start_dt, end_dt, hall_id=None, trainer_id=None) -> str:
+    """
+    Ключ запису для набору фільтрів. Обчислюється ДО читання даних:
+    якщо зміна станеться під час читання, запис збережеться під старими
+    токенами й ніколи не буде виданий.
+    """
+    first = timezone.localtime(start_dt).date()
+    last = timezone.localtime(end_dt).date()
+    gen_keys = [GLOBAL_GEN]
+    day = first
+    while day <= last:
+        gen_keys.append(_gen_key(day, hall_id))
+        day += timedelta(days=1)
+
+    parts = [str(hall_id or ""), str(trainer_id or ""), start_dt.isoformat(), end_dt.isoformat(), *_tokens(gen_keys)]
+    return f"{PREFIX}:rows:" + hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def get_rows(key: str):
+    """(groups, slots) із кешу або None."""
+    entry = cache.get(key)
+    if entry is None:
+        _count("misses")
+        return None
+    _count("hits")
+    return entry
+
+
+def store_rows(key: str, groups: list, slots: list) -> None:
+    """Рендерить клітинки рядків (додає поле cells) і кладе рядки в кеш."""
+    for template_name, rows, var in (
+        ("schedule/_group_cells.html", groups, "g"),
+        ("schedule/_slot_cells.html", slots, "s"),
+    ):
+        template = get_template(template_name)
+        for row in rows:
+            row["cells"] = mark_safe(template.render({var: row}))
+
+    entry = (groups, slots)
+    cache.set(key, entry, getattr(settings, "SCHEDULE_FRAGMENT_TTL", 600))
+    _count("stores")
+    _count("bytes", len(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)))
+
+
+def stats() -> dict:
+    values = cache.get_many([f"{PREFIX}:stats:{name}" for name in STATS])
+    data = {name: values.get(f"{PREFIX}:stats:{name}", 0) for name in STATS}
+    lookups = data["hits"] + data["misses"]
+    data["hit_rate"] = round(data["hits"] / lookups, 4) if lookups else 0.0
+    data["avg_entry_bytes"] = data["bytes"] // data["stores"] if data["stores"] else 0
+    return data
@@ -0,0 +1,212 @@
+# core/intervals.py
+"""
+Пошук накладок у розкладі: тренер, зал і клієнт не можуть бути зайняті
+двома заняттями/слотами одночасно.
+
+IntervalIndex — інтервали, відсортовані за початком. Запит на перетин із
+[start, end) дивиться лише на ті, що почались у [start - max_duration, end):
+двійковий пошук + короткий прохід, а не перебір усіх рядків.
+Індекси кешуються в процесі для кожного тренера/залу/клієнта, містять лише
+вікно від сьогодні на HORIZON уперед і перебудовуються, коли змінюється
+версія саме цього власника (лічильник у ModelVersion, спільний для всіх
+процесів; збільшують його сигнали через touch).
+"""
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from . import versions
+from .models import GroupClass, GroupClassSeries, GroupEnrollment, IndividualSlot, IndividualBooking
+
+GROUP = "group"
+SLOT = "slot"
+SERIES = "series"
+
+CACHE_SIZE = 1024
+
+
+class IntervalIndex:
+    """Незмінний індекс напіввідкритих інтервалів [start, end) з ключами."""
+
+    def __init__(self, items=(), bounds=None):
+        rows = sorted((_ts(start), _ts(end), key) for start, end, key in items)
+        # [lo, hi), для якого індекс повний; None — усі інтервали
+        self.bounds = (_ts(bounds[0]), _ts(bounds[1])) if bounds else None
+        self.starts = [r[0] for r in rows]
+        self.ends = [r[1] for r in rows]
+        self.keys = [r[2] for r in rows]
+        self.max_duration = max((e - s for s, e, _ in rows), default=0.0)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def covers(self, start=None, end=None) -> bool:
+        if self.bounds is None:
+            return True
+        lo, hi = self.bounds
+        return (start is None or _ts(start) >= lo) and (end is None or _ts(end) <= hi)
+
+    def overlapping(self, start, end, exclude=None) -> list:
+        """Ключі інтервалів, що перетинаються з [start, end), крім exclude."""
+        start, end = _ts(start), _ts(end)
+        lo = bisect_left(self.starts, start - self.max_duration)
+        hi = bisect_left(self.starts, end)
+        ends, keys = self.ends, self.keys
+        return [keys[i] for i in range(lo, hi) if ends[i] > start and keys[i] != exclude]
+
+
+def _ts(value) -> float:
+    return value if isinstance(value, float) else value.timestamp()
+
+
+# --- Кеш індексів -------------------------------------------------------------
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+OWNER_FIELDS = {"trainer": "trainer_id", "hall": "hall_id"}
+# Індекс покриває [початок сьогоднішнього дня, + HORIZON): з запасом понад
+# горизонт безстрокових серій (series.OPEN_SERIES_HORIZON). Запит поза цим
+# вікном (минуле, далеке майбутнє) будує індекс, розширений до запиту.
+HORIZON = timedelta(days=400)
+# Довше за добу заняття не тривають: межа для індексованої умови на start_time.
+MAX_DURATION = timedelta(days=1)
+
+
+def _label(owner: str, owner_id: int) -> str:
+    return f"intervals:{owner}:{owner_id}"
+
+
+def touch(*owners) -> None:
+    """
+    Позначає зайнятість власників (owner, id) зміненою: їхні індекси в усіх
+    процесах перебудуються при наступній перевірці. Викликається сигналами.
+    """
+    for owner, owner_id in set(owners):
+        if owner_id is not None:
+            versions.bump_label(_label(owner, owner_id))
+
+
+def _window():
+    tz = timezone.get_current_timezone()
+    lo = timezone.make_aware(datetime.combine(timezone.localdate(), time.min), tz)
+    return lo, lo + HORIZON
+
+
+def _items(owner: str, owner_id: int, lo, hi):
+    """Інтервали власника, що перетинають [lo, hi)."""
+    if owner == "client":
+        for pk, start, end in GroupEnrollment.objects.filter(
+            client_id=owner_id,
+            group_class__start_time__gte=lo - MAX_DURATION, group_class__start_time__lt=hi,
+        ).values_list("group_class_id", "group_class__start_time", "group_class__end_time"):
+            if end > lo:
+                yield start, end, (GROUP, pk)
+        for pk, start, end in IndividualBooking.objects.filter(
+            client_id=owner_id,
+            slot__start_time__gte=lo - MAX_DURATION, slot__start_time__lt=hi,
+        ).values_list("slot_id", "slot__start_time", "slot__end_time"):
+            if end > lo:
+                yield start, end, (SLOT, pk)
+        return
+
+    field = OWNER_FIELDS[owner]
+    for kind, model in ((GROUP, GroupClass), (SLOT, IndividualSlot)):
+        for pk, start, end in model.objects.filter(**{
+            field: owner_id, "start_time__gte": lo - MAX_DURATION, "start_time__lt": hi,
+        }).values_list("id", "start_time", "end_time"):
+            if end > lo:
+                yield start, end, (kind, pk)
+
+    from .series import occurrence_items
+    yield from occurrence_items(field, owner_id, timezone.localtime(lo).date(), timezone.localtime(hi).date())
+
+
+def index_for(owner: str, owner_id: int, start=None, end=None, token=None) -> IntervalIndex:
+    """
+    Індекс зайнятості тренера ("trainer"), залу ("hall") або клієнта ("client"),
+    що покриває [start, end) (за замовчуванням — вікно від сьогодні на HORIZON).
+    Береться з кешу, поки не змінилась версія саме цього власника.
+    """
+    if token is None:
+        token = versions.label_versions([_label(owner, owner_id)])[_label(owner, owner_id)]
+    cache_key = (owner, owner_id)
+    with _lock:
+        cached = _cache.get(cache_key)
+        if cached and cached[0] == token and cached[1].covers(start, end):
+            _cache.move_to_end(cache_key)
+            return cached[1]
+
+    lo, hi = _window()
+    if start is not None:
+        lo = min(lo, start)
+    if end is not None:
+        hi = max(hi, end)
+    index = IntervalIndex(_items(owner, owner_id, lo, hi), bounds=(lo, hi))
+    with _lock:
+        _cache[cache_key] = (token, index)
+        _cache.move_to_end(cache_key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+def find_conflicts(start, end, trainer_id=None, hall_id=None, client_id=None, exclude=None) -> dict:
+    """
+    Накладки для інтервалу [start, end): {"trainer"|"hall"|"client": [(kind, id), ...]}.
+    exclude — (kind, id) об'єкта, який редагується, щоб він не конфліктував сам із собою.
+    """
+    owners = [
+        (owner, owner_id)
+        for owner, owner_id in (("trainer", trainer_id), ("hall", hall_id), ("client", client_id))
+        if owner_id is not None
+    ]
+    # версії всіх власників — одним запитом
+    tokens = versions.label_versions(_label(*o) for o in owners)
+    conflicts = {}
+    for owner, owner_id in owners:
+        index = index_for(owner, owner_id, start, end, token=tokens[_label(owner, owner_id)])
+        found = index.overlapping(start, end, exclude)
+        if found:
+            conflicts[owner] = found
+    return conflicts
+
+
+def describe(conflicts: dict) -> str:
+    """Текст помилки для форми/повідомлення."""
+    labels = {"trainer": "Тренер уже зайнятий", "hall": "Зал уже зайнятий", "client": "У вас уже є запис"}
+    keys = [key for items in conflicts.values() for key in items]
+    titles = {}
+    group_ids = {pk for kind, pk in keys if kind == GROUP}
+    if group_ids:
+        titles.update(
+            ((GROUP, pk), title)
+            for pk, title in GroupClass.objects.filter(pk__in=group_ids).values_list("id", "title")
+        )
+    series_ids = {key[1][0] for key in keys if key[0] == SERIES}
+    if series_ids:
+        titles.update(
+            ((SERIES, pk), title)
+            for pk, title in GroupClassSeries.objects.filter(pk__in=series_ids).values_list("id", "title")
+        )
+
+    parts = []
+    for owner, items in conflicts.items():
+        names = []
+        for kind, pk in items[:3]:
+            if kind == SLOT:
+                names.append("індивідуальне тренування")
+            elif kind == SERIES:
+                names.append(f"«{titles.get((SERIES, pk[0]), pk[0])}» ({pk[1]})")
+            else:
+                names.append(f"«{titles.get((GROUP, pk), pk)}»")
+        parts.append(f"{labels[owner]} у цей час: {', '.join(dict.fromkeys(names))}.")
+    return " ".join(parts)
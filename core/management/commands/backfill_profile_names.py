@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from accounts.models import USER_MIRROR_FIELDS, Profile
+from accounts.search import reindex
+from core import versions
+from core.mongo import collection, is_mongo
+
+
+class Command(BaseCommand):
+    help = (
+        "Копіює username/first_name/last_name з User у Profile для наявних записів "
+        "і перебудовує токени пошуку змінених профілів."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Користувачів за один пакет")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        fields = ("id", *USER_MIRROR_FIELDS)
+        last_pk, checked, changed = 0, 0, 0
+
+        while True:
+            users = list(User.objects.filter(pk__gt=last_pk).order_by("pk").values(*fields)[:batch_size])
+            if not users:
+                break
+            last_pk = users[-1]["id"]
+            by_user = {u["id"]: u for u in users}
+            stale = []
+            for profile in Profile.objects.filter(user_id__in=by_user):
+                values = {name: by_user[profile.user_id][name] for name in USER_MIRROR_FIELDS}
+                if any(getattr(profile, name) != value for name, value in values.items()):
+                    stale.append((profile, values))
+            checked += len(users)
+
+            if stale and is_mongo():
+                # один bulk_write на пакет замість запиту на кожен профіль
+                collection(Profile).bulk_write(
+                    [UpdateOne({"id": profile.pk}, {"$set": values}) for profile, values in stale],
+                    ordered=False,
+                )
+            else:
+                for profile, values in stale:
+                    Profile.objects.filter(pk=profile.pk).update(**values)
+            for profile, values in stale:
+                for name, value in values.items():
+                    setattr(profile, name, value)
+                reindex(profile)
+            changed += len(stale)
+
+        if changed:
+            # імена тренерів входять у валідатори сторінки розкладу
+            versions.bump(Profile)
+        self.stdout.write(self.style.SUCCESS(f"Перевірено користувачів: {checked}; оновлено профілів: {changed}"))
@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ("/schedule/", "/price/", "/about/", "/halls/")
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def session_cookie(username) -> str:
+    """Сесія в базі для користувача, як після входу: значення для заголовка Cookie."""
+    user = get_user_model().objects.filter(username=username).first()
+    if user is None:
+        raise CommandError(f"Користувача {username!r} не знайдено")
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+
+def fetch(url, cookie=None):
+    """(мс, статус) одного GET-запиту."""
+    request = Request(url, headers={"Cookie": cookie} if cookie else {})
+    t0 = time.perf_counter()
+    try:
+        with urlopen(request, timeout=30) as response:
+            response.read()
+            status = response.status
+    except HTTPError as exc:
+        status = exc.code
+    return (time.perf_counter() - t0) * 1000, status
+
+
+def run(url, requests, concurrency, cookie=None):
+    """Навантаження на url; повертає (затримки в мс за зростанням, помилки, RPS)."""
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: fetch(url, cookie), range(requests)))
+    elapsed = time.perf_counter() - t0
+    timings = sorted(ms for ms, _ in results)
+    errors = sum(1 for _, status in results if status >= 400)
+    return timings, errors, requests / elapsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк сторінок лише для читання під WSGI і ASGI: p50/p99 затримки і запитів/с. "
+        "Обидва розгортання мають бути запущені, наприклад: "
+        "gunicorn sport_gym.wsgi -w 4 -b :8000 та "
+        "ASYNC_VIEWS=True uvicorn sport_gym.asgi:application --workers 4 --port 8001."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "targets", nargs="+",
+            help="Розгортання у вигляді назва=базова_адреса, наприклад wsgi=http://127.0.0.1:8000",
+        )
+        parser.add_argument("--path", action="append", dest="paths", help="Сторінка (можна кілька разів)")
+        parser.add_argument("--requests", type=int, default=500, help="Запитів на сторінку")
+        parser.add_argument("--concurrency", type=int, default=20, help="Одночасних запитів")
+        parser.add_argument("--warmup", type=int, default=20, help="Запитів прогріву (не враховуються)")
+        parser.add_argument("--username", help="Від імені користувача (сесія створюється в базі)")
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["targets"]:
+            name, sep, base = target.partition("=")
+            if not sep:
+                name, base = target, target
+            targets.append((name, base.rstrip("/")))
+        paths = options["paths"] or DEFAULT_PATHS
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests і --concurrency мають бути додатними")
+        cookie = session_cookie(options["username"]) if options["username"] else None
+
+        self.stdout.write(f"{'розгортання':<12} {'сторінка':<12} {'p50 мс':>8} {'p99 мс':>8} {'зап/с':>8} {'помилок':>8}")
+        for path in paths:
+            for name, base in targets:
+                url = base + path
+                if options["warmup"]:
+                    run(url, options["warmup"], options["concurrency"], cookie)
+                timings, errors, rps = run(url, options["requests"], options["concurrency"], cookie)
+                self.stdout.write(
+                    f"{name:<12} {path:<12} {_percentile(timings, 0.5):>8.1f} "
+                    f"{_percentile(timings, 0.99):>8.1f} {rps:>8.1f} {errors:>8}"
+                )
@@ -0,0 +1,130 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import Profile
+from core import intervals
+from core.intervals import IntervalIndex
+from core.models import GymHall
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def _summary(timings) -> str:
+    timings = sorted(timings)
+    if not timings:
+        return "—"
+    return (
+        f"середнє {sum(timings) / len(timings):.1f}, p50 {_percentile(timings, 0.5):.1f}, "
+        f"p99 {_percentile(timings, 0.99):.1f}, макс {timings[-1]:.1f}"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк перевірки накладок: find_conflicts на даних бази (тренер + зал + клієнт, "
+        "холодний і теплий кеш індексів) або --synthetic — лише IntervalIndex у пам'яті."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=10_000, help="Кількість запитів")
+        parser.add_argument("--owners", type=int, default=200, help="Скільки тренерів/залів/клієнтів брати у вибірку")
+        parser.add_argument("--days", type=int, default=30, help="Запити на найближчі N днів")
+        parser.add_argument("--synthetic", action="store_true", help="Синтетичний індекс без бази")
+        parser.add_argument("--slots", type=int, default=100_000, help="Інтервалів для --synthetic")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options["synthetic"]:
+            self._synthetic(options)
+        else:
+            self._database(options)
+
+    def _database(self, options):
+        rnd = random.Random(options["seed"])
+
+        def sample(ids):
+            ids = sorted(ids)
+            return rnd.sample(ids, min(len(ids), options["owners"]))
+
+        trainers = sample(Profile.objects.filter(role=Profile.Role.TRAINER).values_list("id", flat=True))
+        halls = sample(GymHall.objects.values_list("id", flat=True))
+        clients = sample(Profile.objects.filter(role=Profile.Role.CLIENT).values_list("id", flat=True))
+        if not (trainers and halls and clients):
+            raise CommandError("Потрібні тренери, зали й клієнти в базі (напр., manage.py seed_gym)")
+
+        tz = timezone.get_current_timezone()
+        base = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()), tz)
+        intervals.clear_cache()
+        seen = set()
+        cold, warm, warm_queries, found = [], [], [], 0
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(options["queries"]):
+                owners = (("trainer", rnd.choice(trainers)), ("hall", rnd.choice(halls)), ("client", rnd.choice(clients)))
+                start = base + timedelta(minutes=15 * rnd.randrange(options["days"] * 96))
+                is_cold = not seen.issuperset(owners)
+                seen.update(owners)
+
+                before = len(ctx.captured_queries)
+                t0 = time.perf_counter_ns()
+                found += bool(intervals.find_conflicts(
+                    start, start + timedelta(hours=1),
+                    trainer_id=owners[0][1], hall_id=owners[1][1], client_id=owners[2][1],
+                ))
+                elapsed = (time.perf_counter_ns() - t0) / 1000
+                if is_cold:
+                    cold.append(elapsed)
+                else:
+                    warm.append(elapsed)
+                    warm_queries.append(len(ctx.captured_queries) - before)
+
+        self.stdout.write(
+            f"Власників у вибірці: тренерів {len(trainers)}, залів {len(halls)}, клієнтів {len(clients)}; "
+            f"запитів з накладками: {found}"
+        )
+        self.stdout.write(f"find_conflicts, холодний кеш ({len(cold)}), мкс: {_summary(cold)}")
+        self.stdout.write(f"find_conflicts, теплий кеш ({len(warm)}), мкс: {_summary(warm)}")
+        if warm_queries:
+            self.stdout.write(f"Запитів до бази на теплий виклик: {sum(warm_queries) / len(warm_queries):.2f}")
+
+    def _synthetic(self, options):
+        rnd = random.Random(options["seed"])
+        base = datetime(2026, 1, 1).timestamp()
+        year = 365 * 24 * 3600
+
+        items = []
+        for i in range(options["slots"]):
+            start = base + rnd.randrange(0, year, 900)
+            items.append((float(start), float(start + rnd.choice((30, 45, 60, 90, 120)) * 60), ("slot", i)))
+
+        t0 = time.perf_counter()
+        index = IntervalIndex(items)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        timings = []
+        found = 0
+        for _ in range(options["queries"]):
+            start = float(base + rnd.randrange(0, year, 900))
+            end = start + 3600
+            t0 = time.perf_counter_ns()
+            found += len(index.overlapping(start, end))
+            timings.append((time.perf_counter_ns() - t0) / 1000)
+
+        scan_queries = min(100, options["queries"])
+        t0 = time.perf_counter()
+        for _ in range(scan_queries):
+            start = float(base + rnd.randrange(0, year, 900))
+            end = start + 3600
+            [k for s, e, k in items if s < end and e > start]
+        scan_us = (time.perf_counter() - t0) / scan_queries * 1_000_000
+
+        self.stdout.write(f"Інтервалів: {len(index)}; побудова: {build_ms:.1f} мс")
+        self.stdout.write(f"Запит (мкс): {_summary(timings)}; знайдено перетинів: {found}")
+        self.stdout.write(f"Повний перебір для порівняння: {scan_us:.0f} мкс/запит")
@@ -21,10 +21,10 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         users_data = [
-            # username, password, role, full_name, first_name, last_name, gender
-            ("client", "clientpass", Profile.Role.CLIENT, "Клієнт", "Іван", "Клієнт", "male"),
-            ("trainer", "trainerpass", Profile.Role.TRAINER, "Тренер", "Олег", "Тренер", "male"),
-            ("manager", "managerpass", Profile.Role.MANAGER, "Менеджер", "Марія", "Менеджер", "female"),
+            # username, password, role, first_name, last_name, gender
+            ("client", "clientpass", Profile.Role.CLIENT, "Іван", "Клієнт", "male"),
+            ("trainer", "trainerpass", Profile.Role.TRAINER, "Олег", "Тренер", "male"),
+            ("manager", "managerpass", Profile.Role.MANAGER, "Марія", "Менеджер", "female"),
 
         ]
         usernames = [u[0] for u in users_data]
@@ -33,7 +33,7 @@ class Command(BaseCommand):
             deleted = User.objects.filter(username__in=usernames).delete()
             self.stdout.write(self.style.WARNING(f"️Видалено користувачів/профілів: {deleted}"))
 
-        for username, password, role, full_name, first_name, last_name, gender in users_data:
+        for username, password, role, first_name, last_name, gender in users_data:
             with transaction.atomic():
                 user, u_created = User.objects.get_or_create(
                     username=username,
@@ -70,8 +70,8 @@ class Command(BaseCommand):
                 profile, p_created = Profile.objects.get_or_create(
                     user=user,
                     defaults={
-                        "full_name": full_name,
                         "gender": gender,
+                        "email": user.email,
                         "role": role,
                         "phone": "0990000000",
                     },
@@ -83,15 +83,19 @@ class Command(BaseCommand):
                     if profile.role != role:
                         profile.role = role
                         changed.append("role")
-                    if not profile.full_name:
-                        profile.full_name = full_name
-                        changed.append("full_name")
+                    if not profile.email:
+                        profile.email = user.email
+                        changed.append("email")
                     if not profile.phone:
                         profile.phone = "0990000000"
                         changed.append("phone")
                     if not profile.gender:
                         profile.gender = gender
                         changed.append("gender")
+                    if role == Profile.Role.TRAINER and not profile.status:
+                        profile.status = Profile.TrainerStatus.TRAINER
+                        profile.specialization = Profile.Specialization.FITNESS
+                        changed += ["status", "specialization"]
                     if changed:
                         profile.save()
                         self.stdout.write(f"   ↳ Профіль оновлено ({', '.join(changed)})")
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Profile
+from core.models import GymHall
+from core.slot_generator import DEFAULT_BATCH_SIZE, SlotOverlapError, generate_slots, parse_breaks
+
+
+class Command(BaseCommand):
+    help = "Масово створює індивідуальні слоти тренера за правилом; накладки пропускаються."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--trainer", required=True, help="id або логін тренера")
+        parser.add_argument("--hall", required=True, help="id або назва залу")
+        parser.add_argument("--from", dest="date_from", required=True, help="Перший день, РРРР-ММ-ДД")
+        parser.add_argument("--to", dest="date_to", required=True, help="Останній день, РРРР-ММ-ДД")
+        parser.add_argument("--start", default="09:00", help="Початок робочого дня, ГГ:ХХ")
+        parser.add_argument("--end", default="18:00", help="Кінець робочого дня, ГГ:ХХ")
+        parser.add_argument("--length", type=int, default=60, help="Тривалість слоту, хв")
+        parser.add_argument("--gap", type=int, default=0, help="Проміжок між слотами, хв")
+        parser.add_argument("--break", dest="breaks", action="append", default=[],
+                            help="Перерва ГГ:ХХ-ГГ:ХХ (можна кілька разів)")
+        parser.add_argument("--weekdays", default="0,1,2,3,4", help="Дні тижня через кому, 0 — понеділок")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Лише порахувати, нічого не записувати")
+
+    def _date(self, value):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"Невірна дата: {value}")
+
+    def _time(self, value):
+        try:
+            return datetime.strptime(value, "%H:%M").time()
+        except ValueError:
+            raise CommandError(f"Невірний час: {value}")
+
+    def _trainer(self, value):
+        trainers = Profile.objects.filter(role=Profile.Role.TRAINER)
+        lookup = {"pk": int(value)} if value.isdigit() else {"user__username": value}
+        try:
+            return trainers.get(**lookup)
+        except Profile.DoesNotExist:
+            raise CommandError(f"Тренера не знайдено: {value}")
+
+    def _hall(self, value):
+        lookup = {"pk": int(value)} if value.isdigit() else {"name": value}
+        try:
+            return GymHall.objects.get(**lookup)
+        except GymHall.DoesNotExist:
+            raise CommandError(f"Зал не знайдено: {value}")
+
+    def handle(self, *args, **options):
+        date_from, date_to = self._date(options["date_from"]), self._date(options["date_to"])
+        day_start, day_end = self._time(options["start"]), self._time(options["end"])
+        if date_to < date_from:
+            raise CommandError("Кінцева дата раніше початкової")
+        if day_end <= day_start:
+            raise CommandError("Кінець робочого дня має бути пізніше початку")
+        if options["length"] <= 0 or options["gap"] < 0 or options["batch_size"] <= 0:
+            raise CommandError("Тривалість і розмір пакета мають бути додатними, проміжок — невід'ємним")
+        try:
+            breaks = parse_breaks(",".join(options["breaks"]))
+            weekdays = {int(d) for d in options["weekdays"].split(",") if d.strip()}
+        except ValueError as exc:
+            raise CommandError(f"Невірне значення: {exc}")
+        if not weekdays or not weekdays <= set(range(7)):
+            raise CommandError("Дні тижня — числа від 0 до 6")
+
+        try:
+            report = generate_slots(
+                self._trainer(options["trainer"]), self._hall(options["hall"]),
+                date_from, date_to, day_start, day_end, options["length"],
+                gap_minutes=options["gap"], breaks=breaks, weekdays=weekdays,
+                batch_size=options["batch_size"], dry_run=options["dry_run"],
+            )
+        except SlotOverlapError:
+            raise CommandError("Частину слотів щойно створив інший генератор; запустіть команду ще раз")
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Заплановано: {report['planned']}, створено: {report['created']}, "
+            f"пропущено через накладки: {report['skipped']}"
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importer import CHUNK_SIZE, FORMATS, detect_format, import_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Масовий імпорт користувачів із CSV (з рядком заголовків) або NDJSON. "
+        "Друкує помилки по рядках і швидкість імпорту (рядків/с)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл .csv, .ndjson або .jsonl")
+        parser.add_argument("--format", choices=FORMATS, help="Формат (за замовчуванням — за розширенням)")
+        parser.add_argument("--workers", type=int, help="Процесів для хешування паролів (0 — без пулу)")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Рядків в одному пакеті")
+        parser.add_argument("--dry-run", action="store_true", help="Лише перевірка, без запису")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size має бути додатним")
+        fmt = options["format"] or detect_format(options["path"])
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+                report = import_users(
+                    stream, fmt, workers=options["workers"],
+                    chunk_size=options["chunk_size"], dry_run=options["dry_run"],
+                )
+        except OSError as exc:
+            raise CommandError(f"Не вдалося прочитати файл: {exc}")
+
+        for error in report.errors:
+            self.stderr.write(f"рядок {error.line} [{error.username or '—'}]: {error.message}")
+        timings = ", ".join(f"{name} {seconds:.2f} с" for name, seconds in report.timings.items())
+        self.stdout.write(
+            f"Рядків: {report.rows}; коректних: {report.valid}; створено: {report.created}; "
+            f"помилок: {len(report.errors)}"
+        )
+        self.stdout.write(f"Час: {report.seconds:.2f} с ({timings}); {report.rows_per_second:.0f} рядків/с")
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.schedule import rebuild_range
+
+
+class Command(BaseCommand):
+    help = "Перебудовує денормалізований розклад ScheduleDay (зал × день) з первинних таблиць."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", help="Перший день, РРРР-ММ-ДД")
+        parser.add_argument("--to", dest="date_to", help="Останній день, РРРР-ММ-ДД")
+
+    def _date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"Невірна дата: {value}")
+
+    def handle(self, *args, **options):
+        created = rebuild_range(self._date(options["date_from"]), self._date(options["date_to"]))
+        self.stdout.write(self.style.SUCCESS(f"Документів розкладу: {created}"))
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.search import reindex_all
+
+
+class Command(BaseCommand):
+    help = "Перебудовує токени пошуку людей (ProfileSearchToken) для всіх профілів."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Профілів за один пакет")
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        total = reindex_all(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Профілів проіндексовано: {total} за {time.perf_counter() - t0:.1f} с"
+        ))
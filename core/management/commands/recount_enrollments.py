@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.booking import recount_enrollments
+
+
+class Command(BaseCommand):
+    help = "Заповнює/виправляє GroupClass.enrolled_count за фактичними записами на заняття."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--class",
+            dest="class_ids",
+            type=int,
+            action="append",
+            help="ID заняття (можна повторювати). За замовчуванням — усі заняття",
+        )
+
+    def handle(self, *args, **options):
+        fixed = recount_enrollments(options["class_ids"])
+        if fixed:
+            self.stdout.write(self.style.WARNING(f"Виправлено лічильників: {fixed}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Усі лічильники актуальні"))
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.analytics import pending_range, rollup_range
+
+
+class Command(BaseCommand):
+    help = (
+        "Підсумовує завантаженість залів по днях (HallDailyRollup). "
+        "Без параметрів — лише дні після останнього підсумку до вчора."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", help="Перший день, РРРР-ММ-ДД (перерахувати заново)")
+        parser.add_argument("--to", dest="date_to", help="Останній день, РРРР-ММ-ДД")
+
+    def _date(self, value):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"Невірна дата: {value}")
+
+    def handle(self, *args, **options):
+        if options["date_from"]:
+            date_from = self._date(options["date_from"])
+            date_to = self._date(options["date_to"]) if options["date_to"] else date_from
+            if date_to < date_from:
+                raise CommandError("Кінцева дата раніше початкової")
+        else:
+            pending = pending_range()
+            if pending is None:
+                self.stdout.write(self.style.SUCCESS("Підсумки актуальні"))
+                return
+            date_from, date_to = pending
+
+        days = rollup_range(date_from, date_to)
+        self.stdout.write(self.style.SUCCESS(f"Днів підсумовано: {days} ({date_from} — {date_to})"))
@@ -0,0 +1,74 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.mongo import is_mongo, sync_indexes
+
+
+def _keys(idx) -> str:
+    return ", ".join(col if direction == 1 else f"{col} {direction}" for col, direction in idx["key"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Звіряє індекси колекцій MongoDB з оголошеними в моделях "
+        "(db_index, unique, unique_together, Meta.indexes): створює відсутні, "
+        "показує зайві й розбіжності."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "app_labels", nargs="*",
+            help="Обмежити застосунками (напр. core accounts). За замовчуванням — усі моделі",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Лише звіт, без змін у БД")
+        parser.add_argument("--drop-extra", action="store_true", help="Видалити неоголошені індекси")
+
+    def handle(self, *args, **options):
+        if not is_mongo():
+            raise CommandError("Команда працює лише з MongoDB (djongo).")
+
+        labels = options["app_labels"]
+        try:
+            configs = [apps.get_app_config(label) for label in labels] if labels else apps.get_app_configs()
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        dropping = options["drop_extra"] and not options["dry_run"]
+        created = problems = 0
+        for config in configs:
+            for model in config.get_models(include_auto_created=True):
+                if not model._meta.managed or model._meta.proxy:
+                    continue
+                report = sync_indexes(model, dry_run=options["dry_run"], drop_extra=options["drop_extra"])
+                table = model._meta.db_table
+                failed = {e["index"]["name"] for e in report["errors"]}
+
+                for spec in report["missing"]:
+                    if spec["name"] in failed:
+                        continue
+                    verb = "Бракує" if options["dry_run"] else "Створено"
+                    self.stdout.write(f"{table}: {verb} {spec['name']} ({_keys(spec)})")
+                    created += not options["dry_run"]
+                for err in report["errors"]:
+                    problems += 1
+                    verb = "видалити" if err["action"] == "drop" else "створити"
+                    self.stdout.write(self.style.ERROR(
+                        f"{table}: не вдалося {verb} {err['index']['name']}: {err['error']}"
+                    ))
+                for idx in report["extra"]:
+                    if dropping and idx["name"] in failed:
+                        continue
+                    problems += not dropping
+                    verb = "Видалено зайвий" if dropping else "Зайвий"
+                    self.stdout.write(self.style.WARNING(f"{table}: {verb} {idx['name']} ({_keys(idx)})"))
+                for d in report["drift"]:
+                    problems += 1
+                    self.stdout.write(self.style.WARNING(
+                        f"{table}: розбіжність {d['existing']['name']} ({_keys(d['existing'])}): "
+                        f"unique={d['existing']['unique']}, оголошено unique={d['declared']['unique']}"
+                    ))
+
+        if options["dry_run"] or problems:
+            self.stdout.write(self.style.WARNING(f"Створено: {created}; проблем: {problems}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Індекси узгоджено. Створено: {created}"))
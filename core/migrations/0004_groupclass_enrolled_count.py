@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_auto_20251028_0115'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='groupclass',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
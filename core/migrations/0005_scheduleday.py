@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-17 11:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_groupclass_enrolled_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('hall_name', models.CharField(max_length=100)),
+                ('groups', models.JSONField(default=list)),
+                ('slots', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_days', to='core.gymhall')),
+            ],
+            options={
+                'unique_together': {('hall', 'day')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='scheduleday',
+            index=models.Index(fields=['day', 'hall'], name='core_schedu_day_f3544b_idx'),
+        ),
+    ]
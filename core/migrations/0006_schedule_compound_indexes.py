@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-17 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_scheduleday'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='groupclass',
+            index=models.Index(fields=['start_time', 'hall', 'trainer'], name='core_groupc_start_t_2cab57_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='individualslot',
+            index=models.Index(fields=['start_time', 'hall', 'trainer'], name='core_indivi_start_t_47c3fd_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-17 15:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_profile_specialization'),
+        ('core', '0007_modelversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupClassSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=120)),
+                ('weekdays', models.JSONField(default=list)),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('max_slots', models.PositiveIntegerField()),
+                ('starts_on', models.DateField()),
+                ('until', models.DateField(blank=True, null=True)),
+                ('exceptions', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series', to='core.gymhall')),
+                ('trainer', models.ForeignKey(limit_choices_to={'role': 'trainer'}, on_delete=django.db.models.deletion.CASCADE, to='accounts.profile')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='groupclass',
+            name='series',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='core.groupclassseries'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupclass',
+            constraint=models.UniqueConstraint(condition=models.Q(('series__isnull', False)), fields=('series', 'start_time'), name='uniq_series_occurrence'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_groupclassseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HallDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('capacity', models.PositiveIntegerField()),
+                ('person_minutes', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='core.gymhall')),
+            ],
+            options={
+                'unique_together': {('hall', 'day')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='halldailyrollup',
+            index=models.Index(fields=['day', 'hall'], name='core_hallda_day_26c423_idx'),
+        ),
+    ]
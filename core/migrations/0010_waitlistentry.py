@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_profile_specialization'),
+        ('core', '0009_halldailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(limit_choices_to={'role': 'client'}, on_delete=django.db.models.deletion.CASCADE, to='accounts.profile')),
+                ('group_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='core.groupclass')),
+            ],
+            options={
+                'unique_together': {('group_class', 'client')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(fields=['group_class', 'id'], name='core_waitli_group_c_07471f_idx'),
+        ),
+    ]
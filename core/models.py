@@ -90,6 +90,43 @@ class GymHall(models.Model):
         return self.name
 
 
+class GroupClassSeries(models.Model):
+    """
+    Серія групових занять за правилом повторення: дні тижня, час,
+    період дії та дати-винятки. Окремі заняття (GroupClass) не зберігаються
+    наперед — розклад розгортає їх для потрібного вікна (core/series.py),
+    а рядок GroupClass створюється під час першого запису клієнта.
+    """
+    class Weekday(models.IntegerChoices):
+        MON = 0, "Пн"
+        TUE = 1, "Вт"
+        WED = 2, "Ср"
+        THU = 3, "Чт"
+        FRI = 4, "Пт"
+        SAT = 5, "Сб"
+        SUN = 6, "Нд"
+
+    title = models.CharField(max_length=120)
+    hall = models.ForeignKey(GymHall, on_delete=models.CASCADE, related_name="series")
+    trainer = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        limit_choices_to={"role": Profile.Role.TRAINER},
+    )
+    weekdays = models.JSONField(default=list)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    max_slots = models.PositiveIntegerField()
+    starts_on = models.DateField()
+    until = models.DateField(null=True, blank=True)
+    exceptions = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        days = ", ".join(self.Weekday(d).label for d in sorted(self.weekdays))
+        return f"{self.title} — {days} {self.start_time:%H:%M}"
+
+
 class GroupClass(models.Model):
     title = models.CharField(max_length=120)
     hall = models.ForeignKey(GymHall, on_delete=models.CASCADE, related_name="classes")
@@ -101,6 +138,27 @@ class GroupClass(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     max_slots = models.PositiveIntegerField()
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
+    series = models.ForeignKey(
+        GroupClassSeries,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="occurrences",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["start_time", "hall", "trainer"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["series", "start_time"],
+                condition=models.Q(series__isnull=False),
+                name="uniq_series_occurrence",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} — {self.start_time:%Y-%m-%d %H:%M}"
@@ -121,6 +179,28 @@ class GroupEnrollment(models.Model):
         unique_together = ("group_class", "client")
 
 
+class WaitlistEntry(models.Model):
+    """
+    Місце клієнта в черзі на заповнене заняття. Черга FIFO за id:
+    коли місце звільняється, першого в черзі записує booking.promote_waitlist.
+    """
+    group_class = models.ForeignKey(
+        GroupClass, on_delete=models.CASCADE, related_name="waitlist"
+    )
+    client = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        limit_choices_to={"role": Profile.Role.CLIENT},
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("group_class", "client")
+        indexes = [
+            models.Index(fields=["group_class", "id"]),
+        ]
+
+
 class IndividualSlot(models.Model):
     trainer = models.ForeignKey(
         Profile,
@@ -134,6 +214,9 @@ class IndividualSlot(models.Model):
 
     class Meta:
         unique_together = ("trainer", "start_time", "end_time", "hall")
+        indexes = [
+            models.Index(fields=["start_time", "hall", "trainer"]),
+        ]
 
 
 class IndividualBooking(models.Model):
@@ -146,3 +229,66 @@ class IndividualBooking(models.Model):
         limit_choices_to={"role": Profile.Role.CLIENT},
     )
     created_at = models.DateTimeField(auto_now_add=True)
+
+
+class ScheduleDay(models.Model):
+    """
+    Денормалізований розклад: один документ на зал на день.
+    Містить готові до показу рядки групових занять і слотів
+    (назви, імена тренерів, час, місця), щоб сторінка розкладу
+    читала їх одним індексованим запитом без $lookup.
+    Підтримується сигналами (core/signals.py).
+    """
+    hall = models.ForeignKey(GymHall, on_delete=models.CASCADE, related_name="schedule_days")
+    day = models.DateField()
+    hall_name = models.CharField(max_length=100)
+    groups = models.JSONField(default=list)
+    slots = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("hall", "day")
+        indexes = [
+            models.Index(fields=["day", "hall"]),
+        ]
+
+    def __str__(self):
+        return f"{self.hall_name} — {self.day:%Y-%m-%d}"
+
+
+class ModelVersion(models.Model):
+    """
+    Лічильник змін моделі (label — "app_label.model_name") або зайнятості
+    одного тренера/залу/клієнта (label — "intervals:trainer:<id>", core/intervals.py).
+    Збільшується сигналами на кожне збереження/видалення;
+    з нього будуються ETag/Last-Modified сторінок (core/versions.py).
+    """
+    label = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
+
+
+class HallDailyRollup(models.Model):
+    """
+    Підсумок завантаженості залу за один завершений день: людино-хвилини
+    в кожній годині місцевого часу (групові записи + бронювання слотів).
+    Будується командою rollup_hall_usage; теплова карта й прогноз
+    (core/analytics.py) читають лише ці рядки, а не сирі записи.
+    """
+    hall = models.ForeignKey(GymHall, on_delete=models.CASCADE, related_name="daily_rollups")
+    day = models.DateField()
+    capacity = models.PositiveIntegerField()
+    person_minutes = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("hall", "day")
+        indexes = [
+            models.Index(fields=["day", "hall"]),
+        ]
+
+    def __str__(self):
+        return f"{self.hall_id} — {self.day:%Y-%m-%d}"
@@ -0,0 +1,376 @@
+# core/mongo.py
+import json
+from datetime import datetime
+
+from django.db import connections, models
+from django.utils import timezone
+from pymongo.errors import PyMongoError
+
+
+def is_mongo(using: str = "default") -> bool:
+    """Чи працює БД через djongo (MongoDB), а не через SQL-бекенд."""
+    return connections[using].vendor == "djongo"
+
+
+def get_database(using: str = "default"):
+    """Нативний об'єкт pymongo.Database поточного з'єднання djongo."""
+    conn = connections[using]
+    conn.ensure_connection()
+    return conn.connection
+
+
+def collection(model, using: str = "default"):
+    """Колекція MongoDB, у якій djongo зберігає модель."""
+    return get_database(using)[model._meta.db_table]
+
+
+# --- Нативний шлях даних для сторінки розкладу ------------------------------
+
+def _aware(value):
+    """djongo зберігає DateTimeField як naive UTC — повертаємо aware datetime."""
+    if value is None or timezone.is_aware(value):
+        return value
+    return timezone.make_aware(value, timezone.utc)
+
+
+def _naive_utc(value):
+    return timezone.make_naive(value, timezone.utc) if timezone.is_aware(value) else value
+
+
+def _as_mongo_date(day):
+    """DateField у djongo — це datetime опівночі без часового поясу."""
+    return datetime.combine(day, datetime.min.time())
+
+
+def _json(value):
+    return json.loads(value) if isinstance(value, str) else (value or [])
+
+
+def _date(value):
+    """DateField з документа djongo (datetime опівночі) -> date."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _time(value):
+    """TimeField у djongo — datetime 1900-01-01 з потрібним часом."""
+    return value.time() if isinstance(value, datetime) else value
+
+
+def _series_list(docs, catalogue) -> list:
+    """GroupClassSeries з документів колекції серій; зал і тренер — з довідників агрегації, без запитів."""
+    from accounts.models import Profile
+    from .models import GroupClassSeries, GymHall
+
+    hall_names = {h["id"]: h["name"] for h in catalogue["halls"]}
+    trainers = {t["id"]: t for t in catalogue["trainers"]}
+    result = []
+    for d in docs:
+        s = GroupClassSeries(
+            id=d["id"], title=d["title"], hall_id=d["hall_id"], trainer_id=d["trainer_id"],
+            weekdays=_json(d.get("weekdays")), start_time=_time(d["start_time"]), end_time=_time(d["end_time"]),
+            max_slots=d["max_slots"], starts_on=_date(d["starts_on"]), until=_date(d.get("until")),
+            exceptions=_json(d.get("exceptions")),
+        )
+        s.hall = GymHall(id=d["hall_id"], name=hall_names.get(d["hall_id"], ""))
+        trainer = trainers.get(d["trainer_id"], {})
+        s.trainer = Profile(id=d["trainer_id"], first_name=trainer.get("first_name") or "",
+                            last_name=trainer.get("last_name") or "", username=trainer.get("username") or "")
+        result.append(s)
+    return result
+
+
+def _display_name(profile: dict) -> str:
+    full = f"{profile.get('first_name') or ''} {profile.get('last_name') or ''}".strip()
+    return full or profile.get("username", "")
+
+
+def schedule_overview_data(start_dt, end_dt, hall_id=None, trainer_id=None, client=None, now=None, rows=None) -> dict:
+    """
+    Те саме, що core.schedule.overview_data, але двома агрегаціями pymongo
+    замість ~10 ORM-запитів через транслятор SQL→Mongo djongo:
+    1) довідники залів/тренерів, документи ScheduleDay за вікно, серії занять
+       і вже створені заняття серій — розгортання серій іде з них, без ORM;
+    2) (лише для клієнта) його записи й бронювання з деталями.
+    Якщо rows (groups, slots) передано, документи ScheduleDay і серії не читаються.
+    """
+    from accounts.models import Profile
+    from . import schedule, series
+    from .models import (
+        GymHall, GroupClass, GroupClassSeries, GroupEnrollment,
+        IndividualSlot, IndividualBooking, ScheduleDay,
+    )
+
+    db = get_database()
+    now = now or timezone.now()
+    tables = {
+        m: m._meta.db_table
+        for m in (GymHall, GroupClass, GroupClassSeries, GroupEnrollment, IndividualSlot,
+                  IndividualBooking, ScheduleDay, Profile)
+    }
+    date_from, date_to = timezone.localtime(start_dt).date(), timezone.localtime(end_dt).date()
+
+    day_match = {
+        "day": {
+            "$gte": _as_mongo_date(schedule.local_day(start_dt)),
+            "$lte": _as_mongo_date(schedule.local_day(end_dt)),
+        }
+    }
+    if hall_id is not None:
+        day_match["hall_id"] = hall_id
+
+    pipeline = [
+        {"$facet": {
+            "halls": [{"$sort": {"name": 1}}, {"$project": {"_id": 0, "id": 1, "name": 1}}],
+        }},
+        {"$lookup": {
+            "from": tables[Profile],
+            "pipeline": [
+                {"$match": {"role": Profile.Role.TRAINER}},
+                {"$sort": {"last_name": 1, "first_name": 1, "username": 1}},
+                {"$project": {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "username": 1}},
+            ],
+            "as": "trainers",
+        }},
+    ]
+    if rows is None:
+        pipeline.append({"$lookup": {
+            "from": tables[ScheduleDay],
+            "pipeline": [
+                {"$match": day_match},
+                {"$project": {"_id": 0, "hall_id": 1, "hall_name": 1, "groups": 1, "slots": 1}},
+            ],
+            "as": "days",
+        }})
+        series_match = {
+            "starts_on": {"$lte": _as_mongo_date(date_to)},
+            "$or": [{"until": None}, {"until": {"$gte": _as_mongo_date(date_from)}}],
+        }
+        if hall_id is not None:
+            series_match["hall_id"] = hall_id
+        if trainer_id is not None:
+            series_match["trainer_id"] = trainer_id
+        window_start, window_end = series.days_window(date_from, date_to)
+        pipeline += [
+            {"$lookup": {
+                "from": tables[GroupClassSeries],
+                "pipeline": [{"$match": series_match}, {"$project": {"_id": 0}}],
+                "as": "series",
+            }},
+            {"$lookup": {
+                "from": tables[GroupClass],
+                "pipeline": [
+                    {"$match": {"series_id": {"$ne": None},
+                                "start_time": {"$gte": _naive_utc(window_start), "$lt": _naive_utc(window_end)}}},
+                    {"$project": {"_id": 0, "series_id": 1, "start_time": 1}},
+                ],
+                "as": "materialized",
+            }},
+        ]
+    catalogue = next(db[tables[GymHall]].aggregate(pipeline), {"halls": [], "trainers": []})
+
+    if rows is None:
+        days = [
+            ScheduleDay(hall_id=d["hall_id"], hall_name=d["hall_name"],
+                        groups=_json(d.get("groups")), slots=_json(d.get("slots")))
+            for d in catalogue.get("days", [])
+        ]
+        rows = schedule.rows_from_days(days, start_dt, end_dt, trainer_id)
+        materialized = {(c["series_id"], _aware(c["start_time"])) for c in catalogue.get("materialized", [])}
+        found = series.expand(_series_list(catalogue.get("series", []), catalogue), materialized, date_from, date_to)
+        rows = series.with_series(rows, start_dt, end_dt, found=found)
+    groups, slots = rows
+
+    data = {
+        "halls": catalogue["halls"],
+        "trainers": [{"id": t["id"], "name": _display_name(t)} for t in catalogue["trainers"]],
+        "groups": groups,
+        "slots": slots,
+        "enrolled_group_ids": set(),
+        "my_booked_slot_ids": set(),
+        "my_entries": [],
+    }
+    if client is None:
+        return data
+
+    now_utc = _naive_utc(now)
+    mine = next(db[tables[Profile]].aggregate([
+        {"$match": {"id": client.pk}},
+        {"$lookup": {"from": tables[GroupEnrollment], "localField": "id",
+                     "foreignField": "client_id", "as": "enrollments"}},
+        {"$lookup": {"from": tables[IndividualBooking], "localField": "id",
+                     "foreignField": "client_id", "as": "bookings"}},
+        {"$lookup": {"from": tables[GroupClass], "localField": "enrollments.group_class_id",
+                     "foreignField": "id", "as": "classes"}},
+        {"$lookup": {"from": tables[IndividualSlot], "localField": "bookings.slot_id",
+                     "foreignField": "id", "as": "slots"}},
+        {"$project": {
+            "_id": 0,
+            "enrolled": "$enrollments.group_class_id",
+            "booked": "$bookings.slot_id",
+            "classes": {"$filter": {
+                "input": "$classes", "as": "c",
+                "cond": {"$gte": ["$$c.end_time", now_utc]},
+            }},
+            "slots": {"$filter": {
+                "input": "$slots", "as": "s",
+                "cond": {"$or": [
+                    {"$gte": ["$$s.start_time", now_utc]},
+                    {"$gte": ["$$s.end_time", now_utc]},
+                ]},
+            }},
+        }},
+        {"$addFields": {
+            "hall_ids": {"$setUnion": ["$classes.hall_id", "$slots.hall_id"]},
+            "trainer_ids": {"$setUnion": ["$classes.trainer_id", "$slots.trainer_id"]},
+        }},
+        {"$lookup": {"from": tables[GymHall], "localField": "hall_ids",
+                     "foreignField": "id", "as": "halls"}},
+        {"$lookup": {"from": tables[Profile], "localField": "trainer_ids",
+                     "foreignField": "id", "as": "trainers"}},
+    ]), None)
+    if not mine:
+        return data
+
+    hall_names = {h["id"]: h["name"] for h in mine["halls"]}
+    trainer_names = {t["id"]: _display_name(t) for t in mine["trainers"]}
+
+    window_group_ids = {g["id"] for g in groups}
+    data["enrolled_group_ids"] = set(mine["enrolled"]) & window_group_ids
+    data["my_booked_slot_ids"] = set(mine["booked"])
+
+    entries = []
+    for c in mine["classes"]:
+        entries.append(schedule.group_entry(
+            c["id"], c["title"],
+            hall_names.get(c["hall_id"], ""), trainer_names.get(c["trainer_id"], ""),
+            _aware(c["start_time"]), _aware(c["end_time"]),
+        ))
+    for s in mine["slots"]:
+        entries.append(schedule.slot_entry(
+            s["id"],
+            hall_names.get(s["hall_id"], ""), trainer_names.get(s["trainer_id"], ""),
+            _aware(s["start_time"]), _aware(s["end_time"]),
+        ))
+    data["my_entries"] = schedule.sort_entries(entries)
+    return data
+
+
+# --- Індекси: задекларовані в моделях vs наявні в MongoDB -------------------
+
+def _index_spec(model, fields, unique=False, name=None) -> dict:
+    """Поля Meta.indexes можуть мати префікс "-" — це спадний (-1) напрям ключа."""
+    opts = model._meta
+    key = tuple(
+        (opts.get_field(f.lstrip("-")).column, -1 if f.startswith("-") else 1)
+        for f in fields
+    )
+    if name is None:
+        name = "{}_{}_{}".format(opts.db_table, "_".join(c for c, _ in key), "uniq" if unique else "idx")
+    return {"name": name, "key": key, "unique": unique}
+
+
+def _partial_filter(model, condition):
+    """
+    partialFilterExpression для умови UniqueConstraint. Підтримується лише
+    Q(<fk>__isnull=False) — решту умов MongoDB в частковому індексі не виразити.
+    """
+    if condition.negated or len(condition.children) != 1 or not isinstance(condition.children[0], tuple):
+        return None
+    lookup, value = condition.children[0]
+    if not lookup.endswith("__isnull") or value is not False:
+        return None
+    column = model._meta.get_field(lookup[:-len("__isnull")]).column
+    return {column: {"$type": "number"}}
+
+
+def declared_indexes(model) -> list:
+    """
+    Індекси, які модель оголошує: primary key, unique/db_index полів,
+    unique_together, index_together, Meta.indexes і UniqueConstraint.
+    Індекси за виразами пропускаються — у MongoDB їх не відтворити.
+    """
+    opts = model._meta
+    specs = []
+    for field in opts.local_fields:
+        if field.primary_key or field.unique:
+            specs.append(_index_spec(model, [field.name], unique=True))
+        elif field.db_index:
+            specs.append(_index_spec(model, [field.name]))
+    for fields in opts.unique_together:
+        specs.append(_index_spec(model, fields, unique=True))
+    for fields in opts.index_together:
+        specs.append(_index_spec(model, fields))
+    for index in opts.indexes:
+        if not index.fields:
+            continue
+        specs.append(_index_spec(model, index.fields, name=index.name))
+    for constraint in opts.constraints:
+        if not isinstance(constraint, models.UniqueConstraint):
+            continue
+        spec = _index_spec(model, constraint.fields, unique=True, name=constraint.name)
+        if constraint.condition is not None:
+            spec["partial"] = _partial_filter(model, constraint.condition)
+            if spec["partial"] is None:
+                continue
+        specs.append(spec)
+
+    unique = {}
+    for spec in specs:
+        unique.setdefault(spec["key"], spec)
+        if spec["unique"]:
+            unique[spec["key"]]["unique"] = True
+    return list(unique.values())
+
+
+def index_report(model, using: str = "default") -> dict:
+    """
+    Порівнює задекларовані індекси з index_information() колекції:
+    missing — немає в БД; extra — є в БД, але не оголошені;
+    drift — ключ той самий, але інша унікальність чи умова часткового індексу.
+    """
+    existing = {
+        name: {"name": name, "key": tuple((k, int(d) if isinstance(d, (int, float)) else d) for k, d in info["key"]),
+               "unique": bool(info.get("unique")), "partial": info.get("partialFilterExpression")}
+        for name, info in collection(model, using).index_information().items()
+        if name != "_id_"
+    }
+    by_key = {idx["key"]: idx for idx in existing.values()}
+    declared = declared_indexes(model)
+    declared_keys = {spec["key"] for spec in declared}
+
+    report = {"missing": [], "extra": [], "drift": []}
+    for spec in declared:
+        found = by_key.get(spec["key"])
+        if found is None:
+            report["missing"].append(spec)
+        elif found["unique"] != spec["unique"] or found["partial"] != spec.get("partial"):
+            report["drift"].append({"declared": spec, "existing": found})
+    report["extra"] = [idx for idx in existing.values() if idx["key"] not in declared_keys]
+    return report
+
+
+def sync_indexes(model, using: str = "default", dry_run: bool = False, drop_extra: bool = False) -> dict:
+    """
+    Створює відсутні індекси моделі (і, за бажанням, видаляє зайві).
+    Повертає звіт index_report із полем errors — індекси, які не вдалося
+    створити (action "create") чи видалити ("drop"); решта синхронізується далі.
+    """
+    report = index_report(model, using)
+    report["errors"] = []
+    if dry_run:
+        return report
+
+    coll = collection(model, using)
+    for spec in report["missing"]:
+        try:
+            options = {"partialFilterExpression": spec["partial"]} if spec.get("partial") else {}
+            coll.create_index(list(spec["key"]), name=spec["name"], unique=spec["unique"], **options)
+        except PyMongoError as e:
+            report["errors"].append({"index": spec, "action": "create", "error": str(e)})
+    if drop_extra:
+        for idx in report["extra"]:
+            try:
+                coll.drop_index(idx["name"])
+            except PyMongoError as e:
+                report["errors"].append({"index": idx, "action": "drop", "error": str(e)})
+    return report
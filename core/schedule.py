@@ -0,0 +1,361 @@
+# core/schedule.py
+"""
+Read model розкладу (ScheduleDay): побудова документів «зал × день»
+та читання рядків для сторінки розкладу.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import Profile
+
+from .models import (
+    GymHall, GroupClass, GroupEnrollment,
+    IndividualSlot, IndividualBooking, ScheduleDay,
+)
+from . import fragments, series
+from .mongo import is_mongo, schedule_overview_data
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def local_day(dt):
+    """Календарний день (у часовому поясі проєкту), до якого належить момент dt."""
+    return timezone.localtime(dt).date()
+
+
+def day_bounds(day):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, start + timedelta(days=1)
+
+
+def window_from_params(date_from_str=None, date_to_str=None, now=None):
+    """
+    Вікно розкладу з параметрів from/to (YYYY-MM-DD): за замовчуванням
+    найближчі 14 днів; некоректні дати — теж за замовчуванням.
+    Повертає (start, end, start_dt, end_dt).
+    """
+    now = now or timezone.now()
+    default_start = now.date()
+    default_end = (now + timedelta(days=14)).date()
+
+    start, end = default_start, default_end
+    try:
+        if date_from_str:
+            start = datetime.strptime(date_from_str, DATE_FORMAT).date()
+        if date_to_str:
+            end = datetime.strptime(date_to_str, DATE_FORMAT).date()
+    except ValueError:
+        start, end = default_start, default_end
+    if end < start:
+        end = start
+
+    tz = timezone.get_current_timezone()
+    start_dt = timezone.make_aware(datetime.combine(start, time.min), tz)
+    end_dt = timezone.make_aware(datetime.combine(end, time.max), tz)
+    return start, end, start_dt, end_dt
+
+
+def group_row(gc: GroupClass) -> dict:
+    return {
+        "id": gc.pk,
+        "title": gc.title,
+        "trainer_id": gc.trainer_id,
+        "trainer_name": gc.trainer.display_name if gc.trainer_id else "",
+        "start_time": gc.start_time.isoformat(),
+        "end_time": gc.end_time.isoformat(),
+        "max_slots": gc.max_slots,
+        "enrolled_count": gc.enrolled_count,
+    }
+
+
+def slot_row(slot: IndividualSlot) -> dict:
+    return {
+        "id": slot.pk,
+        "trainer_id": slot.trainer_id,
+        "trainer_name": slot.trainer.display_name if slot.trainer_id else "",
+        "start_time": slot.start_time.isoformat(),
+        "end_time": slot.end_time.isoformat(),
+        "is_booked": slot.is_booked,
+    }
+
+
+def rebuild_day(hall_id: int, day, create: bool = True):
+    """
+    Перебудовує документ ScheduleDay для одного залу й дня з первинних таблиць.
+    create=False — лише оновити/видалити наявний документ (для змін записів,
+    бронювань і каскадних видалень, коли зал сам може бути в процесі видалення).
+    """
+    fragments.invalidate_day(hall_id, day)
+    start, end = day_bounds(day)
+    groups = [
+        group_row(gc) for gc in
+        GroupClass.objects
+        .select_related("trainer")
+        .filter(hall_id=hall_id, start_time__gte=start, start_time__lt=end)
+        .order_by("start_time", "id")
+    ]
+    slots = [
+        slot_row(s) for s in
+        IndividualSlot.objects
+        .select_related("trainer")
+        .filter(hall_id=hall_id, start_time__gte=start, start_time__lt=end)
+        .order_by("start_time", "id")
+    ]
+
+    doc = ScheduleDay.objects.filter(hall_id=hall_id, day=day).first()
+    if not groups and not slots:
+        if doc:
+            doc.delete()
+        return None
+
+    if doc is None:
+        if not create:
+            return None
+        hall = GymHall.objects.filter(pk=hall_id).only("name").first()
+        if hall is None:
+            return None
+        doc = ScheduleDay(hall_id=hall_id, day=day, hall_name=hall.name)
+
+    doc.groups = groups
+    doc.slots = slots
+    doc.save()
+    return doc
+
+
+def rebuild_for(obj, create: bool = True):
+    """Перебудовує день, у який потрапляє заняття чи слот obj."""
+    if obj.hall_id and obj.start_time:
+        rebuild_day(obj.hall_id, local_day(obj.start_time), create=create)
+
+
+def refresh_group(group_class_id: int):
+    """Оновлює день заняття після зміни кількості записів."""
+    gc = GroupClass.objects.filter(pk=group_class_id).only("hall", "start_time").first()
+    if gc:
+        rebuild_for(gc, create=False)
+
+
+def refresh_slot(slot_id: int):
+    """Оновлює день слоту після зміни стану бронювання."""
+    slot = IndividualSlot.objects.filter(pk=slot_id).only("hall", "start_time").first()
+    if slot:
+        rebuild_for(slot, create=False)
+
+
+def rebuild_range(date_from=None, date_to=None) -> int:
+    """
+    Повністю перебудовує read model за діапазон днів (або за весь час).
+    Повертає кількість створених документів.
+    """
+    groups = GroupClass.objects.select_related("hall", "trainer")
+    slots = IndividualSlot.objects.select_related("hall", "trainer")
+    days = ScheduleDay.objects.all()
+    if date_from:
+        start, _ = day_bounds(date_from)
+        groups = groups.filter(start_time__gte=start)
+        slots = slots.filter(start_time__gte=start)
+        days = days.filter(day__gte=date_from)
+    if date_to:
+        _, end = day_bounds(date_to)
+        groups = groups.filter(start_time__lt=end)
+        slots = slots.filter(start_time__lt=end)
+        days = days.filter(day__lte=date_to)
+
+    docs = {}
+
+    def _doc(obj):
+        key = (obj.hall_id, local_day(obj.start_time))
+        if key not in docs:
+            docs[key] = ScheduleDay(
+                hall_id=obj.hall_id, day=key[1], hall_name=obj.hall.name, groups=[], slots=[]
+            )
+        return docs[key]
+
+    for gc in groups.order_by("start_time", "id"):
+        _doc(gc).groups.append(group_row(gc))
+    for s in slots.order_by("start_time", "id"):
+        _doc(s).slots.append(slot_row(s))
+
+    days.delete()
+    ScheduleDay.objects.bulk_create(docs.values(), batch_size=500)
+    fragments.invalidate_all()
+    return len(docs)
+
+
+def _parse_row(row: dict, doc: ScheduleDay) -> dict:
+    row = dict(row)
+    row["start_time"] = datetime.fromisoformat(row["start_time"])
+    row["end_time"] = datetime.fromisoformat(row["end_time"])
+    row["hall_id"] = doc.hall_id
+    row["hall_name"] = doc.hall_name
+    return row
+
+
+def rows_from_days(days, start_dt, end_dt, trainer_id=None):
+    """
+    Рядки занять і слотів із документів ScheduleDay, що повністю
+    вкладаються у [start_dt, end_dt], відсортовані за часом початку.
+    """
+    rows = defaultdict(list)
+    for doc in days:
+        for kind in ("groups", "slots"):
+            for raw in getattr(doc, kind):
+                if trainer_id is not None and raw["trainer_id"] != trainer_id:
+                    continue
+                row = _parse_row(raw, doc)
+                if row["start_time"] >= start_dt and row["end_time"] <= end_dt:
+                    rows[kind].append(row)
+
+    for kind in ("groups", "slots"):
+        rows[kind].sort(key=lambda r: (r["start_time"], r["id"]))
+    return rows["groups"], rows["slots"]
+
+
+def window_rows(start_dt, end_dt, hall_id=None, trainer_id=None):
+    """Рядки розкладу за вікно: один індексований запит до ScheduleDay по (day, hall)."""
+    days = ScheduleDay.objects.filter(day__gte=local_day(start_dt), day__lte=local_day(end_dt))
+    if hall_id is not None:
+        days = days.filter(hall_id=hall_id)
+    return rows_from_days(days, start_dt, end_dt, trainer_id)
+
+
+def group_entry(group_id, title, hall, trainer, start, end) -> dict:
+    return {
+        "kind": "group",
+        "title": title,
+        "hall": hall,
+        "trainer": trainer,
+        "start": start,
+        "end": end,
+        "group_id": group_id,
+    }
+
+
+def slot_entry(slot_id, hall, trainer, start, end) -> dict:
+    return {
+        "kind": "slot",
+        "title": "Індивідуальне тренування",
+        "hall": hall,
+        "trainer": trainer,
+        "start": start,
+        "end": end,
+        "slot_id": slot_id,
+    }
+
+
+def sort_entries(entries: list) -> list:
+    entries.sort(key=lambda e: (e["start"], e["kind"], e.get("group_id") or e.get("slot_id")))
+    return entries
+
+
+def schedule_rows(start_dt, end_dt, hall_id=None, trainer_id=None):
+    """(groups, slots) вікна разом із розгорнутими заняттями серій."""
+    rows = window_rows(start_dt, end_dt, hall_id=hall_id, trainer_id=trainer_id)
+    return series.with_series(rows, start_dt, end_dt, hall_id, trainer_id)
+
+
+def hall_options() -> list:
+    return [{"id": pk, "name": name} for pk, name in GymHall.objects.order_by("name").values_list("id", "name")]
+
+
+def trainer_options() -> list:
+    return [
+        {"id": p.id, "name": p.display_name}
+        for p in Profile.objects
+        .filter(role=Profile.Role.TRAINER)
+        .order_by("last_name", "first_name", "username")
+    ]
+
+
+def enrolled_group_ids(client, groups) -> set:
+    """id занять вікна, на які записаний клієнт."""
+    return set(
+        GroupEnrollment.objects
+        .filter(client=client, group_class_id__in=[g["id"] for g in groups])
+        .values_list("group_class_id", flat=True)
+    )
+
+
+def client_entries(client, now) -> tuple:
+    """(id заброньованих клієнтом слотів, його поточні/майбутні записи)."""
+    my_booked_slot_ids = set(
+        IndividualBooking.objects.filter(client=client).values_list("slot_id", flat=True)
+    )
+
+    my_entries = []
+    my_group = (
+        GroupEnrollment.objects
+        .select_related("group_class", "group_class__hall", "group_class__trainer")
+        .filter(client=client, group_class__end_time__gte=now)
+    )
+    for e in my_group:
+        gc = e.group_class
+        my_entries.append(group_entry(
+            gc.id, gc.title,
+            gc.hall.name if gc.hall_id else "",
+            gc.trainer.display_name if gc.trainer_id else "",
+            gc.start_time, gc.end_time,
+        ))
+
+    my_slots = (
+        IndividualBooking.objects
+        .select_related("slot", "slot__hall", "slot__trainer")
+        .filter(client=client)
+        .filter(Q(slot__start_time__gte=now) | Q(slot__end_time__gte=now))
+    )
+    for b in my_slots:
+        s = b.slot
+        my_entries.append(slot_entry(
+            s.id,
+            s.hall.name if s.hall_id else "",
+            s.trainer.display_name if s.trainer_id else "",
+            s.start_time, s.end_time,
+        ))
+    sort_entries(my_entries)
+    return my_booked_slot_ids, my_entries
+
+
+def overview_data(start_dt, end_dt, hall_id=None, trainer_id=None, client=None, now=None, rows=None) -> dict:
+    """
+    Дані сторінки розкладу через ORM: довідники залів і тренерів,
+    рядки занять/слотів за вікно (разом із розгорнутими заняттями серій)
+    та (для клієнта) його прапорці й записи.
+    rows — уже відомі (groups, slots) вікна (з кешу фрагментів), тоді вони не читаються.
+    """
+    now = now or timezone.now()
+    if rows is None:
+        rows = schedule_rows(start_dt, end_dt, hall_id, trainer_id)
+    groups, slots = rows
+
+    data = {
+        "halls": hall_options(),
+        "trainers": trainer_options(),
+        "groups": groups,
+        "slots": slots,
+        "enrolled_group_ids": set(),
+        "my_booked_slot_ids": set(),
+        "my_entries": [],
+    }
+    if client is not None:
+        data["enrolled_group_ids"] = enrolled_group_ids(client, groups)
+        data["my_booked_slot_ids"], data["my_entries"] = client_entries(client, now)
+    return data
+
+
+def mongo_backend() -> bool:
+    return getattr(settings, "SCHEDULE_DATA_BACKEND", "orm") == "mongo" and is_mongo()
+
+
+def load_overview(start_dt, end_dt, hall_id=None, trainer_id=None, client=None, now=None, rows=None) -> dict:
+    """
+    Обирає шлях доступу до даних розкладу за settings.SCHEDULE_DATA_BACKEND:
+    "orm" (за замовчуванням) або "mongo" — нативні агрегації pymongo (лише з djongo).
+    """
+    if mongo_backend():
+        return schedule_overview_data(start_dt, end_dt, hall_id, trainer_id, client, now, rows)
+    return overview_data(start_dt, end_dt, hall_id, trainer_id, client, now, rows)
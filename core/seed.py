@@ -0,0 +1,371 @@
+# core/seed.py
+"""
+Синтетичний набір даних для навантажувальних тестів і бенчмарків
+(команда seed_gym).
+
+Усе генерується з random.Random(seed): однакові seed і розміри дають
+однакових людей, розклад, записи й бронювання — змінюються лише
+абсолютні дати, якщо не задано start. Рядки вставляються bulk_create
+пакетами, без сигналів, тому похідні дані (токени пошуку, enrolled_count,
+is_booked, ScheduleDay, підсумки завантаженості, версії для ETag)
+заповнюються самим генератором або перебудовуються одним проходом у кінці.
+
+Логіни згенерованих користувачів починаються з PREFIX, назви залів — з
+HALL_PREFIX; за ними clear() видаляє попередній набір.
+"""
+import random
+import time as clock
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from accounts import paging, search
+from accounts.models import Profile, ProfileSearchToken
+
+from . import analytics, availability, fragments, schedule, versions
+from .booking import recount_enrollments
+from .models import (
+    GymHall, GroupClass, GroupClassSeries, GroupEnrollment, HallDailyRollup,
+    IndividualBooking, IndividualSlot, ScheduleDay, WaitlistEntry,
+)
+from .mongo import collection, is_mongo
+
+PREFIX = "seed_"
+HALL_PREFIX = "Seed "
+PASSWORD = "seedpass"
+BATCH_SIZE = 1000
+# днів розкладу за один пакет вставки
+DAYS_PER_BATCH = 7
+
+
+@dataclass(frozen=True)
+class Sizes:
+    clients: int
+    trainers: int
+    halls: int
+    days: int
+
+
+SIZES = {
+    "small": Sizes(clients=500, trainers=20, halls=4, days=30),
+    "medium": Sizes(clients=10_000, trainers=100, halls=10, days=90),
+    "large": Sizes(clients=100_000, trainers=500, halls=40, days=365),
+}
+
+# групові заняття й індивідуальні слоти — в різні години, щоб тренер
+# і клієнт не мали накладок у часі
+CLASS_HOURS = (8, 10, 12, 17, 19)
+SLOT_HOURS = (9, 11, 13, 15, 18)
+# частка залів із заняттям у кожну годину CLASS_HOURS
+CLASS_SHARE = 0.8
+SLOTS_PER_TRAINER_DAY = 2
+BOOKED_SHARE = 0.5
+GROUP_SIZES = (8, 10, 12, 15, 20, 25)
+HALL_CAPACITIES = (12, 16, 20, 25, 30, 40)
+
+CLASS_TITLES = (
+    "Йога", "Пілатес", "Кросфіт", "Стретчинг", "Танці", "Функціональний тренінг",
+    "Бокс", "Зумба", "Аеробіка", "Силове тренування",
+)
+MALE_NAMES = (
+    "Олександр", "Андрій", "Іван", "Михайло", "Дмитро", "Максим", "Олег",
+    "Сергій", "Тарас", "Богдан", "Юрій", "Віктор", "Петро", "Роман",
+)
+FEMALE_NAMES = (
+    "Олена", "Марія", "Анна", "Ірина", "Наталія", "Оксана", "Юлія",
+    "Тетяна", "Катерина", "Софія", "Дарина", "Вікторія", "Мар'яна", "Галина",
+)
+LAST_NAMES = (
+    "Шевченко", "Бондаренко", "Коваленко", "Ткаченко", "Кравченко", "Олійник",
+    "Шевчук", "Поліщук", "Бойко", "Ткачук", "Савчук", "Лисенко", "Мельник",
+    "Марченко", "Гаврилюк", "Кузьмич", "Павленко", "Руденко", "Литвин", "Мороз",
+)
+
+
+@dataclass
+class SeedReport:
+    counts: dict
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return sum(self.counts.values())
+
+
+def _at(day, hour):
+    return timezone.make_aware(datetime.combine(day, time(hour)), timezone.get_current_timezone())
+
+
+def _person(rng, username):
+    gender = rng.choice((Profile.Gender.MALE, Profile.Gender.FEMALE))
+    first = rng.choice(MALE_NAMES if gender == Profile.Gender.MALE else FEMALE_NAMES)
+    return {
+        "username": username,
+        "first_name": first,
+        "last_name": rng.choice(LAST_NAMES),
+        "email": f"{username}@example.com",
+        "phone": f"+38067{rng.randrange(10 ** 7):07d}",
+        "gender": gender,
+    }
+
+
+def _create_people(rows, role, password, joined, extra=None, batch_size=BATCH_SIZE) -> list:
+    """
+    Створює User і Profile пакетами; повертає id профілів у порядку rows.
+    bulk_create не повертає pk на SQLite/djongo — id перечитуються за логінами.
+    """
+    ids = []
+    for i in range(0, len(rows), batch_size):
+        chunk = rows[i:i + batch_size]
+        User.objects.bulk_create([
+            User(
+                username=row["username"], first_name=row["first_name"], last_name=row["last_name"],
+                email=row["email"], password=password, date_joined=joined[i + n],
+            )
+            for n, row in enumerate(chunk)
+        ])
+        user_ids = dict(User.objects.filter(
+            username__in=[row["username"] for row in chunk],
+        ).values_list("username", "id"))
+        Profile.objects.bulk_create([
+            Profile(user_id=user_ids[row["username"]], role=role, **row, **(extra(row) if extra else {}))
+            for row in chunk
+        ])
+        profiles = {p.user_id: p for p in Profile.objects.filter(user_id__in=user_ids.values())}
+        search.index(profiles.values(), batch_size=batch_size)
+        ids += [profiles[user_ids[row["username"]]].pk for row in chunk]
+    return ids
+
+
+def _joined(rng, count, before):
+    """Дати реєстрації за три роки до before, відсортовані як id."""
+    return sorted(before - timedelta(seconds=rng.randrange(3 * 365 * 86400)) for _ in range(count))
+
+
+def _trainer_fields(rng):
+    def extra(row):
+        return {
+            "status": rng.choice(Profile.TrainerStatus.values),
+            "specialization": rng.choice(Profile.Specialization.values),
+            "work_time": "Пн–Пт 08:00–20:00",
+        }
+    return extra
+
+
+def _plan_days(rng, days, halls, trainers, clients, history_until):
+    """
+    Заняття, слоти і хто на них записаний за кілька днів. Дні до history_until
+    заповнюються як минулі.
+    Повертає (заняття, {(зал, початок): клієнти}, слоти, {(тренер, початок): клієнт}).
+    """
+    classes, enrolled, slots, booked = [], {}, [], {}
+    for day in days:
+        for hour in CLASS_HOURS:
+            begin = _at(day, hour)
+            chosen = [hall for hall in halls if rng.random() < CLASS_SHARE][:len(trainers)]
+            coaches = rng.sample(trainers, len(chosen))
+            # «минулі» заняття заповнені щільніше за майбутні; межа — день, а не
+            # годинник: інакше кількість вибірок rng залежала б від часу запуску
+            fill = (0.4, 1.0) if day < history_until else (0.0, 0.8)
+            plan = []
+            for hall_id, capacity in chosen:
+                max_slots = min(capacity, rng.choice(GROUP_SIZES))
+                plan.append((hall_id, max_slots, round(max_slots * rng.uniform(*fill))))
+            # різні клієнти в усіх залах на одну годину
+            picked = rng.sample(clients, min(len(clients), sum(n for _, _, n in plan)))
+            offset = 0
+            for (hall_id, max_slots, n), coach in zip(plan, coaches):
+                who = picked[offset:offset + n]
+                offset += len(who)
+                classes.append(GroupClass(
+                    title=rng.choice(CLASS_TITLES), hall_id=hall_id, trainer_id=coach,
+                    start_time=begin, end_time=begin + timedelta(hours=1),
+                    max_slots=max_slots, enrolled_count=len(who),
+                ))
+                enrolled[(hall_id, begin)] = who
+
+        offers = {hour: [] for hour in SLOT_HOURS}
+        # зал на годину дістається одному тренеру; коли вільних немає — пропозиції не буде
+        free = {hour: rng.sample([hall_id for hall_id, _ in halls], len(halls)) for hour in SLOT_HOURS}
+        for trainer_id in trainers:
+            for hour in rng.sample(SLOT_HOURS, SLOTS_PER_TRAINER_DAY):
+                if free[hour]:
+                    offers[hour].append((trainer_id, free[hour].pop()))
+        for hour, offered in offers.items():
+            begin = _at(day, hour)
+            taken = [rng.random() < BOOKED_SHARE for _ in offered]
+            picked = iter(rng.sample(clients, min(len(clients), sum(taken))))
+            for (trainer_id, hall_id), is_booked in zip(offered, taken):
+                client_id = next(picked, None) if is_booked else None
+                slots.append(IndividualSlot(
+                    trainer_id=trainer_id, hall_id=hall_id, start_time=begin,
+                    end_time=begin + timedelta(hours=1), is_booked=client_id is not None,
+                ))
+                if client_id is not None:
+                    booked[(trainer_id, begin)] = client_id
+    return classes, enrolled, slots, booked
+
+
+def _insert_days(classes, enrolled, slots, booked, hall_ids, trainer_ids, start_dt, end_dt, batch_size) -> dict:
+    GroupClass.objects.bulk_create(classes, batch_size=batch_size)
+    class_ids = {
+        (hall_id, start): pk for pk, hall_id, start in GroupClass.objects.filter(
+            hall_id__in=hall_ids, start_time__gte=start_dt, start_time__lt=end_dt,
+        ).values_list("id", "hall_id", "start_time")
+    }
+    enrollments = [
+        GroupEnrollment(group_class_id=class_ids[key], client_id=client_id)
+        for key, clients in enrolled.items()
+        for client_id in clients
+    ]
+    GroupEnrollment.objects.bulk_create(enrollments, batch_size=batch_size)
+
+    IndividualSlot.objects.bulk_create(slots, batch_size=batch_size)
+    slot_ids = {
+        (trainer_id, start): pk for pk, trainer_id, start in IndividualSlot.objects.filter(
+            trainer_id__in=trainer_ids, start_time__gte=start_dt, start_time__lt=end_dt,
+        ).values_list("id", "trainer_id", "start_time")
+    }
+    bookings = [
+        IndividualBooking(slot_id=slot_ids[key], client_id=client_id)
+        for key, client_id in booked.items()
+    ]
+    IndividualBooking.objects.bulk_create(bookings, batch_size=batch_size)
+    return {
+        "classes": len(classes), "enrollments": len(enrollments),
+        "slots": len(slots), "bookings": len(bookings),
+    }
+
+
+def exists() -> bool:
+    if User.objects.filter(username__startswith=PREFIX).exists():
+        return True
+    return GymHall.objects.filter(name__startswith=HALL_PREFIX).exists()
+
+
+def generate(sizes: Sizes, seed=0, start=None, password=PASSWORD, batch_size=BATCH_SIZE, log=None) -> SeedReport:
+    """
+    Генерує набір розміру sizes. start — перший день розкладу (за
+    замовчуванням половина днів у минулому, половина — попереду).
+    log(повідомлення) викликається після кожного етапу.
+    """
+    t0 = clock.perf_counter()
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    start = start or timezone.localdate() - timedelta(days=sizes.days // 2)
+    end = start + timedelta(days=sizes.days - 1)
+    # перша половина періоду — історія (за замовчуванням це дні до сьогодні)
+    history_until = start + timedelta(days=sizes.days // 2)
+    # один хеш на всіх: PBKDF2 для кожного зі 100 тис. користувачів — хвилини CPU
+    hashed = make_password(password, salt=f"seed{seed}")
+    joined_before = _at(start, 0)
+    counts = {}
+
+    halls = []
+    for i in range(sizes.halls):
+        halls.append((f"{HALL_PREFIX}зал {i + 1:02d}", rng.choice(HALL_CAPACITIES)))
+    GymHall.objects.bulk_create([GymHall(name=name, capacity=capacity) for name, capacity in halls])
+    hall_ids = dict(GymHall.objects.filter(name__in=[name for name, _ in halls]).values_list("name", "id"))
+    halls = [(hall_ids[name], capacity) for name, capacity in halls]
+    counts["halls"] = len(halls)
+
+    managers = [_person(rng, f"{PREFIX}manager")]
+    _create_people(managers, Profile.Role.MANAGER, hashed, [joined_before], batch_size=batch_size)
+    trainer_rows = [_person(rng, f"{PREFIX}trainer{i + 1:04d}") for i in range(sizes.trainers)]
+    trainers = _create_people(
+        trainer_rows, Profile.Role.TRAINER, hashed, _joined(rng, sizes.trainers, joined_before),
+        extra=_trainer_fields(rng), batch_size=batch_size,
+    )
+    client_rows = [_person(rng, f"{PREFIX}client{i + 1:06d}") for i in range(sizes.clients)]
+    clients = _create_people(
+        client_rows, Profile.Role.CLIENT, hashed, _joined(rng, sizes.clients, joined_before),
+        batch_size=batch_size,
+    )
+    counts["profiles"] = 1 + len(trainers) + len(clients)
+    log(f"Люди: {counts['profiles']} ({clock.perf_counter() - t0:.1f} с)")
+
+    day = start
+    while day <= end:
+        days = [day + timedelta(days=n) for n in range(DAYS_PER_BATCH) if day + timedelta(days=n) <= end]
+        planned = _plan_days(rng, days, halls, trainers, clients, history_until)
+        inserted = _insert_days(
+            *planned, [pk for pk, _ in halls], trainers,
+            _at(days[0], 0), _at(days[-1] + timedelta(days=1), 0), batch_size,
+        )
+        for name, n in inserted.items():
+            counts[name] = counts.get(name, 0) + n
+        day = days[-1] + timedelta(days=1)
+        log(f"Розклад до {days[-1]}: {counts['classes']} занять, {counts['slots']} слотів")
+
+    # похідні дані, які bulk_create обійшов
+    counts["schedule_days"] = schedule.rebuild_range(start, end)
+    yesterday = timezone.localdate() - timedelta(days=1)
+    if start <= yesterday:
+        analytics.rollup_range(start, min(end, yesterday))
+    _refresh()
+    return SeedReport(counts, clock.perf_counter() - t0)
+
+
+def _purge(model, field, values, batch_size=BATCH_SIZE) -> int:
+    """
+    Видаляє рядки model із field у values пакетами, без каскаду й сигналів
+    ORM: для сотень тисяч рядків вони означають запит на кожен рядок.
+    """
+    values, total = list(values), 0
+    for i in range(0, len(values), batch_size):
+        chunk = values[i:i + batch_size]
+        if is_mongo():
+            total += collection(model).delete_many({field: {"$in": chunk}}).deleted_count
+        else:
+            qs = model.objects.filter(**{f"{field}__in": chunk})
+            total += qs._raw_delete(qs.db)
+    return total
+
+
+def clear(batch_size=BATCH_SIZE) -> int:
+    """Видаляє попередній згенерований набір. Повертає кількість профілів."""
+    hall_ids = list(GymHall.objects.filter(name__startswith=HALL_PREFIX).values_list("id", flat=True))
+    user_ids = list(User.objects.filter(username__startswith=PREFIX).values_list("id", flat=True))
+    profile_ids = list(Profile.objects.filter(user_id__in=user_ids).values_list("id", flat=True))
+
+    def owned(model):
+        ids = set(model.objects.filter(hall_id__in=hall_ids).values_list("id", flat=True))
+        return ids | set(model.objects.filter(trainer_id__in=profile_ids).values_list("id", flat=True))
+
+    class_ids, slot_ids = owned(GroupClass), owned(IndividualSlot)
+    # чужі слоти, заброньовані нашими клієнтами, знову стануть вільними
+    freed = set(IndividualBooking.objects.filter(client_id__in=profile_ids).values_list("slot_id", flat=True))
+    freed -= slot_ids
+    for model in (GroupEnrollment, WaitlistEntry):
+        _purge(model, "group_class_id", class_ids, batch_size)
+        _purge(model, "client_id", profile_ids, batch_size)
+    _purge(IndividualBooking, "slot_id", slot_ids, batch_size)
+    _purge(IndividualBooking, "client_id", profile_ids, batch_size)
+    _purge(GroupClass, "id", class_ids, batch_size)
+    _purge(IndividualSlot, "id", slot_ids, batch_size)
+    _purge(GroupClassSeries, "id", owned(GroupClassSeries), batch_size)
+    for model in (ScheduleDay, HallDailyRollup):
+        _purge(model, "hall_id", hall_ids, batch_size)
+    _purge(GymHall, "id", hall_ids, batch_size)
+    _purge(ProfileSearchToken, "profile_id", profile_ids, batch_size)
+    _purge(Profile, "id", profile_ids, batch_size)
+    _purge(User, "id", user_ids, batch_size)
+
+    # записи наших клієнтів на чужі заняття і слоти зникли — лічильники теж
+    recount_enrollments()
+    freed = list(freed)
+    for i in range(0, len(freed), batch_size):
+        IndividualSlot.objects.filter(pk__in=freed[i:i + batch_size]).update(is_booked=False)
+    _refresh()
+    return len(profile_ids)
+
+
+def _refresh() -> None:
+    for model in (Profile, GymHall, GroupClass, GroupEnrollment, IndividualSlot, IndividualBooking):
+        versions.bump(model)
+    paging.invalidate_counts()
+    fragments.invalidate_all()
+    availability.reset()
@@ -0,0 +1,203 @@
+# core/series.py
+"""
+Повторювані групові заняття (GroupClassSeries).
+
+Заняття серії розгортаються ліниво — лише для запитаного вікна розкладу —
+і стають рядками GroupClass тільки тоді, коли на них записується перший
+клієнт (materialize). Уже створені заняття серії в розгортанні пропускаються.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import intervals
+from .models import GroupClass, GroupClassSeries
+
+# Наскільки вперед розгортати безстрокові серії для перевірки накладок
+OPEN_SERIES_HORIZON = timedelta(days=365)
+
+
+def occurrence_dates(series: GroupClassSeries, date_from: date, date_to: date):
+    """Дати занять серії у [date_from, date_to] з урахуванням періоду, днів тижня й винятків."""
+    first = max(date_from, series.starts_on)
+    last = min(date_to, series.until) if series.until else date_to
+    weekdays = set(series.weekdays)
+    exceptions = set(series.exceptions)
+    day = first
+    while day <= last:
+        if day.weekday() in weekdays and day.isoformat() not in exceptions:
+            yield day
+        day += timedelta(days=1)
+
+
+def is_occurrence(series: GroupClassSeries, day: date) -> bool:
+    return any(occurrence_dates(series, day, day))
+
+
+def occurrence_bounds(series: GroupClassSeries, day: date):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, series.start_time), tz)
+    end = timezone.make_aware(datetime.combine(day, series.end_time), tz)
+    return start, end
+
+
+def active_series(date_from: date, date_to: date, **filters):
+    return (
+        GroupClassSeries.objects
+        .filter(starts_on__lte=date_to, **filters)
+        .filter(Q(until__isnull=True) | Q(until__gte=date_from))
+        .select_related("hall", "trainer")
+    )
+
+
+def days_window(date_from: date, date_to: date):
+    """[початок date_from, початок дня після date_to) як aware datetime."""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(date_from, time.min), tz),
+        timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min), tz),
+    )
+
+
+def occurrences(date_from: date, date_to: date, **filters):
+    """(series, day, start, end) ще не створених занять серій у діапазоні днів."""
+    series_list = list(active_series(date_from, date_to, **filters))
+    if not series_list:
+        return []
+    window_start, window_end = days_window(date_from, date_to)
+    materialized = set(
+        GroupClass.objects
+        .filter(series__in=series_list, start_time__gte=window_start, start_time__lt=window_end)
+        .values_list("series_id", "start_time")
+    )
+    return expand(series_list, materialized, date_from, date_to)
+
+
+def expand(series_list, materialized, date_from: date, date_to: date) -> list:
+    """
+    Розгортання без запитів: materialized — {(series_id, start_time)} уже
+    створених занять (з ORM або з агрегації MongoDB, core/mongo.py).
+    """
+    result = []
+    for s in series_list:
+        for day in occurrence_dates(s, date_from, date_to):
+            start, end = occurrence_bounds(s, day)
+            if (s.pk, start) not in materialized:
+                result.append((s, day, start, end))
+    return result
+
+
+def virtual_row(series: GroupClassSeries, day: date, start, end) -> dict:
+    """Рядок розкладу для ще не створеного заняття — у форматі schedule.group_row."""
+    return {
+        "id": None,
+        "virtual": True,
+        "series_id": series.pk,
+        "occurrence": day.isoformat(),
+        "title": series.title,
+        "trainer_id": series.trainer_id,
+        "trainer_name": series.trainer.display_name,
+        "hall_id": series.hall_id,
+        "hall_name": series.hall.name,
+        "start_time": start,
+        "end_time": end,
+        "max_slots": series.max_slots,
+        "enrolled_count": 0,
+    }
+
+
+def with_series(rows, start_dt, end_dt, hall_id=None, trainer_id=None, found=None):
+    """
+    Додає до (groups, slots) вікна ліниво розгорнуті заняття серій.
+    found — уже розгорнуті (series, day, start, end) днів вікна; без нього
+    серії читаються з БД.
+    """
+    groups, slots = rows
+    if found is None:
+        filters = {}
+        if hall_id is not None:
+            filters["hall_id"] = hall_id
+        if trainer_id is not None:
+            filters["trainer_id"] = trainer_id
+        found = occurrences(timezone.localtime(start_dt).date(), timezone.localtime(end_dt).date(), **filters)
+
+    virtual = [
+        virtual_row(s, day, start, end)
+        for s, day, start, end in found
+        if start >= start_dt and end <= end_dt
+    ]
+    if not virtual:
+        return groups, slots
+    groups = sorted(groups + virtual, key=lambda r: (r["start_time"], r["id"] is None, r["id"] or 0))
+    return groups, slots
+
+
+def bookable(series: GroupClassSeries, day: date) -> bool:
+    """Чи є day справжньою датою серії від сьогодні до until (не далі за горизонт)."""
+    today = timezone.localdate()
+    last = today + OPEN_SERIES_HORIZON
+    if series.until:
+        last = min(last, series.until)
+    return today <= day <= last and is_occurrence(series, day)
+
+
+def materialize(series: GroupClassSeries, day: date):
+    """
+    (GroupClass, створено) для заняття серії в день day — як get_or_create.
+    None — якщо в цей день серія не проводиться.
+    """
+    if not is_occurrence(series, day):
+        return None
+    start, end = occurrence_bounds(series, day)
+    existing = GroupClass.objects.filter(series=series, start_time=start).first()
+    if existing:
+        return existing, False
+    try:
+        with transaction.atomic():
+            return GroupClass.objects.create(
+                series=series, title=series.title, hall_id=series.hall_id, trainer_id=series.trainer_id,
+                start_time=start, end_time=end, max_slots=series.max_slots,
+            ), True
+    except IntegrityError:
+        # паралельний запис уже створив це заняття
+        return GroupClass.objects.get(series=series, start_time=start), False
+
+
+def occurrence_items(field: str, owner_id: int, date_from: date, date_to: date):
+    """
+    Інтервали ще не створених занять серій тренера/залу у [date_from, date_to]
+    для індексу накладок (core/intervals.py).
+    """
+    for s, day, start, end in occurrences(date_from, date_to, **{field: owner_id}):
+        yield start, end, ("series", (s.pk, day.isoformat()))
+
+
+def first_conflict(candidate: GroupClassSeries, exclude_series_id=None):
+    """
+    Перше заняття серії candidate (від сьогодні до until або на рік уперед),
+    яке накладається на зайнятість тренера чи залу: (day, conflicts) або None.
+    Заняття самої серії exclude_series_id (при редагуванні) не враховуються.
+    """
+    own = set()
+    if exclude_series_id:
+        own = {
+            (intervals.GROUP, pk)
+            for pk in GroupClass.objects.filter(series_id=exclude_series_id).values_list("id", flat=True)
+        }
+
+    today = timezone.localdate()
+    last = candidate.until or today + OPEN_SERIES_HORIZON
+    for day in occurrence_dates(candidate, max(today, candidate.starts_on), last):
+        start, end = occurrence_bounds(candidate, day)
+        found = intervals.find_conflicts(start, end, trainer_id=candidate.trainer_id, hall_id=candidate.hall_id)
+        found = {
+            owner: [key for key in keys
+                    if key not in own and not (key[0] == intervals.SERIES and key[1][0] == exclude_series_id)]
+            for owner, keys in found.items()
+        }
+        found = {owner: keys for owner, keys in found.items() if keys}
+        if found:
+            return day, found
+    return None
@@ -0,0 +1,220 @@
+# core/signals.py
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import Profile
+
+from . import availability, events, fragments, intervals, schedule, versions
+from .booking import adjust_enrolled_count, promote_waitlist
+from .models import (
+    GymHall, GroupClass, GroupClassSeries, GroupEnrollment,
+    IndividualSlot, IndividualBooking, ScheduleDay, WaitlistEntry,
+)
+
+
+@receiver(post_save, sender=GroupEnrollment)
+def enrollment_created(sender, instance, created, **kwargs):
+    if created and not getattr(instance, "_seat_reserved", False):
+        adjust_enrolled_count(instance.group_class_id, +1)
+    if created:
+        schedule.refresh_group(instance.group_class_id)
+
+
+@receiver(post_delete, sender=GroupEnrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    # Спрацьовує і для каскадного видалення (клієнта або самого заняття).
+    adjust_enrolled_count(instance.group_class_id, -1)
+    schedule.refresh_group(instance.group_class_id)
+    # звільнене місце — першому в черзі, хоч би як видалили запис (скасування, адмінка, каскад)
+    promote_waitlist(instance.group_class_id)
+
+
+@receiver(post_save, sender=IndividualBooking)
+def booking_created(sender, instance, created, **kwargs):
+    if created:
+        IndividualSlot.objects.filter(pk=instance.slot_id, is_booked=False).update(is_booked=True)
+        schedule.refresh_slot(instance.slot_id)
+
+
+@receiver(post_delete, sender=IndividualBooking)
+def booking_deleted(sender, instance, **kwargs):
+    # Звільняє слот і при каскадному видаленні клієнта.
+    IndividualSlot.objects.filter(pk=instance.slot_id).update(is_booked=False)
+    schedule.refresh_slot(instance.slot_id)
+
+
+@receiver(pre_delete, sender=GroupClass)
+def drop_class_waitlist(sender, instance, **kwargs):
+    # Черга зникає раніше за записи: інакше каскадне видалення записів
+    # переводило б клієнтів із черги на заняття, що саме видаляється.
+    WaitlistEntry.objects.filter(group_class_id=instance.pk).delete()
+
+
+@receiver(post_init, sender=GroupClass)
+def remember_capacity(sender, instance, **kwargs):
+    instance._max_slots_origin = instance.__dict__.get("max_slots")
+
+
+@receiver(post_save, sender=GroupClass)
+def capacity_changed(sender, instance, created, **kwargs):
+    origin = getattr(instance, "_max_slots_origin", None)
+    current = instance.__dict__.get("max_slots")
+    instance._max_slots_origin = current
+    if not created and origin is not None and current is not None and current > origin:
+        if promote_waitlist(instance.pk):
+            events.group_changed(instance.pk)
+
+
+# --- Read model ScheduleDay -------------------------------------------------
+
+@receiver(post_init, sender=GroupClass)
+@receiver(post_init, sender=IndividualSlot)
+def remember_schedule_origin(sender, instance, **kwargs):
+    # Лише вже завантажені значення — без запитів для відкладених полів.
+    hall_id = instance.__dict__.get("hall_id")
+    start = instance.__dict__.get("start_time")
+    instance._schedule_origin = (hall_id, start) if hall_id and start else None
+
+
+@receiver(post_save, sender=GroupClass)
+@receiver(post_save, sender=IndividualSlot)
+def schedule_item_saved(sender, instance, **kwargs):
+    origin = getattr(instance, "_schedule_origin", None)
+    schedule.rebuild_for(instance)
+    if origin:
+        old_key = (origin[0], schedule.local_day(origin[1]))
+        new_key = (instance.hall_id, schedule.local_day(instance.start_time))
+        if old_key != new_key:
+            schedule.rebuild_day(*old_key, create=False)
+    instance._schedule_origin = (instance.hall_id, instance.start_time)
+
+
+@receiver(post_delete, sender=GroupClass)
+@receiver(post_delete, sender=IndividualSlot)
+def schedule_item_deleted(sender, instance, **kwargs):
+    schedule.rebuild_for(instance, create=False)
+
+
+@receiver(post_save, sender=GroupClassSeries)
+@receiver(post_delete, sender=GroupClassSeries)
+def series_changed(sender, instance, **kwargs):
+    # Заняття серій розгортаються у рядки таблиць розкладу, які лежать у кеші фрагментів.
+    fragments.invalidate_all()
+
+
+@receiver(post_save, sender=GymHall)
+def hall_saved(sender, instance, created, **kwargs):
+    if not created:
+        renamed = ScheduleDay.objects.filter(hall=instance).exclude(hall_name=instance.name).update(
+            hall_name=instance.name
+        )
+        if renamed:
+            fragments.invalidate_all()
+
+
+@receiver(post_save, sender=User)
+def trainer_renamed(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is not None and not {"first_name", "last_name", "username"} & set(update_fields):
+        return
+    profile = Profile.objects.filter(user=instance, role=Profile.Role.TRAINER).only("id").first()
+    if not profile:
+        return
+
+    since = timezone.now() - timedelta(days=1)
+    keys = set()
+    for model in (GroupClass, IndividualSlot):
+        for hall_id, start in (
+            model.objects.filter(trainer=profile, start_time__gte=since)
+            .values_list("hall_id", "start_time")
+        ):
+            keys.add((hall_id, schedule.local_day(start)))
+    for hall_id, day in keys:
+        schedule.rebuild_day(hall_id, day, create=False)
+    versions.bump(Profile)
+
+
+# --- Зайнятість тренерів, залів і клієнтів (core/intervals.py) ---------------
+
+@receiver(post_init, sender=GroupClass)
+@receiver(post_init, sender=IndividualSlot)
+@receiver(post_init, sender=GroupClassSeries)
+def remember_owners(sender, instance, **kwargs):
+    instance._owners_origin = (instance.__dict__.get("trainer_id"), instance.__dict__.get("hall_id"))
+
+
+@receiver(post_save, sender=GroupClass)
+@receiver(post_save, sender=IndividualSlot)
+@receiver(post_save, sender=GroupClassSeries)
+def schedule_owners_changed(sender, instance, created, **kwargs):
+    old_trainer, old_hall = getattr(instance, "_owners_origin", (None, None))
+    owners = [("trainer", instance.trainer_id), ("hall", instance.hall_id), ("trainer", old_trainer), ("hall", old_hall)]
+    # час заняття чи слоту міг змінитися — зайнятість записаних клієнтів теж
+    if not created and sender is GroupClass:
+        owners += [("client", pk) for pk in
+                   GroupEnrollment.objects.filter(group_class_id=instance.pk).values_list("client_id", flat=True)]
+    elif not created and sender is IndividualSlot:
+        owners += [("client", pk) for pk in
+                   IndividualBooking.objects.filter(slot_id=instance.pk).values_list("client_id", flat=True)]
+    intervals.touch(*owners)
+    instance._owners_origin = (instance.trainer_id, instance.hall_id)
+
+
+@receiver(post_delete, sender=GroupClass)
+@receiver(post_delete, sender=IndividualSlot)
+@receiver(post_delete, sender=GroupClassSeries)
+def schedule_owners_deleted(sender, instance, **kwargs):
+    intervals.touch(("trainer", instance.trainer_id), ("hall", instance.hall_id))
+
+
+@receiver(post_save, sender=GroupEnrollment)
+@receiver(post_save, sender=IndividualBooking)
+def client_entry_saved(sender, instance, created, **kwargs):
+    if created:
+        intervals.touch(("client", instance.client_id))
+
+
+@receiver(post_delete, sender=GroupEnrollment)
+@receiver(post_delete, sender=IndividualBooking)
+def client_entry_deleted(sender, instance, **kwargs):
+    intervals.touch(("client", instance.client_id))
+
+
+# --- Версії моделей для ETag/Last-Modified ----------------------------------
+
+def bump_model_version(sender, **kwargs):
+    versions.bump(sender)
+
+
+for _model in versions.TRACKED_MODELS:
+    post_save.connect(bump_model_version, sender=_model, dispatch_uid=f"version:{_model._meta.label_lower}:save")
+    post_delete.connect(bump_model_version, sender=_model, dispatch_uid=f"version:{_model._meta.label_lower}:delete")
+
+
+# --- Карта доступності (core/availability.py) --------------------------------
+# Підключається після лічильників версій: інкрементне оновлення звіряє версії.
+
+@receiver(post_save, sender=IndividualSlot)
+def availability_slot_saved(sender, instance, **kwargs):
+    availability.slot_saved(instance)
+
+
+@receiver(post_delete, sender=IndividualSlot)
+def availability_slot_deleted(sender, instance, **kwargs):
+    availability.slot_deleted(instance.pk)
+
+
+@receiver(post_save, sender=IndividualBooking)
+def availability_booking_saved(sender, instance, created, **kwargs):
+    if created:
+        availability.booking_changed(instance.slot_id, booked=True)
+
+
+@receiver(post_delete, sender=IndividualBooking)
+def availability_booking_deleted(sender, instance, **kwargs):
+    availability.booking_changed(instance.slot_id, booked=False)
@@ -0,0 +1,122 @@
+# core/slot_generator.py
+"""
+Масове створення індивідуальних слотів тренера.
+
+Усі слоти будуються в пам'яті за правилом (діапазон дат, денне вікно,
+тривалість, проміжок між слотами, перерви), ті що накладаються на наявні
+заняття/слоти тренера чи залу відкидаються через індекс інтервалів,
+решта записується пакетами bulk_create. bulk_create не надсилає сигналів,
+тож read model розкладу і версії моделей оновлюються тут явно.
+
+Два генератори, запущені одночасно, можуть обидва не побачити слоти одне
+одного; запис тоді впирається в унікальність (тренер, зал, час) і
+повідомляється як SlotOverlapError, а не як помилка бази.
+"""
+from datetime import datetime, timedelta
+
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
+
+from . import intervals, schedule, versions
+from .models import IndividualSlot
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class SlotOverlapError(Exception):
+    """Частину слотів щойно створив інший генератор."""
+
+
+def parse_breaks(value: str) -> list:
+    """'13:00-14:00, 17:00-17:30' -> [(time(13), time(14)), ...]. ValueError на помилці."""
+    result = []
+    for part in (value or "").replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start_str, sep, end_str = part.partition("-")
+        if not sep:
+            raise ValueError(part)
+        start = datetime.strptime(start_str.strip(), "%H:%M").time()
+        end = datetime.strptime(end_str.strip(), "%H:%M").time()
+        if start >= end:
+            raise ValueError(part)
+        result.append((start, end))
+    return result
+
+
+def plan_slots(date_from, date_to, day_start, day_end, slot_minutes, gap_minutes=0, breaks=(), weekdays=None):
+    """
+    Інтервали (start, end) слотів за правилом, у часовому поясі проєкту.
+    Слот, що зачіпає перерву, не створюється — наступний починається після неї.
+    """
+    tz = timezone.get_current_timezone()
+    length = timedelta(minutes=slot_minutes)
+    step_gap = timedelta(minutes=gap_minutes)
+    day = date_from
+    while day <= date_to:
+        if weekdays is None or day.weekday() in weekdays:
+            cursor = datetime.combine(day, day_start)
+            day_end_dt = datetime.combine(day, day_end)
+            day_breaks = sorted((datetime.combine(day, b0), datetime.combine(day, b1)) for b0, b1 in breaks)
+            while cursor + length <= day_end_dt:
+                end = cursor + length
+                blocking = next((b for b in day_breaks if b[0] < end and b[1] > cursor), None)
+                if blocking:
+                    cursor = blocking[1]
+                    continue
+                yield timezone.make_aware(cursor, tz), timezone.make_aware(end, tz)
+                cursor = end + step_gap
+        day += timedelta(days=1)
+
+
+def generate_slots(trainer, hall, date_from, date_to, day_start, day_end, slot_minutes,
+                   gap_minutes=0, breaks=(), weekdays=None,
+                   batch_size=DEFAULT_BATCH_SIZE, dry_run=False) -> dict:
+    """
+    Створює слоти тренера в залі. Повертає {"created", "skipped", "planned"}:
+    skipped — слоти, що накладаються на зайнятість тренера або залу.
+    """
+    planned = list(plan_slots(date_from, date_to, day_start, day_end, slot_minutes,
+                              gap_minutes, breaks, weekdays))
+    if not planned:
+        return {"planned": 0, "created": 0, "skipped": 0}
+    first, last = planned[0][0], max(end for _, end in planned)
+    trainer_index = intervals.index_for("trainer", trainer.pk, first, last)
+    hall_index = intervals.index_for("hall", hall.pk, first, last)
+
+    new_slots = []
+    skipped = 0
+    for start, end in planned:
+        if trainer_index.overlapping(start, end) or hall_index.overlapping(start, end):
+            skipped += 1
+            continue
+        new_slots.append(IndividualSlot(trainer=trainer, hall=hall, start_time=start, end_time=end))
+
+    report = {"planned": len(new_slots) + skipped, "created": 0, "skipped": skipped}
+    if dry_run or not new_slots:
+        return report
+
+    try:
+        with transaction.atomic():
+            IndividualSlot.objects.bulk_create(new_slots, batch_size=batch_size)
+    except (IntegrityError, DatabaseError):
+        taken = IndividualSlot.objects.filter(
+            trainer=trainer, hall=hall, start_time__in=[slot.start_time for slot in new_slots],
+        ).count()
+        if not taken:
+            raise
+        # без транзакцій (MongoDB) частина пакета могла записатися
+        _written(trainer, hall, new_slots)
+        raise SlotOverlapError(taken)
+    report["created"] = len(new_slots)
+    _written(trainer, hall, new_slots)
+    return report
+
+
+def _written(trainer, hall, new_slots):
+    versions.bump(IndividualSlot)
+    # bulk_create без сигналів — зайнятість тренера й залу позначаємо вручну
+    intervals.touch(("trainer", trainer.pk), ("hall", hall.pk))
+    for day in sorted({schedule.local_day(s.start_time) for s in new_slots}):
+        schedule.rebuild_day(hall.pk, day)
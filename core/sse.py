@@ -0,0 +1,155 @@
+# core/sse.py
+"""
+SSE-потік змін розкладу (Server-Sent Events).
+
+Це окремий ASGI-застосунок, а не Django-view: довге з'єднання живе
+в циклі asyncio і не займає потік пулу синхронних view. sport_gym/asgi.py
+спрямовує на нього запити до STREAM_PATH, решту — в Django.
+
+Автентифікація — сесійна кука Django. Вікно задається тими ж
+GET-параметрами, що й у schedule_overview (from, to, hall, trainer);
+клієнт отримує лише зміни занять і слотів, що починаються в цьому вікні:
+
+    id: 42
+    event: group
+    data: {"id": 7, "enrolled_count": 5, "max_slots": 12}
+
+Події беруться з шини процесу core.events.bus.
+"""
+import asyncio
+import json
+from http.cookies import SimpleCookie
+from importlib import import_module
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.http import HttpRequest
+from django.utils import timezone
+
+from . import events, schedule
+
+STREAM_PATH = "/schedule/stream/"
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 5000
+
+# поля подій, потрібні лише для фільтрації — клієнту не надсилаються
+ROUTING_FIELDS = ("type", "seq", "hall_id", "trainer_id", "start")
+
+
+class StreamWindow:
+    """Фільтр подій за вікном розкладу глядача."""
+
+    def __init__(self, query_string: str, now=None):
+        params = {key: values[-1] for key, values in parse_qs(query_string).items()}
+        _, _, start_dt, end_dt = schedule.window_from_params(params.get("from"), params.get("to"), now)
+        self.start = start_dt.timestamp()
+        self.end = end_dt.timestamp()
+        hall, trainer = params.get("hall", ""), params.get("trainer", "")
+        self.hall_id = int(hall) if hall.isdigit() else None
+        self.trainer_id = int(trainer) if trainer.isdigit() else None
+
+    def matches(self, event: dict) -> bool:
+        return (
+            self.start <= event["start"] <= self.end
+            and (self.hall_id is None or event["hall_id"] == self.hall_id)
+            and (self.trainer_id is None or event["trainer_id"] == self.trainer_id)
+        )
+
+
+def _headers(scope) -> dict:
+    return {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope.get("headers", [])}
+
+
+@sync_to_async
+def _authenticate(session_key):
+    if not session_key:
+        return None
+    request = HttpRequest()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    user = get_user(request)
+    return user if user.is_authenticated else None
+
+
+def format_event(event: dict) -> bytes:
+    payload = {key: value for key, value in event.items() if key not in ROUTING_FIELDS}
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(payload)}\n\n".encode()
+
+
+async def _respond(send, status: int, text: str) -> None:
+    await send({
+        "type": "http.response.start", "status": status,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+    })
+    await send({"type": "http.response.body", "body": text.encode()})
+
+
+async def _wait_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def stream_app(scope, receive, send):
+    """ASGI-застосунок потоку подій розкладу."""
+    if scope["type"] != "http":
+        return
+    if scope["method"] != "GET":
+        await _respond(send, 405, "Лише GET")
+        return
+
+    headers = _headers(scope)
+    cookie = SimpleCookie(headers.get("cookie", ""))
+    morsel = cookie.get(settings.SESSION_COOKIE_NAME)
+    if await _authenticate(morsel.value if morsel else None) is None:
+        await _respond(send, 401, "Потрібна автентифікація")
+        return
+
+    window = StreamWindow(scope.get("query_string", b"").decode("latin-1"), timezone.now())
+    subscription = events.bus.subscribe()
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+
+    async def write(chunk: bytes):
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    try:
+        await send({
+            "type": "http.response.start", "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        await write(f"retry: {RETRY_MS}\n\n".encode())
+
+        last_id = headers.get("last-event-id", "")
+        if last_id.isdigit():
+            missed = events.bus.since(int(last_id))
+            if missed is None:
+                await write(b"event: reset\ndata: {}\n\n")
+            else:
+                for event in missed:
+                    if window.matches(event):
+                        await write(format_event(event))
+
+        while not disconnected.done():
+            getter = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {getter, disconnected}, timeout=HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+            if getter not in done:
+                getter.cancel()
+                if not disconnected.done():
+                    await write(b": ping\n\n")
+                continue
+            if subscription.overflowed:
+                # частину подій втрачено — клієнт має перечитати сторінку
+                subscription.overflowed = False
+                await write(b"event: reset\ndata: {}\n\n")
+            event = getter.result()
+            if window.matches(event):
+                await write(format_event(event))
+    finally:
+        subscription.close()
+        disconnected.cancel()
@@ -1,15 +1,40 @@
-from datetime import timedelta
-from django.contrib.auth.models import User
-from django.db import IntegrityError, DatabaseError
-from django.test import TestCase, Client
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import MagicMock, patch
+from asgiref.sync import async_to_sync, sync_to_async
+from django import forms
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, DatabaseError, connections
+from django.db.models import Index
+from django.db.models.functions import Lower
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
+from accounts import search
 from accounts.models import Profile
-from core.forms import GroupClassForm, IndividualSlotForm
+from core import analytics, async_views, availability, booking, events, fragments, intervals, schedule, seed, series, views
+from core.forms import GroupClassForm, GroupClassSeriesForm, IndividualSlotForm
+from core.mongo import declared_indexes, index_report, is_mongo, schedule_overview_data, sync_indexes
+from core.schedule import local_day
+from core.slot_generator import generate_slots, plan_slots
+from core.sse import STREAM_PATH, stream_app
+from pymongo.errors import OperationFailure
+from sport_gym.db.base import CachedQuery, parse_cache_info, parse_sql
 from core.models import (
     SiteInfo, GymHall, GroupClass,
-    GroupEnrollment, IndividualSlot, IndividualBooking
+    GroupEnrollment, IndividualSlot, IndividualBooking, ScheduleDay, ModelVersion, Tariff,
+    GroupClassSeries, HallDailyRollup, WaitlistEntry,
 )
 
 def first_choice_value(model, field_name, default=None):
@@ -110,6 +135,26 @@ class IndividualSlotTests(TestCase):
                 start_time=start, end_time=end, is_booked=False
             )
 
+    def test_edit_does_not_overwrite_concurrent_booking(self):
+        start = timezone.localtime(timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        slot = IndividualSlot.objects.create(trainer=self.p_trainer, hall=self.hall,
+                                             start_time=start, end_time=start + timedelta(hours=1))
+        original_clean = IndividualSlotForm.clean
+
+        def booked_meanwhile(form):
+            IndividualSlot.objects.filter(pk=slot.pk).update(is_booked=True)
+            return original_clean(form)
+
+        self.client.force_login(self.user_trainer)
+        with patch.object(IndividualSlotForm, "clean", booked_meanwhile):
+            self.client.post(reverse("slot_edit", args=[slot.pk]), {
+                "hall": self.hall.pk,
+                "start_time": start.strftime("%Y-%m-%dT%H:%M"),
+                "end_time": (start + timedelta(minutes=90)).strftime("%Y-%m-%dT%H:%M"),
+            })
+        slot.refresh_from_db()
+        self.assertEqual((slot.end_time, slot.is_booked), (start + timedelta(minutes=90), True))
+
 
 class FormsValidationTests(TestCase):
     def setUp(self):
@@ -211,6 +256,38 @@ class IndividualBookingTests(TestCase):
 
         IndividualBooking.objects.create(slot=self.slot, client=self.p_cl)
 
+    def test_book_slot_is_compare_and_set(self):
+        u2 = User.objects.create_user(username="cl_b2", password="x")
+        rival = Profile.objects.get(user=u2)
+
+        self.assertEqual(booking.book_slot(self.slot, self.p_cl), booking.BOOKED)
+        self.assertEqual(booking.book_slot(self.slot, rival), booking.ALREADY_BOOKED)
+        self.slot.refresh_from_db()
+        self.assertTrue(self.slot.is_booked)
+        self.assertEqual(IndividualBooking.objects.get(slot=self.slot).client, self.p_cl)
+
+        self.assertFalse(booking.unbook_slot(self.slot, rival))
+        self.assertTrue(booking.unbook_slot(self.slot, self.p_cl))
+        self.slot.refresh_from_db()
+        self.assertFalse(self.slot.is_booked)
+
+    def test_failed_booking_write_releases_the_slot(self):
+        with patch.object(IndividualBooking.objects, "create", side_effect=DatabaseError("connection lost")):
+            with self.assertRaises(DatabaseError):
+                booking.book_slot(self.slot, self.p_cl)
+        self.slot.refresh_from_db()
+        self.assertFalse(self.slot.is_booked)
+        self.assertEqual(booking.book_slot(self.slot, self.p_cl), booking.BOOKED)
+
+    def test_stale_flag_loser_gets_already_booked(self):
+        IndividualBooking.objects.create(slot=self.slot, client=self.p_cl)
+        u2 = User.objects.create_user(username="cl_b3", password="x")
+        rival = Profile.objects.get(user=u2)
+
+        self.assertEqual(booking.book_slot(self.slot, rival), booking.ALREADY_BOOKED)
+        self.slot.refresh_from_db()
+        self.assertTrue(self.slot.is_booked)
+
     def test_same_client_cannot_double_book_same_slot(self):
         IndividualBooking.objects.create(slot=self.slot, client=self.p_cl)
         with self.assertRaises((IntegrityError, DatabaseError)):
@@ -262,6 +339,1283 @@ class GroupCapacityTests(TestCase):
             )
 
 
+class EnrolledCounterTests(TestCase):
+    def setUp(self):
+        u_tr = User.objects.create_user(username="tr_cnt", password="x")
+        self.p_tr = prepare_trainer(Profile.objects.get(user=u_tr), idx=30)
+        self.hall = GymHall.objects.create(name="Лічильник", capacity=10)
+        now = timezone.now()
+        self.group = GroupClass.objects.create(
+            title="Пілатес", hall=self.hall, trainer=self.p_tr,
+            start_time=now + timedelta(days=2),
+            end_time=now + timedelta(days=2, hours=1),
+            max_slots=5,
+        )
+        self.clients = [
+            Profile.objects.get(user=User.objects.create_user(username=f"cl_cnt_{i}"))
+            for i in range(3)
+        ]
+
+    def test_counter_follows_enroll_and_unenroll(self):
+        e1 = GroupEnrollment.objects.create(group_class=self.group, client=self.clients[0])
+        GroupEnrollment.objects.create(group_class=self.group, client=self.clients[1])
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.enrolled_count, 2)
+
+        e1.delete()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.enrolled_count, 1)
+
+    def test_counter_follows_cascade_delete_of_client(self):
+        GroupEnrollment.objects.create(group_class=self.group, client=self.clients[0])
+        GroupEnrollment.objects.create(group_class=self.group, client=self.clients[1])
+
+        self.clients[0].user.delete()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.enrolled_count, 1)
+
+    def _edit_with_enrollment_meanwhile(self, url, data):
+        original_clean = forms.ModelForm.clean
+        enrolled = []
+
+        def enrolled_meanwhile(form):
+            if not enrolled:
+                enrolled.append(GroupEnrollment.objects.create(group_class=self.group, client=self.clients[0]))
+            return original_clean(form)
+
+        with patch.object(forms.ModelForm, "clean", enrolled_meanwhile):
+            self.client.post(url, data)
+        self.group.refresh_from_db()
+        return self.group
+
+    def _form_data(self):
+        start = timezone.localtime(self.group.start_time)
+        end = timezone.localtime(self.group.end_time)
+        return {"title": "Пілатес для початківців", "hall": self.hall.pk, "trainer": self.p_tr.pk, "max_slots": 5,
+                "start_time": start.strftime("%Y-%m-%dT%H:%M"), "end_time": end.strftime("%Y-%m-%dT%H:%M")}
+
+    def test_group_edit_keeps_concurrent_counter(self):
+        manager = User.objects.create_user(username="mgr_cnt")
+        Profile.objects.filter(user=manager).update(role=Profile.Role.MANAGER)
+        self.client.force_login(manager)
+        group = self._edit_with_enrollment_meanwhile(reverse("group_edit", args=[self.group.pk]), self._form_data())
+        self.assertEqual((group.title, group.enrolled_count), ("Пілатес для початківців", 1))
+
+    def test_admin_change_keeps_concurrent_counter(self):
+        self.client.force_login(User.objects.create_superuser(username="admin_cnt", password="x"))
+        data = self._form_data()
+        for name in ("start_time", "end_time"):
+            data[f"{name}_0"], data[f"{name}_1"] = data.pop(name).split("T")
+        group = self._edit_with_enrollment_meanwhile(reverse("admin:core_groupclass_change", args=[self.group.pk]), data)
+        self.assertEqual((group.title, group.enrolled_count), ("Пілатес для початківців", 1))
+
+    def test_model_save_keeps_default_semantics(self):
+        # відкладені поля не дочитуються й не записуються назад
+        partial = GroupClass.objects.only("id", "title").get(pk=self.group.pk)
+        partial.title = "Пілатес"
+        with CaptureQueriesContext(connections["default"]) as ctx:
+            partial.save()
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "core_groupclass"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn("enrolled_count", updates[0])
+
+        # рядок, видалений паралельно, зберігається знову, як і раніше
+        stale = GroupClass.objects.get(pk=self.group.pk)
+        GroupClass.objects.filter(pk=stale.pk).delete()
+        stale.save()
+        self.assertTrue(GroupClass.objects.filter(pk=stale.pk).exists())
+
+    def test_recount_command_repairs_drift(self):
+        for p in self.clients:
+            GroupEnrollment.objects.create(group_class=self.group, client=p)
+        GroupClass.objects.filter(pk=self.group.pk).update(enrolled_count=0)
+
+        call_command("recount_enrollments", stdout=StringIO())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.enrolled_count, 3)
+
+
+class ConcurrentEnrollTests(TransactionTestCase):
+    """Сотні паралельних записів на одне заняття не перевищують max_slots."""
+    CLIENTS = 300
+    MAX_SLOTS = 25
+
+    def setUp(self):
+        u_tr = User.objects.create_user(username="tr_rush", password="x")
+        self.p_tr = prepare_trainer(Profile.objects.get(user=u_tr), idx=40)
+        self.hall = GymHall.objects.create(name="Година пік", capacity=30)
+        now = timezone.now()
+        self.group = GroupClass.objects.create(
+            title="Кросфіт 18:00", hall=self.hall, trainer=self.p_tr,
+            start_time=now + timedelta(days=1),
+            end_time=now + timedelta(days=1, hours=1),
+            max_slots=self.MAX_SLOTS,
+        )
+        self.client_ids = [
+            Profile.objects.get(user=User.objects.create(username=f"rush_{i}")).pk
+            for i in range(self.CLIENTS)
+        ]
+
+    def _enroll(self, profile_id):
+        try:
+            return booking.enroll(self.group, Profile.objects.get(pk=profile_id))
+        finally:
+            connections.close_all()
+
+    def test_parallel_enrollments_never_overbook(self):
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(self._enroll, self.client_ids))
+
+        actual = GroupEnrollment.objects.filter(group_class=self.group).count()
+        self.group.refresh_from_db()
+
+        self.assertLessEqual(actual, self.MAX_SLOTS)
+        self.assertEqual(results.count(booking.ENROLLED), actual)
+        self.assertEqual(results.count(booking.CLASS_FULL), self.CLIENTS - actual)
+        self.assertEqual(self.group.enrolled_count, actual)
+
+    def test_same_client_in_parallel_takes_one_seat(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(self._enroll, [self.client_ids[0]] * 20))
+
+        self.group.refresh_from_db()
+        self.assertEqual(results.count(booking.ENROLLED), 1)
+        self.assertEqual(self.group.enrolled_count, 1)
+
+
+class ScheduleDayReadModelTests(TestCase):
+    def setUp(self):
+        u_tr = User.objects.create_user(username="tr_sd", first_name="Ольга", last_name="Коваль")
+        self.p_tr = prepare_trainer(Profile.objects.get(user=u_tr), idx=50)
+        self.hall = GymHall.objects.create(name="Великий", capacity=20)
+        self.other_hall = GymHall.objects.create(name="Малий", capacity=5)
+        self.start = timezone.now() + timedelta(days=3)
+        self.group = GroupClass.objects.create(
+            title="Зумба", hall=self.hall, trainer=self.p_tr,
+            start_time=self.start, end_time=self.start + timedelta(hours=1), max_slots=10,
+        )
+        self.slot = IndividualSlot.objects.create(
+            trainer=self.p_tr, hall=self.hall,
+            start_time=self.start + timedelta(hours=2), end_time=self.start + timedelta(hours=3),
+        )
+        self.client_profile = Profile.objects.get(user=User.objects.create_user(username="cl_sd"))
+
+    def _doc(self, hall=None):
+        return ScheduleDay.objects.get(hall=hall or self.hall, day=local_day(self.start))
+
+    def test_document_holds_denormalized_rows(self):
+        doc = self._doc()
+        self.assertEqual(doc.hall_name, "Великий")
+        self.assertEqual(doc.groups[0]["title"], "Зумба")
+        self.assertEqual(doc.groups[0]["trainer_name"], "Ольга Коваль")
+        self.assertEqual(doc.slots[0]["id"], self.slot.pk)
+
+    def test_enrollment_and_booking_update_document(self):
+        booking.enroll(self.group, self.client_profile)
+        booking.book_slot(self.slot, self.client_profile)
+        doc = self._doc()
+        self.assertEqual(doc.groups[0]["enrolled_count"], 1)
+        self.assertTrue(doc.slots[0]["is_booked"])
+
+        booking.unbook_slot(self.slot, self.client_profile)
+        self.assertFalse(self._doc().slots[0]["is_booked"])
+
+    def test_moving_class_to_other_hall_moves_row(self):
+        self.group.hall = self.other_hall
+        self.group.save()
+        self.assertEqual(self._doc().groups, [])
+        self.assertEqual(self._doc(self.other_hall).groups[0]["id"], self.group.pk)
+
+    def test_hall_delete_cascades_without_orphans(self):
+        self.hall.delete()
+        self.assertFalse(ScheduleDay.objects.exists())
+
+    def test_rebuild_command_restores_documents(self):
+        ScheduleDay.objects.all().delete()
+        call_command("rebuild_schedule_days", stdout=StringIO())
+        self.assertEqual(len(self._doc().groups), 1)
+
+    def test_overview_reads_read_model(self):
+        self.client.force_login(self.client_profile.user)
+        resp = self.client.get(reverse("schedule_overview"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Зумба")
+        self.assertContains(resp, "Ольга Коваль")
+
+
+class ScheduleDataBackendTests(TestCase):
+    """ORM-шлях і нативні агрегації pymongo мають давати однаковий контекст."""
+    def setUp(self):
+        u_tr = User.objects.create_user(username="tr_dal", first_name="Ігор", last_name="Левченко")
+        self.p_tr = prepare_trainer(Profile.objects.get(user=u_tr), idx=60)
+        u_tr2 = User.objects.create_user(username="tr_dal2")
+        self.p_tr2 = prepare_trainer(Profile.objects.get(user=u_tr2), idx=61)
+        self.halls = [GymHall.objects.create(name=n, capacity=10) for n in ("Б-зал", "А-зал")]
+        self.client_profile = Profile.objects.get(user=User.objects.create_user(username="cl_dal"))
+
+        self.now = timezone.now()
+        groups, slots = [], []
+        for i in range(6):
+            start = self.now + timedelta(days=i, hours=1)
+            groups.append(GroupClass.objects.create(
+                title=f"Клас {i}", hall=self.halls[i % 2], trainer=(self.p_tr, self.p_tr2)[i % 2],
+                start_time=start, end_time=start + timedelta(hours=1), max_slots=4,
+            ))
+            slots.append(IndividualSlot.objects.create(
+                hall=self.halls[i % 2], trainer=(self.p_tr, self.p_tr2)[i % 2],
+                start_time=start + timedelta(hours=3), end_time=start + timedelta(hours=4),
+            ))
+        booking.enroll(groups[0], self.client_profile)
+        booking.enroll(groups[3], self.client_profile)
+        booking.book_slot(slots[1], self.client_profile)
+
+        self.start_dt = self.now - timedelta(days=1)
+        self.end_dt = self.now + timedelta(days=14)
+
+    def test_orm_path_returns_window_and_client_flags(self):
+        data = schedule.overview_data(
+            self.start_dt, self.end_dt, client=self.client_profile, now=self.now
+        )
+        self.assertEqual([h["name"] for h in data["halls"]], ["А-зал", "Б-зал"])
+        self.assertEqual(len(data["groups"]), 6)
+        self.assertEqual(len(data["enrolled_group_ids"]), 2)
+        self.assertEqual(len(data["my_entries"]), 3)
+
+    def _first_aggregation(self):
+        """Документ, який повернула б перша агрегація, у форматі зберігання djongo."""
+        def naive(value):
+            return timezone.make_naive(value, timezone.utc)
+
+        def mongo_date(day):
+            return datetime.combine(day, time.min) if day else None
+
+        return {
+            "halls": [{"id": h.pk, "name": h.name} for h in GymHall.objects.order_by("name")],
+            "trainers": list(Profile.objects.filter(role=Profile.Role.TRAINER)
+                             .order_by("last_name", "first_name", "username")
+                             .values("id", "first_name", "last_name", "username")),
+            "days": [{"hall_id": d.hall_id, "hall_name": d.hall_name,
+                      "groups": json.dumps(d.groups), "slots": json.dumps(d.slots)}
+                     for d in ScheduleDay.objects.all()],
+            "series": [{"id": s.pk, "title": s.title, "hall_id": s.hall_id, "trainer_id": s.trainer_id,
+                        "weekdays": json.dumps(s.weekdays), "exceptions": json.dumps(s.exceptions),
+                        "start_time": datetime.combine(datetime(1900, 1, 1), s.start_time),
+                        "end_time": datetime.combine(datetime(1900, 1, 1), s.end_time),
+                        "max_slots": s.max_slots, "starts_on": mongo_date(s.starts_on), "until": mongo_date(s.until)}
+                       for s in GroupClassSeries.objects.all()],
+            "materialized": [{"series_id": g.series_id, "start_time": naive(g.start_time)}
+                             for g in GroupClass.objects.filter(series__isnull=False)],
+        }
+
+    def test_mongo_path_expands_series_from_the_aggregation(self):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        gs = GroupClassSeries.objects.create(
+            title="Серія", hall=self.halls[0], trainer=self.p_tr, weekdays=list(range(7)),
+            start_time=time(6, 0), end_time=time(7, 0), max_slots=3,
+            starts_on=tomorrow, until=tomorrow + timedelta(days=3), exceptions=[(tomorrow + timedelta(days=2)).isoformat()],
+        )
+        series.materialize(gs, tomorrow)
+
+        db = MagicMock()
+        for trainer_id in (None, self.p_tr.pk):
+            db.__getitem__.return_value.aggregate.return_value = iter([self._first_aggregation()])
+            args = (self.start_dt, self.end_dt, None, trainer_id, None, self.now)
+            expected = schedule.overview_data(*args)
+            with patch("core.mongo.get_database", return_value=db), self.assertNumQueries(0):
+                self.assertEqual(schedule_overview_data(*args), expected)
+            self.assertEqual(len([g for g in expected["groups"] if g.get("virtual")]), 2)
+
+        pipeline = db.__getitem__.return_value.aggregate.call_args[0][0]
+        lookups = {stage["$lookup"]["from"] for stage in pipeline if "$lookup" in stage}
+        self.assertTrue({GroupClassSeries._meta.db_table, GroupClass._meta.db_table} <= lookups)
+
+    @skipUnless(is_mongo(), "Нативний шлях доступний лише з djongo/MongoDB")
+    def test_mongo_path_matches_orm_path(self):
+        for client in (None, self.client_profile):
+            for hall_id in (None, self.halls[0].pk):
+                for trainer_id in (None, self.p_tr.pk):
+                    args = (self.start_dt, self.end_dt, hall_id, trainer_id, client, self.now)
+                    self.assertEqual(schedule.overview_data(*args), schedule_overview_data(*args))
+
+    @skipUnless(is_mongo(), "Нативний шлях доступний лише з djongo/MongoDB")
+    def test_view_context_is_identical_for_both_backends(self):
+        self.client.force_login(self.client_profile.user)
+        contexts = []
+        for backend in ("orm", "mongo"):
+            with override_settings(SCHEDULE_DATA_BACKEND=backend):
+                resp = self.client.get(reverse("schedule_overview"))
+            keys = ("halls", "trainers", "groups", "slots",
+                    "enrolled_group_ids", "my_booked_slot_ids", "booked_slot_ids", "my_entries")
+            contexts.append({k: resp.context[k] for k in keys})
+        self.assertEqual(contexts[0], contexts[1])
+
+
+class SqlParseCacheTests(SimpleTestCase):
+    """Кеш розбору SQL у бекенді: одна форма запиту — один розбір, параметри різні."""
+    SQL = (
+        'SELECT "core_gymhall"."id", "core_gymhall"."name" FROM "core_gymhall" '
+        'WHERE "core_gymhall"."capacity" >= %s LIMIT 21'
+    )
+
+    def setUp(self):
+        parse_sql.cache_clear()
+
+    def test_same_shape_is_parsed_once_and_params_are_bound_per_query(self):
+        first = CachedQuery(None, None, None, self.SQL, [5])
+        second = CachedQuery(None, None, None, self.SQL, [9])
+
+        info = parse_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+        self.assertIn({"$match": {"capacity": {"$gte": 5}}}, first._query._make_pipeline())
+        self.assertIn({"$match": {"capacity": {"$gte": 9}}}, second._query._make_pipeline())
+
+    def test_cache_is_bounded(self):
+        maxsize = parse_cache_info().maxsize
+        for i in range(maxsize + 10):
+            parse_sql(f'SELECT "core_gymhall"."id" FROM "core_gymhall" LIMIT {i + 1}')
+        self.assertEqual(parse_cache_info().currsize, maxsize)
+
+
+class DeclaredIndexesTests(SimpleTestCase):
+    """Задекларовані індекси моделей, які звіряє команда sync_indexes."""
+    def test_unique_together_and_foreign_keys(self):
+        specs = {spec["key"]: spec["unique"] for spec in declared_indexes(GroupEnrollment)}
+        self.assertTrue(specs[(("group_class_id", 1), ("client_id", 1))])
+        self.assertFalse(specs[(("client_id", 1),)])
+        self.assertTrue(specs[(("id", 1),)])
+
+    def test_schedule_models_have_hot_filter_index(self):
+        for model in (GroupClass, IndividualSlot):
+            keys = {spec["key"] for spec in declared_indexes(model)}
+            self.assertIn((("start_time", 1), ("hall_id", 1), ("trainer_id", 1)), keys)
+
+    def test_descending_fields_and_expression_indexes(self):
+        indexes = [Index(fields=["-start_time", "hall"], name="gc_recent_idx"),
+                   Index(Lower("title"), name="gc_title_lower_idx")]
+        with patch.object(GroupClass._meta, "indexes", indexes):
+            specs = {spec["name"]: spec["key"] for spec in declared_indexes(GroupClass)}
+        self.assertEqual(specs["gc_recent_idx"], (("start_time", -1), ("hall_id", 1)))
+        self.assertNotIn("gc_title_lower_idx", specs)
+
+    def test_failed_drop_is_reported_and_sync_continues(self):
+        coll = MagicMock()
+        coll.index_information.return_value = {
+            "_id_": {"key": [("_id", 1)]},
+            "legacy_idx": {"key": [("client_id", 1), ("group_class_id", 1)]},
+        }
+        coll.drop_index.side_effect = OperationFailure("not authorized")
+        with patch("core.mongo.collection", return_value=coll):
+            report = sync_indexes(GroupEnrollment, drop_extra=True)
+        self.assertEqual([(e["index"]["name"], e["action"]) for e in report["errors"]], [("legacy_idx", "drop")])
+        self.assertEqual(coll.create_index.call_count, len(declared_indexes(GroupEnrollment)))
+
+    @skipUnless(is_mongo(), "Індекси MongoDB перевіряються лише з djongo")
+    def test_sync_indexes_leaves_nothing_missing(self):
+        call_command("sync_indexes", "core", stdout=StringIO())
+        self.assertEqual(index_report(GroupClass)["missing"], [])
+
+
+class ScheduleApiTests(TestCase):
+    """JSON API розкладу: keyset-пагінація за (start_time, id) і вибір полів."""
+    def setUp(self):
+        u_tr = User.objects.create_user(username="tr_api", first_name="Олег", last_name="Бондар")
+        self.p_tr = prepare_trainer(Profile.objects.get(user=u_tr), idx=70)
+        self.hall = GymHall.objects.create(name="API-зал", capacity=10)
+        self.other_hall = GymHall.objects.create(name="Інший зал", capacity=10)
+        start = timezone.now() + timedelta(days=1)
+        self.groups = []
+        for i in range(5):
+            # два заняття з однаковим початком — перевіряємо id як другий ключ
+            st = start + timedelta(hours=i // 2)
+            self.groups.append(GroupClass.objects.create(
+                title=f"API {i}", hall=self.hall, trainer=self.p_tr,
+                start_time=st, end_time=st + timedelta(minutes=50), max_slots=3,
+            ))
+        GroupClass.objects.create(
+            title="Чужий зал", hall=self.other_hall, trainer=self.p_tr,
+            start_time=start, end_time=start + timedelta(hours=1), max_slots=3,
+        )
+        IndividualSlot.objects.create(
+            hall=self.hall, trainer=self.p_tr, start_time=start, end_time=start + timedelta(hours=1),
+        )
+        self.client.force_login(u_tr)
+        self.url = reverse("schedule_api")
+
+    def test_pages_cover_window_without_gaps_or_duplicates(self):
+        seen, cursor = [], None
+        while True:
+            params = {"hall": self.hall.pk, "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.client.get(self.url, params).json()
+            self.assertLessEqual(len(data["results"]), 2)
+            seen += [r["id"] for r in data["results"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, [g.pk for g in self.groups])
+
+    def _all_pages(self, **params):
+        items, cursor = [], None
+        while True:
+            data = self.client.get(self.url, {"hall": self.hall.pk, "limit": 2, **params,
+                                              **({"cursor": cursor} if cursor else {})}).json()
+            items += data["results"]
+            cursor = data["next_cursor"]
+            if not cursor:
+                return items
+
+    def test_series_occurrences_are_merged_into_pages(self):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        gs = GroupClassSeries.objects.create(
+            title="Серія API", hall=self.hall, trainer=self.p_tr, weekdays=list(range(7)),
+            start_time=time(6, 0), end_time=time(6, 45), max_slots=4,
+            starts_on=tomorrow, until=tomorrow + timedelta(days=1),
+        )
+        items = self._all_pages(fields="id,start_time")
+        self.assertEqual([i["id"] for i in items if not i.get("virtual")], [g.pk for g in self.groups])
+        virtual = [i for i in items if i.get("virtual")]
+        self.assertEqual([(i["id"], i["series_id"]) for i in virtual], [(None, gs.pk)] * 2)
+        self.assertEqual([i["occurrence"] for i in virtual], [tomorrow.isoformat(), (tomorrow + timedelta(days=1)).isoformat()])
+        starts = [datetime.fromisoformat(i["start_time"]) for i in items]
+        self.assertEqual(starts, sorted(starts))
+
+        # створене заняття серії йде вже як звичайний рядок, без дубля
+        series.materialize(gs, tomorrow)
+        items = self._all_pages()
+        self.assertEqual(len(items), 7)
+        self.assertEqual(len([i for i in items if i.get("virtual")]), 1)
+
+    def test_fields_selection(self):
+        data = self.client.get(self.url, {"hall": self.hall.pk, "fields": "title,trainer_name,enrolled_count"}).json()
+        self.assertEqual(data["results"][0], {"title": "API 0", "trainer_name": "Олег Бондар", "enrolled_count": 0})
+
+    def test_slots_kind(self):
+        data = self.client.get(self.url, {"kind": "slots", "fields": "id,is_booked,hall_name"}).json()
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(data["results"][0]["hall_name"], "API-зал")
+
+    def test_bad_params_return_400(self):
+        for params in ({"fields": "password"}, {"kind": "all"}, {"cursor": "???"}, {"hall": "x"}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class ConditionalGetTests(TestCase):
+    """ETag/Last-Modified з версій моделей: 304 без змін, новий ETag після змін."""
+    def test_model_version_is_bumped_on_save_and_delete(self):
+        hall = GymHall.objects.create(name="Версійний", capacity=5)
+        hall.delete()
+        self.assertEqual(ModelVersion.objects.get(label="core.gymhall").version, 2)
+
+    def test_price_page_returns_304_until_tariff_changes(self):
+        resp = self.client.get(reverse("price"))
+        etag = resp["ETag"]
+        self.assertIn("no-cache", resp["Cache-Control"])
+        self.assertEqual(self.client.get(reverse("price"), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Tariff.objects.create(name="Разовий", duration_label="1 день", price_uah=200)
+        resp = self.client.get(reverse("price"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_etag_depends_on_user_and_query(self):
+        user = User.objects.create_user(username="etag_user")
+        self.client.force_login(user)
+        etag = self.client.get(reverse("schedule_overview"))["ETag"]
+        self.assertNotEqual(self.client.get(reverse("schedule_overview"), {"hall": "1"})["ETag"], etag)
+        self.client.force_login(User.objects.create_user(username="etag_other"))
+        self.assertEqual(self.client.get(reverse("schedule_overview"), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_pending_messages_disable_validators(self):
+        manager = User.objects.create_user(username="etag_mgr")
+        Profile.objects.filter(user=manager).update(role=Profile.Role.MANAGER)
+        self.client.force_login(manager)
+        hall = GymHall.objects.create(name="Зал з повідомленням", capacity=5)
+        resp = self.client.post(reverse("hall_delete", args=[hall.pk]), follow=True)
+        self.assertNotIn("ETag", resp)
+        self.assertContains(resp, "Зал «Зал з повідомленням» видалено")
+
+
+class ScheduleFragmentCacheTests(TestCase):
+    """Кеш рядків таблиць розкладу: хіт для того ж набору фільтрів, точкова інвалідація."""
+    def setUp(self):
+        cache.clear()
+        u_tr = User.objects.create_user(username="tr_frag")
+        self.p_tr = prepare_trainer(Profile.objects.get(user=u_tr), idx=80)
+        self.hall = GymHall.objects.create(name="Фрагментний", capacity=10)
+        self.other_hall = GymHall.objects.create(name="Сусідній", capacity=10)
+        start = timezone.now() + timedelta(days=1)
+        self.gc = GroupClass.objects.create(
+            title="Кешоване", hall=self.hall, trainer=self.p_tr,
+            start_time=start, end_time=start + timedelta(hours=1), max_slots=2,
+        )
+        self.client_profile = Profile.objects.get(user=User.objects.create_user(username="cl_frag"))
+        self.client.force_login(self.client_profile.user)
+        self.params = {"hall": self.hall.pk}
+
+    def _get(self, params=None):
+        return self.client.get(reverse("schedule_overview"), params or self.params)
+
+    def test_second_request_is_served_from_cache(self):
+        self._get()
+        resp = self._get()
+        self.assertEqual(fragments.stats()["hits"], 1)
+        self.assertContains(resp, "Кешоване")
+        self.assertContains(resp, "Записатися")
+
+    def test_enrollment_in_window_invalidates_rows(self):
+        self._get()
+        other = Profile.objects.get(user=User.objects.create_user(username="cl_frag2"))
+        booking.enroll(self.gc, other)
+        resp = self._get()
+        self.assertEqual(fragments.stats()["hits"], 0)
+        self.assertEqual(resp.context["groups"][0]["enrolled_count"], 1)
+
+    def test_change_in_other_hall_keeps_entry(self):
+        self._get()
+        start = timezone.now() + timedelta(days=1)
+        GroupClass.objects.create(
+            title="Інший зал", hall=self.other_hall, trainer=self.p_tr,
+            start_time=start, end_time=start + timedelta(hours=1), max_slots=2,
+        )
+        self._get()
+        self.assertEqual(fragments.stats()["hits"], 1)
+
+    def test_user_buttons_are_applied_over_cached_rows(self):
+        self._get()
+        booking.enroll(self.gc, self.client_profile)
+        self._get()
+        resp = self._get()
+        self.assertEqual(fragments.stats()["hits"], 1)
+        self.assertContains(resp, reverse("group_unenroll", args=[self.gc.pk]))
+
+    def test_stats_are_manager_only(self):
+        self.assertEqual(self.client.get(reverse("schedule_cache_stats")).status_code, 403)
+        manager = User.objects.create_user(username="mgr_frag")
+        Profile.objects.filter(user=manager).update(role=Profile.Role.MANAGER)
+        self.client.force_login(manager)
+        self._get()
+        data = self.client.get(reverse("schedule_cache_stats")).json()
+        self.assertEqual((data["misses"], data["stores"]), (1, 1))
+        self.assertGreater(data["bytes"], 0)
+
+
+class IntervalConflictTests(TestCase):
+    """Накладки тренера, залу й клієнта через індекс інтервалів."""
+    def setUp(self):
+        # відкат транзакції тесту повертає і лічильники версій, і id — кеш процесу треба скинути
+        intervals.clear_cache()
+        u_tr = User.objects.create_user(username="tr_int")
+        self.trainer = prepare_trainer(Profile.objects.get(user=u_tr), idx=90)
+        u_tr2 = User.objects.create_user(username="tr_int2")
+        self.trainer2 = prepare_trainer(Profile.objects.get(user=u_tr2), idx=91)
+        self.hall = GymHall.objects.create(name="Інтервальний", capacity=10)
+        self.hall2 = GymHall.objects.create(name="Інтервальний 2", capacity=10)
+        self.start = (timezone.now() + timedelta(days=2)).replace(minute=0, second=0, microsecond=0)
+        self.gc = GroupClass.objects.create(
+            title="Зайнятий час", hall=self.hall, trainer=self.trainer,
+            start_time=self.start, end_time=self.start + timedelta(hours=1), max_slots=5,
+        )
+
+    def _group_form(self, start, trainer, hall, instance=None):
+        return GroupClassForm(data={
+            "title": "Нове", "hall": hall.pk, "trainer": trainer.pk, "max_slots": 5,
+            "start_time": start.isoformat(timespec="minutes"),
+            "end_time": (start + timedelta(hours=1)).isoformat(timespec="minutes"),
+        }, instance=instance)
+
+    def test_index_matches_full_scan(self):
+        import random
+        rnd = random.Random(7)
+        items = []
+        for i in range(500):
+            s = float(rnd.randrange(0, 100_000))
+            items.append((s, s + rnd.randrange(1, 5_000), i))
+        index = intervals.IntervalIndex(items)
+        for _ in range(200):
+            s = float(rnd.randrange(0, 100_000))
+            e = s + rnd.randrange(1, 3_000)
+            expected = sorted(k for a, b, k in items if a < e and b > s)
+            self.assertEqual(sorted(index.overlapping(s, e)), expected)
+
+    def test_touching_intervals_do_not_conflict(self):
+        form = self._group_form(self.start + timedelta(hours=1), self.trainer, self.hall)
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_trainer_busy_in_other_hall(self):
+        form = self._group_form(self.start + timedelta(minutes=30), self.trainer, self.hall2)
+        self.assertFalse(form.is_valid())
+        self.assertIn("Тренер уже зайнятий", str(form.errors))
+
+    def test_hall_busy_with_slot_of_other_trainer(self):
+        form = IndividualSlotForm(data={
+            "hall": self.hall.pk, "trainer": self.trainer2.pk,
+            "start_time": (self.start + timedelta(minutes=15)).isoformat(timespec="minutes"),
+            "end_time": (self.start + timedelta(minutes=45)).isoformat(timespec="minutes"),
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn("Зал уже зайнятий", str(form.errors))
+
+    def test_editing_does_not_conflict_with_itself(self):
+        form = self._group_form(self.start + timedelta(minutes=30), self.trainer, self.hall, instance=self.gc)
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_cache_is_invalidated_per_owner(self):
+        index = intervals.index_for("trainer", self.trainer.pk)
+        GroupClass.objects.create(
+            title="Інший тренер", hall=self.hall2, trainer=self.trainer2,
+            start_time=self.start, end_time=self.start + timedelta(hours=1), max_slots=5,
+        )
+        self.assertIs(intervals.index_for("trainer", self.trainer.pk), index)
+
+        self.gc.end_time = self.start + timedelta(hours=2)
+        self.gc.save()
+        self.assertIsNot(intervals.index_for("trainer", self.trainer.pk), index)
+        window = (self.start + timedelta(minutes=90), self.start + timedelta(hours=3))
+        intervals.find_conflicts(*window, trainer_id=self.trainer.pk, hall_id=self.hall.pk)
+        # теплий кеш: лише версії власників
+        with self.assertNumQueries(1):
+            found = intervals.find_conflicts(*window, trainer_id=self.trainer.pk, hall_id=self.hall.pk)
+        self.assertEqual(found, {"trainer": [(intervals.GROUP, self.gc.pk)], "hall": [(intervals.GROUP, self.gc.pk)]})
+
+    def test_index_is_bounded_and_past_queries_still_checked(self):
+        old = GroupClass.objects.create(
+            title="Минуле", hall=self.hall, trainer=self.trainer,
+            start_time=self.start - timedelta(days=30), end_time=self.start - timedelta(days=30, hours=-1), max_slots=5,
+        )
+        self.assertEqual(intervals.index_for("trainer", self.trainer.pk).keys, [(intervals.GROUP, self.gc.pk)])
+        found = intervals.find_conflicts(old.start_time, old.end_time, trainer_id=self.trainer.pk)
+        self.assertEqual(found, {"trainer": [(intervals.GROUP, old.pk)]})
+
+    def test_benchmark_runs_real_conflict_checks(self):
+        Profile.objects.get(user=User.objects.create_user(username="cl_bench"))
+        out = StringIO()
+        call_command("bench_intervals", "--queries", "40", "--days", "3", stdout=out)
+        self.assertIn("теплий кеш", out.getvalue())
+        self.assertIn("Запитів до бази на теплий виклик: 1.00", out.getvalue())
+
+    def test_client_cannot_hold_overlapping_entries(self):
+        client = Profile.objects.get(user=User.objects.create_user(username="cl_int"))
+        slot = IndividualSlot.objects.create(
+            hall=self.hall2, trainer=self.trainer2,
+            start_time=self.start + timedelta(minutes=30), end_time=self.start + timedelta(minutes=90),
+        )
+        self.assertEqual(booking.enroll(self.gc, client), booking.ENROLLED)
+        self.assertEqual(booking.book_slot(slot, client), booking.TIME_CONFLICT)
+        slot.refresh_from_db()
+        self.assertFalse(slot.is_booked)
+
+
+class GroupClassSeriesTests(TestCase):
+    """Серії занять: ліниве розгортання у розкладі й створення заняття при першому записі."""
+    def setUp(self):
+        cache.clear()
+        u_tr = User.objects.create_user(username="tr_series", first_name="Марта", last_name="Ткач")
+        self.trainer = prepare_trainer(Profile.objects.get(user=u_tr), idx=95)
+        self.hall = GymHall.objects.create(name="Йога-зал", capacity=12)
+        self.today = timezone.localdate()
+        self.skipped = self.today + timedelta(days=3)
+        self.series = GroupClassSeries.objects.create(
+            title="Ранкова йога", hall=self.hall, trainer=self.trainer,
+            weekdays=list(range(7)), start_time=time(7, 0), end_time=time(8, 0), max_slots=2,
+            starts_on=self.today + timedelta(days=1), until=self.today + timedelta(days=7),
+            exceptions=[self.skipped.isoformat()],
+        )
+        self.client_profile = Profile.objects.get(user=User.objects.create_user(username="cl_series"))
+
+    def _virtual(self):
+        data = schedule.overview_data(*schedule.window_from_params()[2:])
+        return [g for g in data["groups"] if g.get("virtual")]
+
+    def test_occurrences_are_expanded_without_rows(self):
+        rows = self._virtual()
+        self.assertEqual(len(rows), 6)
+        self.assertNotIn(self.skipped.isoformat(), [r["occurrence"] for r in rows])
+        self.assertEqual(rows[0]["trainer_name"], "Марта Ткач")
+        self.assertFalse(GroupClass.objects.exists())
+
+        self.client.force_login(self.client_profile.user)
+        resp = self.client.get(reverse("schedule_overview"))
+        self.assertContains(resp, reverse("series_enroll", args=[self.series.pk, rows[0]["occurrence"]]))
+
+    def test_first_enroll_materializes_once(self):
+        day = (self.today + timedelta(days=1)).isoformat()
+        self.client.force_login(self.client_profile.user)
+        self.client.post(reverse("series_enroll", args=[self.series.pk, day]))
+
+        other = Profile.objects.get(user=User.objects.create_user(username="cl_series2"))
+        self.client.force_login(other.user)
+        self.client.post(reverse("series_enroll", args=[self.series.pk, day]))
+
+        gc = GroupClass.objects.get(series=self.series)
+        self.assertEqual(gc.enrolled_count, 2)
+        self.assertEqual(timezone.localtime(gc.start_time).time(), time(7, 0))
+        self.assertEqual(len(self._virtual()), 5)
+
+    def test_exception_day_cannot_be_enrolled(self):
+        self.client.force_login(self.client_profile.user)
+        resp = self.client.post(reverse("series_enroll", args=[self.series.pk, self.skipped.isoformat()]))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_days_outside_series_window_are_rejected(self):
+        GroupClassSeries.objects.filter(pk=self.series.pk).update(starts_on=self.today - timedelta(days=7))
+        self.client.force_login(self.client_profile.user)
+        for day in (self.today - timedelta(days=1), self.today + timedelta(days=8)):
+            resp = self.client.post(reverse("series_enroll", args=[self.series.pk, day.isoformat()]))
+            self.assertEqual(resp.status_code, 404)
+
+        GroupClassSeries.objects.filter(pk=self.series.pk).update(until=None)
+        far = self.today + series.OPEN_SERIES_HORIZON + timedelta(days=1)
+        resp = self.client.post(reverse("series_enroll", args=[self.series.pk, far.isoformat()]))
+        self.assertEqual(resp.status_code, 404)
+        self.assertFalse(GroupClass.objects.exists())
+
+    def test_failed_enroll_leaves_no_occurrence_row(self):
+        day = self.today + timedelta(days=1)
+        start = timezone.make_aware(datetime.combine(day, time(7, 30)), timezone.get_current_timezone())
+        other = GroupClass.objects.create(
+            title="Інше", hall=GymHall.objects.create(name="Малий", capacity=5), trainer=self.trainer,
+            start_time=start, end_time=start + timedelta(hours=1), max_slots=5,
+        )
+        booking.enroll(other, self.client_profile)
+
+        self.client.force_login(self.client_profile.user)
+        resp = self.client.post(reverse("series_enroll", args=[self.series.pk, day.isoformat()]), follow=True)
+        self.assertContains(resp, "У вас уже є запис на цей час.")
+        self.assertFalse(GroupClass.objects.filter(series=self.series).exists())
+
+    def test_series_form_detects_trainer_conflict(self):
+        start = timezone.make_aware(
+            datetime.combine(self.today + timedelta(days=2), time(7, 30)), timezone.get_current_timezone()
+        )
+        IndividualSlot.objects.create(hall=GymHall.objects.create(name="Інший", capacity=3), trainer=self.trainer,
+                                      start_time=start, end_time=start + timedelta(hours=1))
+        form = GroupClassSeriesForm(data={
+            "title": "Перетин", "hall": self.hall.pk, "trainer": self.trainer.pk,
+            "weekdays": [str((self.today + timedelta(days=2)).weekday())],
+            "start_time": "07:00", "end_time": "08:00", "max_slots": 3,
+            "starts_on": self.today.isoformat(), "until": (self.today + timedelta(days=6)).isoformat(),
+        }, instance=self.series)
+        self.assertFalse(form.is_valid())
+        self.assertIn("Тренер уже зайнятий", str(form.errors))
+
+
+class SlotGeneratorTests(TestCase):
+    """Масове створення слотів: правило, пропуск накладок, пакетний запис."""
+    def setUp(self):
+        u_tr = User.objects.create_user(username="tr_gen")
+        self.trainer = prepare_trainer(Profile.objects.get(user=u_tr), idx=96)
+        self.hall = GymHall.objects.create(name="Генераторний", capacity=4)
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.tz = timezone.get_current_timezone()
+
+    def _at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, minute)), self.tz)
+
+    def test_plan_respects_gap_and_breaks(self):
+        plan = list(plan_slots(self.day, self.day, time(9, 0), time(14, 30), 60,
+                               gap_minutes=15, breaks=[(time(11, 0), time(12, 0))]))
+        starts = [timezone.localtime(s).strftime("%H:%M") for s, _ in plan]
+        # 10:15–11:15 зачіпає перерву — наступний слот починається після неї
+        self.assertEqual(starts, ["09:00", "12:00", "13:15"])
+
+    def test_plan_filters_weekdays(self):
+        plan = list(plan_slots(self.day, self.day + timedelta(days=6), time(9, 0), time(10, 0), 60,
+                               weekdays={self.day.weekday()}))
+        self.assertEqual(len(plan), 1)
+
+    def test_generate_skips_collisions(self):
+        GroupClass.objects.create(title="Зайнято", hall=self.hall, trainer=self.trainer,
+                                  start_time=self._at(10), end_time=self._at(11), max_slots=3)
+        IndividualSlot.objects.create(hall=self.hall, trainer=self.trainer,
+                                      start_time=self._at(12, 30), end_time=self._at(13, 30))
+
+        report = generate_slots(self.trainer, self.hall, self.day, self.day, time(9, 0), time(15, 0), 60,
+                                batch_size=2)
+        self.assertEqual(report, {"planned": 6, "created": 3, "skipped": 3})
+        self.assertEqual(IndividualSlot.objects.filter(trainer=self.trainer).count(), 4)
+        self.assertEqual(len(ScheduleDay.objects.get(hall=self.hall, day=self.day).slots), 4)
+
+        again = generate_slots(self.trainer, self.hall, self.day, self.day, time(9, 0), time(15, 0), 60)
+        self.assertEqual(again["created"], 0)
+
+    def test_command_dry_run(self):
+        out = StringIO()
+        call_command("generate_slots", "--trainer", "tr_gen", "--hall", self.hall.name,
+                     "--from", self.day.isoformat(), "--to", self.day.isoformat(),
+                     "--start", "08:00", "--end", "12:00", "--break", "10:00-10:30",
+                     "--weekdays", "0,1,2,3,4,5,6", "--dry-run", stdout=out)
+        self.assertIn("Заплановано: 3", out.getvalue())
+        self.assertFalse(IndividualSlot.objects.exists())
+
+    def test_concurrent_generator_overlap_is_reported_in_form(self):
+        # інший генератор записав слот після того, як цей побудував індекси
+        IndividualSlot.objects.create(hall=self.hall, trainer=self.trainer,
+                                      start_time=self._at(10), end_time=self._at(11))
+        self.client.force_login(self.trainer.user)
+        data = {"hall": self.hall.pk, "date_from": self.day.isoformat(), "date_to": self.day.isoformat(),
+                "weekdays": [self.day.weekday()], "day_start": "09:00", "day_end": "12:00",
+                "slot_minutes": 60, "gap_minutes": 0, "breaks": ""}
+        with patch("core.slot_generator.intervals.index_for", return_value=intervals.IntervalIndex([])):
+            resp = self.client.post(reverse("slot_generate"), data)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("паралельно", " ".join(resp.context["form"].non_field_errors()))
+        self.assertEqual(IndividualSlot.objects.filter(trainer=self.trainer).count(), 1)
+
+    def test_other_database_errors_are_not_reported_as_overlap(self):
+        with patch.object(IndividualSlot.objects, "bulk_create", side_effect=DatabaseError("disk full")):
+            with self.assertRaises(DatabaseError):
+                generate_slots(self.trainer, self.hall, self.day, self.day, time(9, 0), time(12, 0), 60)
+
+
+class AvailabilityGridTests(TestCase):
+    """Карта доступності: векторний пошук і інкрементні оновлення."""
+    def setUp(self):
+        availability.reset()
+        self.personal = prepare_trainer(Profile.objects.get(user=User.objects.create_user(username="tr_av1")), idx=97)
+        self.yoga = prepare_trainer(Profile.objects.get(user=User.objects.create_user(username="tr_av2")), idx=98)
+        self.yoga.specialization = Profile.Specialization.YOGA
+        self.yoga.save()
+        self.hall = GymHall.objects.create(name="Карта", capacity=4)
+        self.hall2 = GymHall.objects.create(name="Карта 2", capacity=4)
+        self.day = timezone.localdate() + timedelta(days=3)
+        self.client_profile = Profile.objects.get(user=User.objects.create_user(username="cl_av"))
+
+    def _at(self, hour, minute=0, days=0):
+        return timezone.make_aware(
+            datetime.combine(self.day + timedelta(days=days), time(hour, minute)), timezone.get_current_timezone()
+        )
+
+    def _slot(self, trainer, hall, hour, minutes=60, days=0):
+        start = self._at(hour, days=days)
+        return IndividualSlot.objects.create(trainer=trainer, hall=hall, start_time=start,
+                                             end_time=start + timedelta(minutes=minutes))
+
+    def test_search_matches_full_scan(self):
+        import random
+        rnd = random.Random(3)
+        trainers = [(i, rnd.choice(["yoga", "dance", ""])) for i in range(1, 9)]
+        grid = availability.AvailabilityGrid(self.day, 7, trainers, [1, 2])
+        spans = {}
+        for pk in range(1, 300):
+            trainer_id, hall_id = rnd.randrange(1, 9), rnd.randrange(1, 3)
+            start = self._at(rnd.randrange(6, 21), rnd.choice([0, 15, 30, 45]), days=rnd.randrange(7))
+            end = start + timedelta(minutes=rnd.choice([30, 45, 60, 90]))
+            grid.add_slot(pk, trainer_id, hall_id, start, end)
+            spans[pk] = (trainer_id, hall_id, start, end)
+        for pk in range(1, 300, 7):
+            grid.remove_slot(pk)
+            del spans[pk]
+
+        specs = dict(trainers)
+        for spec, hall_id, t0, t1 in (("yoga", None, time(9), time(12)), (None, 2, time(18), time(22)),
+                                      ("dance", 1, None, None)):
+            found = grid.search(specialization=spec, hall_id=hall_id, time_from=t0, time_to=t1)
+            expected = [
+                pk for pk, (tr, h, start, end) in sorted(spans.items(), key=lambda kv: kv[1][2])
+                if (not spec or specs[tr] == spec) and (hall_id is None or h == hall_id)
+                and (not t0 or timezone.localtime(start).time() >= t0)
+                and (not t1 or timezone.localtime(end).time() <= t1)
+            ]
+            self.assertEqual(sorted(found), sorted(expected))
+
+    def test_search_by_specialization_and_time(self):
+        morning = self._slot(self.yoga, self.hall, 8)
+        evening = self._slot(self.yoga, self.hall2, 19)
+        self._slot(self.personal, self.hall, 9)
+
+        found = availability.search(specialization="yoga", time_from=time(7), time_to=time(12))
+        self.assertEqual(found, [morning.pk])
+        self.assertEqual(availability.search(specialization="yoga", hall_id=self.hall2.pk), [evening.pk])
+
+    def test_booking_updates_grid_incrementally(self):
+        slot = self._slot(self.personal, self.hall, 10)
+        self.assertEqual(availability.search(specialization="personal"), [slot.pk])
+        grid = availability._grid
+
+        self.assertEqual(booking.book_slot(slot, self.client_profile), booking.BOOKED)
+        self.assertEqual(availability.search(specialization="personal"), [])
+        self.assertTrue(booking.unbook_slot(slot, self.client_profile))
+        self.assertEqual(availability.search(specialization="personal"), [slot.pk])
+        moved = self._slot(self.personal, self.hall, 14, days=1)
+        self.assertEqual(availability.search(specialization="personal"), [slot.pk, moved.pk])
+        self.assertIs(availability._grid, grid)
+
+    def test_search_view(self):
+        slot = self._slot(self.yoga, self.hall, 11)
+        self.client.force_login(self.client_profile.user)
+        resp = self.client.get(reverse("slot_search"), {"specialization": "yoga", "time_from": "10:00"})
+        self.assertContains(resp, reverse("slot_book", args=[slot.pk]))
+
+
+class HallOccupancyTests(TestCase):
+    """Щоденні підсумки завантаженості, теплова карта і прогноз."""
+    def setUp(self):
+        self.trainer = prepare_trainer(Profile.objects.get(user=User.objects.create_user(username="tr_occ")), idx=99)
+        self.hall = GymHall.objects.create(name="Аналітика", capacity=4)
+        self.day = timezone.localdate() - timedelta(days=2)
+        tz = timezone.get_current_timezone()
+        at = lambda h, m=0: timezone.make_aware(datetime.combine(self.day, time(h, m)), tz)
+
+        gc = GroupClass.objects.create(title="Денна", hall=self.hall, trainer=self.trainer,
+                                       start_time=at(10), end_time=at(11, 30), max_slots=4)
+        for name in ("cl_occ1", "cl_occ2"):
+            GroupEnrollment.objects.create(group_class=gc, client=Profile.objects.get(user=User.objects.create_user(username=name)))
+        slot = IndividualSlot.objects.create(hall=self.hall, trainer=self.trainer, start_time=at(12), end_time=at(12, 30))
+        IndividualBooking.objects.create(slot=slot, client=Profile.objects.get(user=User.objects.create_user(username="cl_occ3")))
+
+    def test_hourly_minutes(self):
+        import numpy as np
+        minutes = analytics.hourly_minutes(np.array([600, 590]), np.array([690, 605]))
+        self.assertEqual(minutes[0, 10], 60)
+        self.assertEqual(minutes[0, 11], 30)
+        self.assertEqual((minutes[1, 9], minutes[1, 10]), (10, 5))
+
+    def test_rollup_day(self):
+        analytics.rollup_day(self.day)
+        row = HallDailyRollup.objects.get(hall=self.hall, day=self.day)
+        self.assertEqual(row.capacity, 4)
+        self.assertEqual((row.person_minutes[10], row.person_minutes[11], row.person_minutes[12]), (120, 60, 30))
+
+    def test_command_is_incremental(self):
+        out = StringIO()
+        call_command("rollup_hall_usage", stdout=out)
+        self.assertIn(f"Днів підсумовано: {analytics.BACKFILL_DAYS}", out.getvalue())
+        self.assertIsNone(analytics.pending_range())
+
+        out = StringIO()
+        call_command("rollup_hall_usage", stdout=out)
+        self.assertIn("Підсумки актуальні", out.getvalue())
+
+    def test_heatmap_and_forecast(self):
+        analytics.rollup_range(self.day - timedelta(days=7), self.day)
+        halls, usage = analytics.weekly_usage(weeks=2)
+        self.assertEqual(usage.shape, (2, 1, analytics.HOURS_OF_WEEK))
+        hour = self.day.weekday() * analytics.HOURS + 10
+        # два тижні: 0.5 місткості і порожня година тиждень тому
+        self.assertAlmostEqual(analytics.heatmap(usage)[0, hour], 0.25)
+        self.assertAlmostEqual(analytics.forecast(usage)[0, hour], 0.5 / 1.5)
+
+        manager = User.objects.create_user(username="mgr_occ")
+        manager.profile.role = Profile.Role.MANAGER
+        manager.profile.save()
+        self.client.force_login(manager)
+        resp = self.client.get(reverse("hall_occupancy"))
+        self.assertContains(resp, "Прогноз на наступний тиждень")
+
+
+class WaitlistTests(TestCase):
+    """Черга FIFO на заповнене заняття з автоматичним записом."""
+    def setUp(self):
+        self.trainer = prepare_trainer(Profile.objects.get(user=User.objects.create_user(username="tr_wl")), idx=100)
+        self.hall = GymHall.objects.create(name="Черга", capacity=10)
+        start = timezone.now() + timedelta(days=1)
+        self.gc = GroupClass.objects.create(title="Сайкл", hall=self.hall, trainer=self.trainer,
+                                            start_time=start, end_time=start + timedelta(hours=1), max_slots=1)
+        self.c1, self.c2, self.c3 = (
+            Profile.objects.get(user=User.objects.create_user(username=f"cl_wl{i}")) for i in range(3)
+        )
+
+    def test_fifo_promotion_on_unenroll(self):
+        self.assertEqual(booking.enroll(self.gc, self.c1), booking.ENROLLED)
+        self.assertEqual(booking.enroll(self.gc, self.c2), booking.CLASS_FULL)
+        self.assertEqual(booking.join_waitlist(self.gc, self.c2), booking.WAITLISTED)
+        self.assertEqual(booking.join_waitlist(self.gc, self.c3), booking.WAITLISTED)
+        self.assertEqual(booking.join_waitlist(self.gc, self.c3), booking.ALREADY_WAITLISTED)
+        self.assertEqual(booking.waitlist_positions(self.c3), {self.gc.pk: 2})
+
+        self.assertTrue(booking.unenroll(self.gc, self.c1))
+        self.gc.refresh_from_db()
+        self.assertEqual(self.gc.enrolled_count, 1)
+        self.assertTrue(GroupEnrollment.objects.filter(group_class=self.gc, client=self.c2).exists())
+        self.assertEqual(booking.waitlist_position(self.gc.pk, self.c3), 1)
+        self.assertIsNone(booking.waitlist_position(self.gc.pk, self.c2))
+
+    def test_join_with_free_seat_enrolls(self):
+        self.assertEqual(booking.join_waitlist(self.gc, self.c1), booking.ENROLLED)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_conflicting_client_is_skipped(self):
+        booking.enroll(self.gc, self.c1)
+        booking.join_waitlist(self.gc, self.c2)
+        booking.join_waitlist(self.gc, self.c3)
+        other = GroupClass.objects.create(title="Інше", hall=GymHall.objects.create(name="Інший зал", capacity=5),
+                                          trainer=self.trainer, start_time=self.gc.start_time,
+                                          end_time=self.gc.end_time, max_slots=5)
+        GroupEnrollment.objects.create(group_class=other, client=self.c2)
+
+        self.assertEqual(booking.promote_waitlist(self.gc.pk), [])
+        booking.unenroll(self.gc, self.c1)
+        self.assertEqual(list(GroupEnrollment.objects.filter(group_class=self.gc).values_list("client_id", flat=True)),
+                         [self.c3.pk])
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_seat_freed_outside_unenroll_goes_to_queue(self):
+        booking.enroll(self.gc, self.c1)
+        booking.join_waitlist(self.gc, self.c2)
+        # видалення запису в адмінці чи каскадом
+        GroupEnrollment.objects.get(client=self.c1).delete()
+        self.assertEqual(list(GroupEnrollment.objects.values_list("client_id", flat=True)), [self.c2.pk])
+        self.assertEqual(booking.enroll(self.gc, self.c3), booking.CLASS_FULL)
+
+    def test_raised_capacity_promotes_queue(self):
+        booking.enroll(self.gc, self.c1)
+        booking.join_waitlist(self.gc, self.c2)
+        booking.join_waitlist(self.gc, self.c3)
+        gc = GroupClass.objects.get(pk=self.gc.pk)
+        gc.max_slots = 2
+        gc.save()
+        self.assertEqual(sorted(GroupEnrollment.objects.values_list("client_id", flat=True)), [self.c1.pk, self.c2.pk])
+        self.assertEqual(booking.waitlist_position(self.gc.pk, self.c3), 1)
+
+    def test_deleting_class_with_queue(self):
+        booking.enroll(self.gc, self.c1)
+        booking.join_waitlist(self.gc, self.c2)
+        self.gc.delete()
+        self.assertFalse(GroupEnrollment.objects.exists() or WaitlistEntry.objects.exists())
+
+    def test_status_endpoint(self):
+        booking.enroll(self.gc, self.c1)
+        booking.join_waitlist(self.gc, self.c2)
+        self.client.force_login(self.c2.user)
+        data = self.client.get(reverse("group_waitlist_status", args=[self.gc.pk])).json()
+        self.assertEqual(data, {"position": 1, "waiting": 1, "enrolled": False})
+        resp = self.client.get(reverse("schedule_overview"))
+        self.assertContains(resp, "У черзі: №1")
+
+
+class ScheduleStreamTests(TestCase):
+    """SSE-потік змін місць і бронювань на шині подій процесу."""
+    def setUp(self):
+        trainer = prepare_trainer(Profile.objects.get(user=User.objects.create_user(username="tr_sse")), idx=101)
+        self.hall = GymHall.objects.create(name="Потік", capacity=10)
+        start = timezone.now() + timedelta(days=1)
+        self.gc = GroupClass.objects.create(title="Бокс", hall=self.hall, trainer=trainer,
+                                            start_time=start, end_time=start + timedelta(hours=1), max_slots=5)
+        self.slot = IndividualSlot.objects.create(hall=self.hall, trainer=trainer, start_time=start + timedelta(hours=2),
+                                                  end_time=start + timedelta(hours=3))
+        self.far = GroupClass.objects.create(title="Далеко", hall=self.hall, trainer=trainer, max_slots=5,
+                                             start_time=start + timedelta(days=30),
+                                             end_time=start + timedelta(days=30, hours=1))
+        self.profile = Profile.objects.get(user=User.objects.create_user(username="cl_sse"))
+        self.client.force_login(self.profile.user)
+
+    def _scope(self, cookie=True, query=b""):
+        headers = []
+        if cookie:
+            session_cookie = self.client.cookies["sessionid"]
+            headers.append((b"cookie", f"sessionid={session_cookie.value}".encode()))
+        return {"type": "http", "method": "GET", "path": STREAM_PATH, "query_string": query, "headers": headers}
+
+    def _run(self, scope, actions, until):
+        """Запускає потік, виконує actions у синхронному коді й чекає, поки тіло містить until."""
+        sent = []
+        inbox = asyncio.Queue()
+
+        async def receive():
+            return await inbox.get()
+
+        async def send(message):
+            sent.append(message)
+
+        def body():
+            return b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+
+        async def scenario():
+            task = asyncio.ensure_future(stream_app(scope, receive, send))
+            for _ in range(200):
+                if sent or task.done():
+                    break
+                await asyncio.sleep(0.01)
+            await sync_to_async(actions)()
+            for _ in range(200):
+                if until in body() or task.done():
+                    break
+                await asyncio.sleep(0.01)
+            await inbox.put({"type": "http.disconnect"})
+            await asyncio.wait_for(task, 5)
+
+        async_to_sync(scenario)()
+        return sent, body()
+
+    def test_bus_delivers_to_subscriber_across_threads(self):
+        async def scenario():
+            subscription = events.bus.subscribe()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, events.bus.publish, {"type": "ping"})
+                return await asyncio.wait_for(subscription.queue.get(), 2)
+            finally:
+                subscription.close()
+
+        event = async_to_sync(scenario)()
+        self.assertEqual(event["type"], "ping")
+        self.assertEqual(events.bus.since(event["seq"] - 1)[-1], event)
+
+    def test_stream_sends_seat_and_slot_deltas_in_window(self):
+        def actions():
+            booking.enroll(self.far, self.profile)
+            booking.enroll(self.gc, self.profile)
+            booking.book_slot(self.slot, self.profile)
+
+        sent, body = self._run(self._scope(), actions, until=b"event: slot")
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream; charset=utf-8"), sent[0]["headers"])
+        self.assertIn(f'event: group\ndata: {{"id": {self.gc.pk}, "enrolled_count": 1, "max_slots": 5}}'.encode(), body)
+        self.assertIn(f'event: slot\ndata: {{"id": {self.slot.pk}, "is_booked": true}}'.encode(), body)
+        self.assertNotIn(f'"id": {self.far.pk},'.encode(), body)
+        self.assertFalse(events.bus.has_subscribers())
+
+    def test_stream_requires_session(self):
+        sent, _ = self._run(self._scope(cookie=False), lambda: None, until=b"")
+        self.assertEqual(sent[0]["status"], 401)
+
+
+class AsyncViewsTests(TransactionTestCase):
+    """Async-версії сторінок: той самий вміст і валідатори, що й у синхронних view."""
+    def setUp(self):
+        trainer = prepare_trainer(Profile.objects.get(user=User.objects.create_user(username="tr_async")), idx=102)
+        self.hall = GymHall.objects.create(name="Асинхронний", capacity=10)
+        start = timezone.now() + timedelta(days=1)
+        self.gc = GroupClass.objects.create(title="Кросфіт", hall=self.hall, trainer=trainer,
+                                            start_time=start, end_time=start + timedelta(hours=1), max_slots=5)
+        self.user = User.objects.create_user(username="cl_async")
+        booking.enroll(self.gc, Profile.objects.get(user=self.user))
+        Tariff.objects.create(name="Місячний", duration_label="1 місяць", price_uah=900)
+
+    def _request(self, path, user=None, **extra):
+        request = RequestFactory().get(path, **extra)
+        SessionMiddleware(lambda r: None).process_request(request)
+        request.user = user or AnonymousUser()
+        request._messages = FallbackStorage(request)
+        return request
+
+    def test_price_matches_sync_view_and_honours_etag(self):
+        sync_resp = views.price_view(self._request("/price/"))
+        resp = async_to_sync(async_views.price_view)(self._request("/price/"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content, sync_resp.content)
+        self.assertEqual(resp["ETag"], sync_resp["ETag"])
+        self.assertContains(resp, "Місячний")
+
+        resp = async_to_sync(async_views.price_view)(self._request("/price/", HTTP_IF_NONE_MATCH=resp["ETag"]))
+        self.assertEqual(resp.status_code, 304)
+
+    def test_schedule_gathers_rows_and_client_entries(self):
+        resp = async_to_sync(async_views.schedule_overview)(self._request("/schedule/", self.user))
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Кросфіт")
+        self.assertContains(resp, reverse("group_unenroll", args=[self.gc.pk]))
+        self.assertEqual(resp["ETag"], views.schedule_overview(self._request("/schedule/", self.user))["ETag"])
+
+    def test_login_required_redirects_anonymous(self):
+        for view in (async_views.schedule_overview, async_views.halls_list):
+            resp = async_to_sync(view)(self._request("/halls/"))
+            self.assertEqual(resp.status_code, 302)
+            self.assertIn("next=/halls/", resp["Location"])
+
+
+class SessionWritesTests(TestCase):
+    """Повідомлення в куці: запис на заняття з редиректом не пише в таблицю сесій."""
+    def setUp(self):
+        trainer = prepare_trainer(Profile.objects.get(user=User.objects.create_user(username="tr_sess")), idx=103)
+        hall = GymHall.objects.create(name="Сесії", capacity=10)
+        start = timezone.now() + timedelta(days=1)
+        self.gc = GroupClass.objects.create(title="Пілатес", hall=hall, trainer=trainer,
+                                            start_time=start, end_time=start + timedelta(hours=1), max_slots=5)
+        self.client.force_login(User.objects.create_user(username="cl_sess"))
+        self.client.get(reverse("schedule_overview"))
+
+    def test_enroll_and_redirect_make_no_session_writes(self):
+        with CaptureQueriesContext(connections["default"]) as ctx:
+            resp = self.client.post(reverse("group_enroll", args=[self.gc.pk]), follow=True)
+        self.assertContains(resp, "Запис виконано")
+        writes = [q["sql"] for q in ctx.captured_queries
+                  if "django_session" in q["sql"] and not q["sql"].lstrip().upper().startswith("SELECT")]
+        self.assertEqual(writes, [])
+
+
+class SeedGymTests(TestCase):
+    SIZES = ["--clients", "40", "--trainers", "4", "--halls", "3", "--days", "4", "--start", "2026-03-02"]
+
+    def _fingerprint(self):
+        people = list(Profile.objects.filter(username__startswith="seed_").order_by("username").values_list(
+            "username", "first_name", "last_name", "role", "phone"))
+        classes = list(GroupClass.objects.filter(hall__name__startswith="Seed ").order_by("start_time", "hall__name").values_list(
+            "hall__name", "start_time", "title", "trainer__username", "max_slots", "enrolled_count"))
+        enrollments = sorted(GroupEnrollment.objects.values_list(
+            "group_class__hall__name", "group_class__start_time", "client__username"))
+        bookings = sorted(IndividualBooking.objects.values_list("slot__trainer__username", "slot__start_time", "client__username"))
+        return people, classes, enrollments, bookings
+
+    def test_same_seed_gives_same_dataset_with_consistent_derived_data(self):
+        out = StringIO()
+        call_command("seed_gym", *self.SIZES, stdout=out)
+        self.assertIn("рядків/с", out.getvalue())
+        first = self._fingerprint()
+        self.assertEqual(len(first[0]), 40 + 4 + 1)
+        self.assertTrue(first[2] and first[3])
+
+        for gc in GroupClass.objects.all():
+            self.assertEqual(gc.enrolled_count, gc.enrollments.count())
+            self.assertLessEqual(gc.enrolled_count, gc.max_slots)
+        self.assertEqual(IndividualSlot.objects.filter(is_booked=True).count(), IndividualBooking.objects.count())
+        # клієнт не записаний на два заняття одночасно
+        times = GroupEnrollment.objects.values_list("client_id", "group_class__start_time")
+        self.assertEqual(len(set(times)), len(times))
+        self.assertEqual(ScheduleDay.objects.filter(day__gte=datetime(2026, 3, 2).date()).count(), 3 * 4)
+
+        client = Profile.objects.filter(role=Profile.Role.CLIENT).order_by("username").first()
+        self.assertIn(client.pk, search.search(Profile.Role.CLIENT, client.last_name))
+        self.assertTrue(Client().login(username="seed_manager", password="seedpass"))
+
+        with self.assertRaises(CommandError):
+            call_command("seed_gym", *self.SIZES, stdout=StringIO())
+        call_command("seed_gym", *self.SIZES, "--reset", stdout=StringIO())
+        self.assertEqual(self._fingerprint(), first)
+
+        call_command("seed_gym", *self.SIZES, "--reset", "--seed", "7", stdout=StringIO())
+        self.assertNotEqual(self._fingerprint()[1], first[1])
+
+    def test_dataset_does_not_depend_on_time_of_day(self):
+        today = timezone.localdate()
+        sizes = self.SIZES[:-2] + ["--start", today.isoformat()]
+        fingerprints = []
+        for hour, minute in ((0, 5), (23, 55)):
+            moment = timezone.make_aware(datetime.combine(today, time(hour, minute)), timezone.get_current_timezone())
+            with patch("django.utils.timezone.now", return_value=moment):
+                call_command("seed_gym", *sizes, "--reset", stdout=StringIO())
+            fingerprints.append(self._fingerprint())
+        self.assertEqual(fingerprints[0], fingerprints[1])
+
+    def test_halls_are_never_double_booked(self):
+        # тренерів більше, ніж залів, — на кожну годину слотів конкурують за зали
+        call_command("seed_gym", "--clients", "20", "--trainers", "8", "--halls", "2", "--days", "3",
+                     "--start", "2026-03-02", stdout=StringIO())
+        busy = sorted(
+            [*GroupClass.objects.values_list("hall_id", "start_time", "end_time"),
+             *IndividualSlot.objects.values_list("hall_id", "start_time", "end_time")]
+        )
+        self.assertTrue(IndividualSlot.objects.exists())
+        for (hall_a, _, end_a), (hall_b, start_b, _) in zip(busy, busy[1:]):
+            if hall_a == hall_b:
+                self.assertLessEqual(end_a, start_b)
+
+    def test_reset_keeps_other_data(self):
+        hall = GymHall.objects.create(name="Основний", capacity=10)
+        call_command("seed_gym", *self.SIZES, stdout=StringIO())
+        seed.clear()
+        self.assertEqual(list(GymHall.objects.values_list("name", flat=True)), ["Основний"])
+        self.assertFalse(User.objects.filter(username__startswith="seed_").exists())
+        self.assertFalse(GroupEnrollment.objects.exists() or IndividualSlot.objects.exists())
+        self.assertEqual(hall.pk, GymHall.objects.get().pk)
+
+    def test_create_demo_users(self):
+        call_command("create_demo_users", stdout=StringIO())
+        trainer = Profile.objects.get(user__username="trainer")
+        self.assertEqual((trainer.role, trainer.first_name, trainer.email), (Profile.Role.TRAINER, "Олег", "trainer@example.com"))
+        self.assertTrue(trainer.status)
+
+
 class SmokePagesTests(TestCase):
     def setUp(self):
         self.client = Client()
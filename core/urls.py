@@ -1,22 +1,33 @@
+from django.conf import settings
 from django.urls import path
 from .views import (home,
 
-    halls_list, hall_create, hall_edit, hall_delete,
+    halls_list, hall_create, hall_occupancy, hall_edit, hall_delete,
     group_create, group_edit, group_delete, group_enroll, group_unenroll,
-    trainer_slots, slot_book, slot_edit, slot_delete, slot_unbook, schedule_overview,
+    group_waitlist_join, group_waitlist_leave, group_waitlist_status,
+    series_create, series_edit, series_delete, series_enroll,
+    trainer_slots, slot_generate, slot_book, slot_edit, slot_delete, slot_unbook, schedule_overview, schedule_cache_stats, slot_search,
 
     about_view, siteinfo_edit,
 
     price_view, price_add, price_edit, price_delete,
 )
+from .api import schedule_api
+
+if settings.ASYNC_VIEWS:
+    from .async_views import about_view, halls_list, price_view, schedule_overview  # noqa: F811
 
 urlpatterns = [
     path("", home, name="home"),
 
     path("schedule/", schedule_overview, name="schedule_overview"),
+    path("api/schedule/", schedule_api, name="schedule_api"),
+    path("schedule/cache-stats/", schedule_cache_stats, name="schedule_cache_stats"),
+    path("schedule/slots/search/", slot_search, name="slot_search"),
 
     path("halls/", halls_list, name="halls_list"),
     path("halls/new/", hall_create, name="hall_create"),
+    path("halls/occupancy/", hall_occupancy, name="hall_occupancy"),
     path("halls/<int:pk>/edit/", hall_edit, name="hall_edit"),
     path("halls/<int:pk>/delete/", hall_delete, name="hall_delete"),
 
@@ -25,8 +36,17 @@ urlpatterns = [
     path("schedule/groups/<int:pk>/delete/", group_delete, name="group_delete"),
     path("schedule/groups/<int:pk>/enroll/", group_enroll, name="group_enroll"),
     path("schedule/groups/<int:pk>/unenroll/", group_unenroll, name="group_unenroll"),
+    path("schedule/groups/<int:pk>/waitlist/", group_waitlist_status, name="group_waitlist_status"),
+    path("schedule/groups/<int:pk>/waitlist/join/", group_waitlist_join, name="group_waitlist_join"),
+    path("schedule/groups/<int:pk>/waitlist/leave/", group_waitlist_leave, name="group_waitlist_leave"),
+
+    path("schedule/series/new/", series_create, name="series_create"),
+    path("schedule/series/<int:pk>/edit/", series_edit, name="series_edit"),
+    path("schedule/series/<int:pk>/delete/", series_delete, name="series_delete"),
+    path("schedule/series/<int:pk>/<str:day>/enroll/", series_enroll, name="series_enroll"),
 
     path("trainer/slots/", trainer_slots, name="trainer_slots"),
+    path("trainer/slots/generate/", slot_generate, name="slot_generate"),
     path("slots/<int:pk>/book/", slot_book, name="slot_book"),
     path("slots/<int:pk>/unbook/", slot_unbook, name="slot_unbook"),
     path("slots/<int:pk>/edit/", slot_edit, name="slot_edit"),
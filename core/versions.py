@@ -0,0 +1,184 @@
+# core/versions.py
+"""
+Версії моделей і умовні GET-запити (ETag / Last-Modified).
+
+Кожне збереження чи видалення відстежуваної моделі збільшує її лічильник
+у ModelVersion (див. core/signals.py). Валідатори сторінки будуються лише
+з цих лічильників, тож повторний візит без змін отримує 304 одним
+запитом до ModelVersion — без читання розкладу, тарифів чи залів.
+"""
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from accounts.claims import get_claims
+from accounts.models import Profile
+
+from .models import (
+    GymHall, GroupClass, GroupClassSeries, GroupEnrollment,
+    IndividualSlot, IndividualBooking, ModelVersion, SiteInfo, Tariff, WaitlistEntry,
+)
+from .mongo import is_mongo, collection
+
+TRACKED_MODELS = (
+    Tariff, SiteInfo, GymHall, GroupClass, GroupClassSeries, GroupEnrollment,
+    IndividualSlot, IndividualBooking, WaitlistEntry, Profile,
+)
+
+# сторінка -> моделі, від яких залежить її вміст
+PAGE_MODELS = {
+    "price": (Tariff,),
+    "about": (SiteInfo,),
+    "halls": (GymHall,),
+    "schedule": (
+        GymHall, GroupClass, GroupClassSeries, GroupEnrollment,
+        IndividualSlot, IndividualBooking, WaitlistEntry, Profile,
+    ),
+}
+
+
+def label_for(model) -> str:
+    return model._meta.label_lower
+
+
+def bump(model) -> None:
+    """Атомарно збільшує версію моделі (створює лічильник за потреби)."""
+    bump_label(label_for(model))
+
+
+def bump_label(label: str) -> None:
+    """Те саме для довільного лічильника (напр., зайнятість тренера в core/intervals.py)."""
+    now = timezone.now()
+    if is_mongo():
+        # djongo не транслює UPDATE з F() — нативний $inc
+        updated = collection(ModelVersion).update_one(
+            {"label": label},
+            {"$inc": {"version": 1}, "$set": {"changed_at": timezone.make_naive(now, timezone.utc)}},
+        ).matched_count
+    else:
+        updated = ModelVersion.objects.filter(label=label).update(version=F("version") + 1, changed_at=now)
+    if updated:
+        return
+    try:
+        ModelVersion.objects.create(label=label, version=1)
+    except IntegrityError:
+        # лічильник щойно створив паралельний запит
+        bump_label(label)
+
+
+def current(models):
+    """(версії у порядку models, час останньої зміни або None) — один запит."""
+    labels = [label_for(m) for m in models]
+    rows = {
+        label: (version, changed_at)
+        for label, version, changed_at in
+        ModelVersion.objects.filter(label__in=labels).values_list("label", "version", "changed_at")
+    }
+    versions = tuple(rows.get(label, (0, None))[0] for label in labels)
+    stamps = [changed_at for _, changed_at in rows.values() if changed_at]
+    return versions, max(stamps) if stamps else None
+
+
+def label_versions(labels) -> dict:
+    """{label: версія} для довільних лічильників одним запитом; відсутні — 0."""
+    labels = list(labels)
+    found = dict(ModelVersion.objects.filter(label__in=labels).values_list("label", "version"))
+    return {label: found.get(label, 0) for label in labels}
+
+
+def _has_pending_messages(request) -> bool:
+    # Повідомлення показуються у base.html один раз — таку відповідь не можна замінювати на 304.
+    return len(get_messages(request)) > 0
+
+
+def _request_versions(request, page):
+    cache = request.__dict__.setdefault("_model_versions", {})
+    if page not in cache:
+        cache[page] = current(PAGE_MODELS[page])
+    return cache[page]
+
+
+def page_etag(request, page: str, per_hour: bool = False):
+    """
+    ETag сторінки page з версій її моделей; також враховує користувача,
+    його роль і рядок запиту. per_hour=True додає поточну годину
+    (для сторінок, де вміст залежить від «зараз»).
+    """
+    if _has_pending_messages(request):
+        return None
+    versions, _ = _request_versions(request, page)
+    claims = get_claims(request)
+    parts = [page, str(claims.user_id or 0), claims.role or "", request.GET.urlencode(), *map(str, versions)]
+    if per_hour:
+        parts.append(timezone.localtime().strftime("%Y-%m-%d %H"))
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def page_last_modified(request, page: str):
+    if _has_pending_messages(request):
+        return None
+    return _request_versions(request, page)[1]
+
+
+def conditional_page(page: str, per_hour: bool = False):
+    """Декоратор view: ETag і Last-Modified з версій моделей сторінки page."""
+    def etag_func(request, *args, **kwargs):
+        return page_etag(request, page, per_hour)
+
+    def last_modified_func(request, *args, **kwargs):
+        return page_last_modified(request, page)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # браузер зберігає сторінку, але щоразу перевіряє її валідатором
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def async_conditional_page(page: str, per_hour: bool = False):
+    """
+    conditional_page для async view: валідатори обчислюються в потоці
+    (сесія, повідомлення і версії читаються з бази), а 304 повертається
+    без виклику view.
+    """
+    def validators(request):
+        if request.method not in ("GET", "HEAD"):
+            return None, None
+        etag = page_etag(request, page, per_hour)
+        last_modified = page_last_modified(request, page)
+        return (
+            quote_etag(etag) if etag is not None else None,
+            timegm(last_modified.utctimetuple()) if last_modified else None,
+        )
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            etag, last_modified = await sync_to_async(validators)(request)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                if last_modified and not response.has_header("Last-Modified"):
+                    response["Last-Modified"] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault("ETag", etag)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
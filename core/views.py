@@ -1,25 +1,35 @@
 # core/views.py
-from datetime import timedelta, datetime, time
 from collections import defaultdict
+from datetime import date
 
 from django.utils import timezone
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
-from django.db.models import Q
+from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET
 
+from accounts.claims import get_claims
 from accounts.models import Profile
 from .models import (
     GymHall,
     GroupClass,
+    GroupClassSeries,
     GroupEnrollment,
     IndividualSlot,
-    IndividualBooking,
     SiteInfo,
     Tariff,
+    WaitlistEntry,
 )
-from .forms import GymHallForm, GroupClassForm, IndividualSlotForm, SiteInfoForm, TariffForm
+from .forms import (
+    GymHallForm, GroupClassForm, GroupClassSeriesForm,
+    IndividualSlotForm, SiteInfoForm, SlotGeneratorForm, SlotSearchForm, TariffForm,
+)
+from . import analytics, availability, booking, fragments, schedule, series
+from .sse import STREAM_PATH
+from .slot_generator import SlotOverlapError, generate_slots
+from .versions import conditional_page
 
 
 def home(request):
@@ -28,6 +38,7 @@ def home(request):
 
 
 @login_required
+@conditional_page("halls")
 def halls_list(request):
     halls = GymHall.objects.all()
     return render(request, "halls/list.html", {"halls": halls})
@@ -80,6 +91,67 @@ def hall_delete(request, pk):
     return render(request, "halls/confirm_delete.html", {"hall": hall})
 
 
+OCCUPANCY_WEEKS = (4, 8, 12)
+
+
+def _occupancy_rows(values, hours):
+    """Рядки таблиці «день тижня × година» з вектора 168 годин тижня."""
+    rows = []
+    for weekday, label in GroupClassSeries.Weekday.choices:
+        cells = []
+        for hour in hours:
+            value = values[weekday * analytics.HOURS + hour]
+            if value != value:  # NaN — немає даних
+                cells.append(None)
+            else:
+                cells.append({"pct": round(value * 100), "alpha": round(min(value, 1.0), 2)})
+        rows.append((label, cells))
+    return rows
+
+
+@login_required
+def hall_occupancy(request):
+    """Теплова карта завантаженості залів і прогноз на наступний тиждень (менеджер)."""
+    if request.user.profile.role != Profile.Role.MANAGER:
+        messages.error(request, "Недостатньо прав")
+        return redirect("halls_list")
+
+    weeks = request.GET.get("weeks", "")
+    weeks = int(weeks) if weeks.isdigit() and int(weeks) in OCCUPANCY_WEEKS else analytics.HISTORY_WEEKS
+
+    halls, usage = analytics.weekly_usage(weeks)
+    heat = analytics.heatmap(usage)
+    predicted = analytics.forecast(usage)
+
+    selected = next((i for i, (pk, _, _) in enumerate(halls) if str(pk) == request.GET.get("hall")), 0)
+    busy_hours = [
+        h for h in range(analytics.HOURS)
+        if (heat[:, h::analytics.HOURS] > 0).any() or (predicted[:, h::analytics.HOURS] > 0).any()
+    ]
+    hours = range(busy_hours[0], busy_hours[-1] + 1) if busy_hours else range(8, 22)
+
+    weekdays = dict(GroupClassSeries.Weekday.choices)
+    over, under = (
+        [(name, weekdays[day], hour, round(value * 100)) for name, day, hour, value in found]
+        for found in analytics.extremes(heat, halls)
+    )
+
+    context = {
+        "halls": halls,
+        "selected": halls[selected] if halls else None,
+        "hours": hours,
+        "weeks": weeks,
+        "weeks_choices": OCCUPANCY_WEEKS,
+        "last_day": analytics.last_rollup_day(),
+        "over": over,
+        "under": under,
+    }
+    if halls:
+        context["heat_rows"] = _occupancy_rows(heat[selected], hours)
+        context["forecast_rows"] = _occupancy_rows(predicted[selected], hours)
+    return render(request, "halls/occupancy.html", context)
+
+
 @login_required
 def group_create(request):
     """Створення групового заняття (менеджер)."""
@@ -105,7 +177,8 @@ def group_edit(request, pk):
     gc = get_object_or_404(GroupClass, pk=pk)
     form = GroupClassForm(request.POST or None, instance=gc)
     if request.method == "POST" and form.is_valid():
-        form.save()
+        # enrolled_count змінюють лише атомарні записи (core/booking.py) — не перезаписуємо його прочитаним значенням
+        form.save(commit=False).save(update_fields=GroupClassForm.Meta.fields)
         messages.success(request, "Заняття оновлено")
         return redirect("schedule_overview")
     return render(request, "group/form.html", {"form": form, "title": f"Редагувати: {gc.title}"})
@@ -136,14 +209,86 @@ def group_enroll(request, pk):
         messages.error(request, "Лише клієнти можуть записуватись")
         return redirect("schedule_overview")
 
-    capacity = getattr(gc, "max_slots", None)
-    enrolled = gc.enrollments.count()
-    if capacity is not None and enrolled >= capacity:
-        messages.error(request, "Немає вільних місць")
+    _enroll_feedback(request, booking.enroll(gc, request.user.profile))
+    return redirect("schedule_overview")
+
+
+def _enroll_feedback(request, result):
+    if result == booking.CLASS_FULL:
+        messages.error(request, "Немає вільних місць. Можна стати в чергу — місце дістанеться вам автоматично.")
+    elif result == booking.TIME_CONFLICT:
+        messages.error(request, "У вас уже є запис на цей час.")
+    elif result == booking.ALREADY_ENROLLED:
+        messages.info(request, "Ви вже записані на це заняття.")
+    else:
+        messages.success(request, "Запис виконано")
+
+
+@login_required
+def series_create(request):
+    """Створення серії повторюваних групових занять (менеджер)."""
+    if request.user.profile.role != Profile.Role.MANAGER:
+        messages.error(request, "Недостатньо прав")
+        return redirect("schedule_overview")
+
+    form = GroupClassSeriesForm(request.POST or None)
+    if request.method == "POST" and form.is_valid():
+        form.save()
+        messages.success(request, "Серію занять створено")
+        return redirect("schedule_overview")
+    return render(request, "group/form.html", {"form": form, "title": "Нова серія занять"})
+
+
+@login_required
+def series_edit(request, pk):
+    """Редагування серії. Уже створені заняття серії не змінюються."""
+    if request.user.profile.role != Profile.Role.MANAGER:
+        messages.error(request, "Недостатньо прав")
+        return redirect("schedule_overview")
+
+    obj = get_object_or_404(GroupClassSeries, pk=pk)
+    form = GroupClassSeriesForm(request.POST or None, instance=obj)
+    if request.method == "POST" and form.is_valid():
+        form.save()
+        messages.success(request, "Серію оновлено")
+        return redirect("schedule_overview")
+    return render(request, "group/form.html", {"form": form, "title": f"Серія: {obj.title}"})
+
+
+@login_required
+def series_delete(request, pk):
+    """Видалення серії. Заняття, на які вже є записи, залишаються в розкладі."""
+    if request.user.profile.role != Profile.Role.MANAGER:
+        messages.error(request, "Недостатньо прав")
+        return redirect("schedule_overview")
+
+    obj = get_object_or_404(GroupClassSeries, pk=pk)
+    if request.method == "POST":
+        title = obj.title
+        obj.delete()
+        messages.success(request, f"Серію «{title}» видалено")
+        return redirect("schedule_overview")
+    return render(request, "group/confirm_delete.html", {"obj": obj})
+
+
+@login_required
+def series_enroll(request, pk, day):
+    """Запис на заняття серії: заняття створюється під час першого успішного запису."""
+    if request.user.profile.role != Profile.Role.CLIENT:
+        messages.error(request, "Лише клієнти можуть записуватись")
+        return redirect("schedule_overview")
+    if request.method != "POST":
         return redirect("schedule_overview")
 
-    GroupEnrollment.objects.get_or_create(group_class=gc, client=request.user.profile)
-    messages.success(request, "Запис виконано")
+    obj = get_object_or_404(GroupClassSeries, pk=pk)
+    try:
+        occurrence_day = date.fromisoformat(day)
+    except ValueError:
+        raise Http404("Некоректна дата")
+    if not series.bookable(obj, occurrence_day):
+        raise Http404("У цей день заняття серії немає")
+
+    _enroll_feedback(request, booking.enroll_occurrence(obj, occurrence_day, request.user.profile))
     return redirect("schedule_overview")
 
 
@@ -156,12 +301,7 @@ def group_unenroll(request, pk):
         messages.error(request, "Лише клієнти можуть скасовувати запис.")
         return redirect("schedule_overview")
 
-    enrollment = GroupEnrollment.objects.filter(
-        group_class=gc, client=request.user.profile
-    ).first()
-
-    if enrollment:
-        enrollment.delete()
+    if booking.unenroll(gc, request.user.profile):
         messages.success(request, "Запис скасовано.")
     else:
         messages.info(request, "Ви не були записані на це заняття.")
@@ -169,6 +309,60 @@ def group_unenroll(request, pk):
     return redirect("schedule_overview")
 
 
+@login_required
+def group_waitlist_join(request, pk):
+    """Черга на заповнене групове заняття (клієнт)."""
+    if request.method != "POST":
+        return redirect("schedule_overview")
+    if request.user.profile.role != Profile.Role.CLIENT:
+        messages.error(request, "Лише клієнти можуть ставати в чергу")
+        return redirect("schedule_overview")
+
+    gc = get_object_or_404(GroupClass, pk=pk)
+    result = booking.join_waitlist(gc, request.user.profile)
+    if result == booking.WAITLISTED:
+        position = booking.waitlist_position(gc.pk, request.user.profile)
+        messages.success(request, f"Ви в черзі, номер {position}. Щойно звільниться місце, вас буде записано.")
+    elif result == booking.ALREADY_WAITLISTED:
+        messages.info(request, "Ви вже в черзі на це заняття.")
+    else:
+        _enroll_feedback(request, result)
+    return redirect("schedule_overview")
+
+
+@login_required
+def group_waitlist_leave(request, pk):
+    """Вихід із черги на заняття."""
+    if request.method != "POST":
+        return redirect("schedule_overview")
+
+    gc = get_object_or_404(GroupClass, pk=pk)
+    if booking.leave_waitlist(gc, request.user.profile):
+        messages.success(request, "Ви вийшли з черги.")
+    else:
+        messages.info(request, "Вас не було в черзі на це заняття.")
+    return redirect("schedule_overview")
+
+
+@login_required
+@require_GET
+def group_waitlist_status(request, pk):
+    """
+    Стан черги клієнта у JSON — для опитування зі сторінки розкладу
+    без повторного рендерингу всього розкладу.
+    """
+    profile = request.user.profile
+    position = booking.waitlist_position(pk, profile)
+    enrolled = position is None and GroupEnrollment.objects.filter(group_class_id=pk, client=profile).exists()
+    response = JsonResponse({
+        "position": position,
+        "waiting": WaitlistEntry.objects.filter(group_class_id=pk).count(),
+        "enrolled": enrolled,
+    })
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 @login_required
 def trainer_slots(request):
     role = request.user.profile.role
@@ -179,7 +373,7 @@ def trainer_slots(request):
 
     qs = (
         IndividualSlot.objects
-        .select_related("hall", "trainer", "trainer__user")
+        .select_related("hall", "trainer")
         .order_by("start_time")
     )
     if role == Profile.Role.TRAINER:
@@ -210,8 +404,7 @@ def trainer_slots(request):
         trainers = (
             Profile.objects
             .filter(role=Profile.Role.TRAINER)
-            .select_related("user")
-            .order_by("user__last_name", "user__first_name", "user__username")
+            .order_by("last_name", "first_name", "username")
         )
 
     return render(
@@ -221,6 +414,37 @@ def trainer_slots(request):
     )
 
 
+@login_required
+def slot_generate(request):
+    """Масове створення слотів за правилом (тренер — собі, менеджер — будь-якому тренеру)."""
+    role = request.user.profile.role
+    if role not in [Profile.Role.TRAINER, Profile.Role.MANAGER]:
+        messages.error(request, "Недостатньо прав")
+        return redirect("home")
+
+    form = SlotGeneratorForm(request.POST or None, user=request.user)
+    if request.method == "POST" and form.is_valid():
+        data = form.cleaned_data
+        try:
+            report = generate_slots(
+                form.slot_trainer, data["hall"], data["date_from"], data["date_to"],
+                data["day_start"], data["day_end"], data["slot_minutes"],
+                gap_minutes=data["gap_minutes"], breaks=data["breaks"], weekdays=set(data["weekdays"]),
+            )
+        except SlotOverlapError:
+            form.add_error(None, "Частину цих слотів щойно створено паралельно. Спробуйте ще раз — "
+                                 "наявні слоти буде пропущено.")
+        else:
+            text = f"Створено слотів: {report['created']}; пропущено через накладки: {report['skipped']}."
+            if report["created"]:
+                messages.success(request, text)
+            else:
+                messages.warning(request, text)
+            return redirect("trainer_slots")
+
+    return render(request, "trainer/slot_generate.html", {"form": form})
+
+
 @login_required
 def slot_book(request, pk):
     """Бронювання слоту (клієнт)."""
@@ -229,14 +453,13 @@ def slot_book(request, pk):
         return redirect("schedule_overview")
 
     slot = get_object_or_404(IndividualSlot, pk=pk)
-    if slot.is_booked:
+    result = booking.book_slot(slot, request.user.profile)
+    if result == booking.ALREADY_BOOKED:
         messages.error(request, "Слот уже заброньовано")
-        return redirect("schedule_overview")
-
-    IndividualBooking.objects.create(slot=slot, client=request.user.profile)
-    slot.is_booked = True
-    slot.save()
-    messages.success(request, "Слот заброньовано")
+    elif result == booking.TIME_CONFLICT:
+        messages.error(request, "У вас уже є запис на цей час.")
+    else:
+        messages.success(request, "Слот заброньовано")
     return redirect("schedule_overview")
 
 
@@ -260,7 +483,8 @@ def slot_edit(request, pk):
                     slot.trainer = get_object_or_404(
                         Profile, pk=selected_trainer_id, role=Profile.Role.TRAINER
                     )
-            slot.save()
+            # is_booked змінює лише бронювання (booking.book_slot) — не перезаписуємо його значенням із форми
+            slot.save(update_fields=[*IndividualSlotForm.Meta.fields, "trainer"])
             messages.success(request, "Слот оновлено.")
             return redirect("schedule_overview")
     else:
@@ -271,8 +495,7 @@ def slot_edit(request, pk):
         trainers = (
             Profile.objects
             .filter(role=Profile.Role.TRAINER)
-            .select_related("user")
-            .order_by("user__last_name", "user__first_name", "user__username")
+            .order_by("last_name", "first_name", "username")
         )
 
     return render(
@@ -300,123 +523,45 @@ def slot_delete(request, pk):
     return render(request, "trainer/slot_confirm_delete.html", {"slot": slot})
 
 
-@login_required
-def schedule_overview(request):
-    """
-    Огляд розкладу з фільтрами по залу, тренеру і діапазону дат.
-    Для клієнта показуються його поточні/майбутні записи (групові та індивідуальні).
-    """
+def overview_params(request) -> dict:
+    """Фільтри, вікно і роль глядача для сторінки розкладу (спільне для sync і async view)."""
     hall_id = request.GET.get("hall")
     trainer_id = request.GET.get("trainer")
     date_from_str = request.GET.get("from")
     date_to_str = request.GET.get("to")
 
     now = timezone.now()
-    default_start = now.date()
-    default_end = (now + timedelta(days=14)).date()
+    start, end, start_dt, end_dt = schedule.window_from_params(date_from_str, date_to_str, now)
 
-    dt_fmt = "%Y-%m-%d"
-    start = default_start
-    end = default_end
-    try:
-        if date_from_str:
-            start = datetime.strptime(date_from_str, dt_fmt).date()
-        if date_to_str:
-            end = datetime.strptime(date_to_str, dt_fmt).date()
-    except Exception:
-        start, end = default_start, default_end
-    if end < start:
-        end = start
-
-    tz = timezone.get_current_timezone()
-    start_dt = timezone.make_aware(datetime.combine(start, time.min), tz)
-    end_dt = timezone.make_aware(datetime.combine(end, time.max), tz)
-
-    groups = (
-        GroupClass.objects
-        .select_related("hall", "trainer", "trainer__user")
-        .filter(start_time__gte=start_dt, end_time__lte=end_dt)
-    )
-    slots = (
-        IndividualSlot.objects
-        .select_related("hall", "trainer", "trainer__user")
-        .filter(start_time__gte=start_dt, end_time__lte=end_dt)
-    )
+    role = getattr(getattr(request.user, "profile", None), "role", None)
+    return {
+        "hall_id": hall_id,
+        "trainer_id": trainer_id,
+        "had_filters": any([hall_id, trainer_id, date_from_str, date_to_str]),
+        "now": now,
+        "start": start,
+        "end": end,
+        "start_dt": start_dt,
+        "end_dt": end_dt,
+        "hall_filter": int(hall_id) if hall_id and hall_id.isdigit() else None,
+        "trainer_filter": int(trainer_id) if trainer_id and trainer_id.isdigit() else None,
+        "client": request.user.profile if role == Profile.Role.CLIENT else None,
+        "is_client": role == Profile.Role.CLIENT,
+        "is_trainer": role == Profile.Role.TRAINER,
+        "is_manager": role == Profile.Role.MANAGER or (hasattr(Profile.Role, "HEAD_MANAGER") and role == Profile.Role.HEAD_MANAGER),
+    }
 
-    if hall_id and hall_id.isdigit():
-        groups = groups.filter(hall_id=int(hall_id))
-        slots = slots.filter(hall_id=int(hall_id))
-    if trainer_id and trainer_id.isdigit():
-        groups = groups.filter(trainer_id=int(trainer_id))
-        slots = slots.filter(trainer_id=int(trainer_id))
-
-    halls = GymHall.objects.all().order_by("name")
-    trainers = (
-        Profile.objects
-        .filter(role=Profile.Role.TRAINER)
-        .select_related("user")
-        .order_by("user__last_name", "user__first_name", "user__username")
-    )
 
-    role = getattr(getattr(request.user, "profile", None), "role", None)
-    is_client = role == Profile.Role.CLIENT
-    is_trainer = role == Profile.Role.TRAINER
-    is_manager = role == Profile.Role.MANAGER or (hasattr(Profile.Role, "HEAD_MANAGER") and role == Profile.Role.HEAD_MANAGER)
-
-    enrolled_group_ids = set()
-    my_booked_slot_ids = set()
-    if is_client:
-        enrolled_group_ids = set(
-            GroupEnrollment.objects.filter(client=request.user.profile, group_class__in=groups)
-            .values_list("group_class_id", flat=True)
-        )
-        my_booked_slot_ids = set(
-            IndividualBooking.objects.filter(client=request.user.profile).values_list("slot_id", flat=True)
-        )
+def overview_context(request, params, data) -> dict:
+    groups, slots = data["groups"], data["slots"]
+    waitlist = booking.waitlist_positions(params["client"]) if params["is_client"] else {}
+    if waitlist:
+        # рядки вже збережені в кеші фрагментів — номер у черзі додається лише до копії цього запиту
+        for g in groups:
+            g["waitlist_position"] = waitlist.get(g["id"])
 
-    my_entries = []
-    if is_client:
-        my_group = (
-            GroupEnrollment.objects
-            .select_related("group_class", "group_class__hall", "group_class__trainer", "group_class__trainer__user")
-            .filter(client=request.user.profile, group_class__end_time__gte=now)
-        )
-        for e in my_group:
-            gc = e.group_class
-            trainer_name = _profile_display_name(gc.trainer)
-            my_entries.append({
-                "kind": "group",
-                "title": gc.title,
-                "hall": gc.hall.name if gc.hall_id else "",
-                "trainer": trainer_name,
-                "start": gc.start_time,
-                "end": gc.end_time,
-                "group_id": gc.id,
-            })
-
-        my_slots = (
-            IndividualBooking.objects
-            .select_related("slot", "slot__hall", "slot__trainer", "slot__trainer__user")
-            .filter(client=request.user.profile)
-            .filter(Q(slot__start_time__gte=now) | Q(slot__end_time__gte=now))
-            .order_by("slot__start_time")
-        )
-        for b in my_slots:
-            s = b.slot
-            trainer_name = _profile_display_name(s.trainer)
-            my_entries.append({
-                "kind": "slot",
-                "title": "Індивідуальне тренування",
-                "hall": s.hall.name if s.hall_id else "",
-                "trainer": trainer_name,
-                "start": s.start_time,
-                "end": s.end_time,
-                "slot_id": s.id,
-            })
-        my_entries.sort(key=lambda x: x["start"])
-
-    is_empty = not groups.exists() and not slots.exists()
-    had_filters = any([hall_id, trainer_id, date_from_str, date_to_str])
+    is_empty = not groups and not slots
+    had_filters = params["had_filters"]
     if is_empty:
         if had_filters:
             empty_hint = "Немає занять за вибраними фільтрами. Спробуйте інший зал, тренера або змініть діапазон дат."
@@ -425,27 +570,46 @@ def schedule_overview(request):
     else:
         empty_hint = ""
 
-    context = {
-        "halls": halls,
-        "trainers": trainers,
-        "groups": groups.order_by("start_time"),
-        "slots": slots.order_by("start_time"),
-        "hall_id": hall_id or "",
-        "trainer_id": trainer_id or "",
-        "from": start.strftime(dt_fmt),
-        "to": end.strftime(dt_fmt),
-        "is_client": is_client,
-        "is_trainer": is_trainer,
-        "is_manager": is_manager,
-        "enrolled_group_ids": enrolled_group_ids,
-        "booked_slot_ids": set(IndividualBooking.objects.filter(slot__in=slots).values_list("slot_id", flat=True)),
-        "my_booked_slot_ids": my_booked_slot_ids,
-        "my_entries": my_entries,
+    return {
+        **data,
+        "hall_id": params["hall_id"] or "",
+        "trainer_id": params["trainer_id"] or "",
+        "from": params["start"].strftime(schedule.DATE_FORMAT),
+        "to": params["end"].strftime(schedule.DATE_FORMAT),
+        "is_client": params["is_client"],
+        "is_trainer": params["is_trainer"],
+        "is_manager": params["is_manager"],
+        "booked_slot_ids": {s["id"] for s in slots if s["is_booked"]},
+        "stream_url": f"{STREAM_PATH}?{request.GET.urlencode()}",
         "is_empty": is_empty,
         "had_filters": had_filters,
         "empty_hint": empty_hint,
     }
-    return render(request, "schedule/overview.html", context)
+
+
+@login_required
+@conditional_page("schedule", per_hour=True)
+def schedule_overview(request):
+    """
+    Огляд розкладу з фільтрами по залу, тренеру і діапазону дат.
+    Для клієнта показуються його поточні/майбутні записи (групові та індивідуальні).
+    """
+    params = overview_params(request)
+    rows_key = fragments.rows_key(params["start_dt"], params["end_dt"], params["hall_filter"], params["trainer_filter"])
+    cached_rows = fragments.get_rows(rows_key)
+    data = schedule.load_overview(
+        params["start_dt"],
+        params["end_dt"],
+        hall_id=params["hall_filter"],
+        trainer_id=params["trainer_filter"],
+        client=params["client"],
+        now=params["now"],
+        rows=cached_rows,
+    )
+    if cached_rows is None:
+        fragments.store_rows(rows_key, data["groups"], data["slots"])
+
+    return render(request, "schedule/overview.html", overview_context(request, params, data))
 
 
 @login_required
@@ -456,59 +620,94 @@ def slot_unbook(request, pk):
         return redirect("schedule_overview")
 
     slot = get_object_or_404(IndividualSlot, pk=pk)
-    booking = IndividualBooking.objects.filter(slot=slot, client=request.user.profile).first()
-    if not booking:
-        messages.info(request, "Це бронювання не належить вам або вже скасовано.")
+    if request.method != "POST":
         return redirect("schedule_overview")
 
-    if request.method == "POST":
-        booking.delete()
-        slot.is_booked = False
-        slot.save(update_fields=["is_booked"])
+    if booking.unbook_slot(slot, request.user.profile):
         messages.success(request, "Бронювання слоту скасовано.")
+    else:
+        messages.info(request, "Це бронювання не належить вам або вже скасовано.")
     return redirect("schedule_overview")
 
 
-def _profile_display_name(p: Profile) -> str:
-    """
-    Безпечно повертає ім'я тренера для відображення:
-    спочатку повне ім'я користувача (User.get_full_name), інакше username.
-    """
-    if not p:
-        return ""
-    u = getattr(p, "user", None)
-    if not u:
-        return ""
-    full = (u.get_full_name() or "").strip()
-    return full or u.username
+SLOT_SEARCH_LIMIT = 100
 
 
-def _is_manager(user) -> bool:
-    role = getattr(getattr(user, "profile", None), "role", None)
-    is_head = hasattr(Profile.Role, "HEAD_MANAGER") and role == Profile.Role.HEAD_MANAGER
-    return role == Profile.Role.MANAGER or is_head
+@login_required
+def slot_search(request):
+    """Пошук вільних індивідуальних тренувань за картою доступності."""
+    form = SlotSearchForm(request.GET or None)
+    slots = None
+    if form.is_valid():
+        data = form.cleaned_data
+        hall = data["hall"]
+        ids = availability.search(
+            specialization=data["specialization"] or None,
+            hall_id=hall.pk if hall else None,
+            date_from=data["date_from"], date_to=data["date_to"],
+            time_from=data["time_from"], time_to=data["time_to"],
+            weekdays=set(data["weekdays"]),
+            limit=SLOT_SEARCH_LIMIT,
+        )
+        slots = (
+            IndividualSlot.objects
+            .filter(pk__in=ids, is_booked=False)
+            .select_related("hall", "trainer")
+            .order_by("start_time")
+        )
+
+    return render(request, "schedule/slot_search.html", {
+        "form": form,
+        "slots": slots,
+        "limit": SLOT_SEARCH_LIMIT,
+        "horizon_days": availability.HORIZON_DAYS,
+        "is_client": request.user.profile.role == Profile.Role.CLIENT,
+    })
+
+
+@login_required
+def schedule_cache_stats(request):
+    """Статистика кешу фрагментів розкладу (для менеджера): хіти, промахи, байти."""
+    if not _is_manager(request):
+        return HttpResponseForbidden("Лише для менеджера")
+    return JsonResponse(fragments.stats())
+
+
+def _is_manager(request) -> bool:
+    return get_claims(request).is_manager
 
 
+@conditional_page("about")
 def about_view(request):
     siteinfo = SiteInfo.get_solo()
     return render(request, "about/about.html", {
         "siteinfo": siteinfo,
-        "is_manager": _is_manager(request.user),
+        "is_manager": _is_manager(request),
     })
 
 
+@conditional_page("price")
 def price_view(request):
     """
     Сторінка «Прайс»:
     - Гості/клієнти/тренери бачать активні тарифи по категоріях.
     - Менеджер додатково має кнопки CRUD.
     """
-    is_mgr = _is_manager(request.user)
+    is_mgr = _is_manager(request)
 
-    all_tariffs = list(Tariff.objects.filter(is_active__in=[True]).order_by("sort_order", "name"))
+    return render(request, "price/price.html", {
+        "categories": price_categories(active_tariffs()),
+        "is_manager": is_mgr,
+    })
+
+
+def active_tariffs() -> list:
+    return list(Tariff.objects.filter(is_active__in=[True]).order_by("sort_order", "name"))
 
+
+def price_categories(tariffs) -> list:
     grouped = defaultdict(list)
-    for t in all_tariffs:
+    for t in tariffs:
         grouped[t.category].append(t)
 
     categories = []
@@ -518,16 +717,12 @@ def price_view(request):
             "label": label,
             "items": grouped.get(code, []),
         })
-
-    return render(request, "price/price.html", {
-        "categories": categories,
-        "is_manager": is_mgr,
-    })
+    return categories
 
 
 @login_required
 def price_add(request, category_code: str):
-    if not _is_manager(request.user):
+    if not _is_manager(request):
         return HttpResponseForbidden("Доступ лише для менеджера.")
 
     valid_codes = {c for c, _ in Tariff.Category.choices}
@@ -550,7 +745,7 @@ def price_add(request, category_code: str):
 
 @login_required
 def price_edit(request, pk: int):
-    if not _is_manager(request.user):
+    if not _is_manager(request):
         return HttpResponseForbidden("Доступ лише для менеджера.")
 
     obj = get_object_or_404(Tariff, pk=pk)
@@ -568,7 +763,7 @@ def price_edit(request, pk: int):
 
 @login_required
 def price_delete(request, pk: int):
-    if not _is_manager(request.user):
+    if not _is_manager(request):
         return HttpResponseForbidden("Доступ лише для менеджера.")
 
     obj = get_object_or_404(Tariff, pk=pk)
@@ -583,7 +778,7 @@ def price_delete(request, pk: int):
 
 @login_required
 def siteinfo_edit(request):
-    if not _is_manager(request.user):
+    if not _is_manager(request):
         messages.error(request, "Недостатньо прав.")
         return redirect("about")
 
@@ -3,6 +3,10 @@ ASGI config for sport_gym project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Запити до core.sse.STREAM_PATH обслуговує SSE-потік змін розкладу,
+решту — Django. Події потоку надходять із шини процесу, тому сторінки
+й потік мають обслуговуватись тим самим ASGI-процесом.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +17,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sport_gym.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from core.sse import STREAM_PATH, stream_app  # noqa: E402  (після налаштування Django)
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"] == STREAM_PATH:
+        await stream_app(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,84 @@
+# sport_gym/db/base.py
+"""
+Бекенд БД проєкту: djongo з кешем розбору SQL.
+
+djongo для кожного запиту заново розбирає SQL через sqlparse, хоча Django
+видає той самий текст для однакових запитів — змінюються лише параметри
+(%s → %(n)s). Тому розібране дерево кешується за текстом SQL з
+плейсхолдерами, а значення параметрів підставляють конвертери djongo
+на кожному виконанні.
+"""
+from functools import lru_cache
+from logging import getLogger
+
+from django.conf import settings
+from djongo import base as djongo_base
+from djongo.cursor import Cursor
+from djongo.database import DatabaseError
+from djongo.exceptions import SQLDecodeError, MigrationError
+from djongo.sql2mongo.query import Query
+from sqlparse import parse as sqlparse
+
+logger = getLogger(__name__)
+
+
+@lru_cache(maxsize=getattr(settings, "DJONGO_PARSE_CACHE_SIZE", 512))
+def parse_sql(sql: str):
+    """Розібраний sqlparse-вираз для SQL з плейсхолдерами (дерево лише читається)."""
+    return sqlparse(sql)
+
+
+def parse_cache_info():
+    """Статистика кешу: hits, misses, maxsize, currsize."""
+    return parse_sql.cache_info()
+
+
+class CachedQuery(Query):
+    """Query djongo, що бере розібраний SQL із кешу parse_sql."""
+
+    def parse(self):
+        logger.debug(
+            f'sql_command: {self._sql}\n'
+            f'params: {self._params}'
+        )
+        statement = parse_sql(self._sql)
+
+        if len(statement) > 1:
+            raise SQLDecodeError(self._sql)
+
+        statement = statement[0]
+        sm_type = statement.get_type()
+
+        try:
+            handler = self.FUNC_MAP[sm_type]
+        except KeyError:
+            raise SQLDecodeError(f'{sm_type} command not implemented for SQL {self._sql}')
+
+        try:
+            return handler(self, statement)
+        except MigrationError:
+            raise
+        except SQLDecodeError as e:
+            e.err_sql = self._sql
+            e.params = self._params
+            raise
+        except Exception as e:
+            raise SQLDecodeError(err_sql=self._sql, params=self._params) from e
+
+
+class CachedCursor(Cursor):
+    def execute(self, sql, params=None):
+        try:
+            self.result = CachedQuery(
+                self.client_conn,
+                self.db_conn,
+                self.connection_properties,
+                sql,
+                params)
+        except Exception as e:
+            raise DatabaseError() from e
+
+
+class DatabaseWrapper(djongo_base.DatabaseWrapper):
+    def create_cursor(self, name=None):
+        return CachedCursor(self.client_connection, self.connection, self.djongo_connection)
@@ -28,12 +28,19 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.middleware.RoleClaimsMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "sport_gym.urls"
 
+# Користувач сесії завантажується разом із профілем (select_related) одним запитом.
+AUTHENTICATION_BACKENDS = ["accounts.backends.ProfileModelBackend"]
+
+# Найбільший вік (с) рольових claims у сесії; інвалідація — сигналами профілю, TTL лише страховка.
+ROLE_CLAIMS_TTL = int(os.getenv("ROLE_CLAIMS_TTL", "300"))
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -61,13 +68,62 @@ DB_NAME = (parsed.path or "/").lstrip("/") or "sport_gym"
 
 DATABASES = {
     "default": {
-        "ENGINE": "djongo",
+        "ENGINE": "sport_gym.db",
         "NAME": DB_NAME,
         "ENFORCE_SCHEMA": False,
         "CLIENT": {"host": MONGODB_URI},
     }
 }
 
+# Розмір LRU-кешу розібраних SQL-запитів у бекенді sport_gym.db.
+DJONGO_PARSE_CACHE_SIZE = int(os.getenv("DJONGO_PARSE_CACHE_SIZE", "512"))
+
+# Шлях даних сторінки розкладу: "orm" або "mongo" (нативні агрегації pymongo).
+SCHEDULE_DATA_BACKEND = os.getenv("SCHEDULE_DATA_BACKEND", "orm")
+
+# Час життя (с) закешованих таблиць розкладу; інвалідація — сигналами, TTL лише страховка.
+SCHEDULE_FRAGMENT_TTL = int(os.getenv("SCHEDULE_FRAGMENT_TTL", "600"))
+
+# Кеш процесу: фрагменти розкладу, токени рольових claims; окремий псевдонім — для сесій.
+# Для кількох процесів обидва треба перевести на спільний бекенд (Redis/Memcached):
+# з LocMem рольові claims у сесії не кешуються (accounts/claims.py).
+# Сесія живе в кеші "sessions" не довше SESSION_CACHE_TIMEOUT секунд (accounts/sessions.py):
+# база лишається головною, і вихід в одному процесі доходить до інших щонайбільше за цей час.
+SESSION_CACHE_TIMEOUT = int(os.getenv("SESSION_CACHE_TIMEOUT", "30"))
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sport-gym",
+    },
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sport-gym-sessions",
+        "TIMEOUT": SESSION_CACHE_TIMEOUT,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# Зберігання сесій: "cached_db" (читання з кешу, запис у базу лише при зміні сесії),
+# "signed_cookies" (підписана кука, без бази) або "db" (лише база, як раніше).
+SESSION_STRATEGY = os.getenv("SESSION_STRATEGY", "cached_db")
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "accounts.sessions",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+if SESSION_STRATEGY not in SESSION_ENGINES:
+    raise RuntimeError(f"SESSION_STRATEGY must be one of: {', '.join(SESSION_ENGINES)}")
+SESSION_ENGINE = SESSION_ENGINES[SESSION_STRATEGY]
+SESSION_CACHE_ALIAS = "sessions"
+
+# Флеш-повідомлення живуть у куці, а не в сесії: запис і редирект не змінюють сесію.
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
+# Async-версії сторінок розкладу, прайсу, «Про нас» і залів (core/async_views.py).
+# Має сенс лише під ASGI-сервером (sport_gym.asgi:application); під WSGI кожен
+# async view виконувався б у власному циклі подій і лише сповільнив би відповідь.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
 LANGUAGE_CODE = "uk"
 TIME_ZONE = "Europe/Kyiv"
 USE_I18N = True